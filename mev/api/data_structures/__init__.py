@@ -110,6 +110,7 @@ from .observation import Observation
 from .feature import Feature
 from .observation_set import ObservationSet
 from .feature_set import FeatureSet
+from .compact_element_set import CompactObservationSet, CompactFeatureSet
 from .operation_input import OperationInput
 from .operation_input_output_dict import OperationInputDict, OperationOutputDict
 from .operation_input_spec import IntegerInputSpec, \
@@ -164,19 +165,23 @@ def merge_element_set(element_set_list):
     use this function.
     '''
 
-    # check that all elements of the list are the same type:
+    # check that all elements of the list are the same type. Note that the
+    # compact implementations (e.g. CompactObservationSet) can be merged with
+    # their standard counterparts; the type of the first set is used.
+    from .element_set import BaseElementSet
     unique_types = set([type(x) for x in element_set_list])
+    if all([issubclass(x, BaseElementSet) for x in unique_types]):
+        unique_types = set([x.element_typename for x in unique_types])
     if len(unique_types) > 1:
         logger.info('Failed when attempting to'
-            ' merge types: {s}'.format(s=', '.join(unique_types)))
+            ' merge types: {s}'.format(s=', '.join([str(x) for x in unique_types])))
         raise Exception('Attempting to merge more than one type.')
     elif len(unique_types) == 0:
         logger.info('Empty type list. Returning None')
         return None
         
     # check that the type is a subclass of BaseElementSet
-    from .element_set import BaseElementSet
-    typeclass = list(unique_types)[0]
+    typeclass = type(element_set_list[0])
     if not issubclass(typeclass, BaseElementSet):
         logger.info('Failed when attempting to merge type: {t}'.format(t=typeclass))
         raise Exception('Cannot merge type: {t}'.format(t=typeclass))
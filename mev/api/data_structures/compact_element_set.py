@@ -0,0 +1,355 @@
+import copy
+
+import numpy as np
+import pandas as pd
+from rest_framework.exceptions import ValidationError
+
+from api.data_structures import create_attribute
+from .element_set import BaseElementSet
+from .observation_set import ObservationSet
+from .feature_set import FeatureSet
+
+
+class AttributeColumn(object):
+    '''
+    Holds a single attribute (e.g. "phenotype") for all the elements
+    of a `CompactElementSet`.
+
+    Typically, every element has the same type of attribute for a
+    given key (e.g. a `FloatAttribute` for a p-value), differing only in
+    the value. In that case, we keep a single attribute instance (the
+    `template`) and an array of the values. Where possible (e.g. integers,
+    floats, booleans), that array has a numeric dtype. If the attributes
+    differ in type (or in other parameters such as the bounds of a
+    `BoundedFloatAttribute`), the attribute instances themselves are kept.
+    '''
+
+    # the numpy dtypes for the values, keyed by their python type
+    DTYPES = {
+        int: np.int64,
+        float: np.float64,
+        bool: np.bool_
+    }
+
+    def __init__(self, template, values, present):
+        self.template = template
+        self.values = values
+        # a boolean array which indicates whether each element had this attribute
+        self.present = present
+
+    @staticmethod
+    def get_parameters(attribute):
+        '''
+        Returns the parameters (other than the value) which define
+        the attribute, e.g. the type and the bounds
+        '''
+        d = attribute.to_dict()
+        d.pop('value')
+        return d
+
+    @staticmethod
+    def create_object_array(items):
+        # assigning element-wise prevents numpy from interpreting
+        # list-like values (e.g. of StringListAttribute) as extra dimensions
+        arr = np.empty(len(items), dtype=object)
+        for i, x in enumerate(items):
+            arr[i] = x
+        return arr
+
+    @classmethod
+    def from_attributes(cls, attribute_list):
+        '''
+        Creates the column from `attribute_list`, which has an attribute
+        instance for each element (or None if the element did not have
+        this attribute)
+        '''
+        present = np.array([x is not None for x in attribute_list], dtype=bool)
+        attributes = [x for x in attribute_list if x is not None]
+        if len(attributes) == 0:
+            return cls(None, np.zeros(len(attribute_list), dtype=bool), present)
+
+        template = attributes[0]
+        params = cls.get_parameters(template)
+        if not all([(type(x) is type(template)) and (cls.get_parameters(x) == params)
+            for x in attributes]):
+            # can't share a template. Keep the attribute instances.
+            values = cls.create_object_array(
+                [copy.deepcopy(x) for x in attribute_list])
+            return cls(None, values, present)
+
+        values = [x.value for x in attributes]
+        value_types = set([type(x) for x in values])
+        if (len(value_types) == 1) and (value_types.pop() in cls.DTYPES):
+            dtype = cls.DTYPES[type(values[0])]
+            values_array = np.zeros(len(attribute_list), dtype=dtype)
+            try:
+                values_array[present] = values
+            except OverflowError:
+                # integers which do not fit in 64 bits
+                values_array = None
+            if values_array is not None:
+                return cls(copy.deepcopy(template), values_array, present)
+
+        values_array = cls.create_object_array(
+            [x.value if x is not None else None for x in attribute_list])
+        return cls(copy.deepcopy(template), values_array, present)
+
+    def get_attribute(self, position):
+        '''
+        Returns a new attribute instance for the element at `position`
+        or None if that element did not have this attribute.
+        '''
+        if not self.present[position]:
+            return None
+        value = self.values[position]
+        if self.template is None:
+            return copy.deepcopy(value)
+        attribute = copy.copy(self.template)
+        if isinstance(value, np.generic):
+            value = value.item()
+        attribute.value = copy.deepcopy(value)
+        return attribute
+
+    def take(self, positions):
+        return AttributeColumn(self.template,
+            self.values[positions],
+            self.present[positions])
+
+    def append_missing(self):
+        '''
+        Extends the column for an element which does not have this attribute
+        '''
+        self.values = np.concatenate([self.values, np.zeros(1, dtype=self.values.dtype)])
+        self.present = np.append(self.present, False)
+
+
+class CompactElement(object):
+    '''
+    A lightweight view of a single element of a `CompactElementSet`.
+    It behaves like the `Observation` or `Feature` it represents (and compares
+    equal to them), but holds only a reference to its set and its position.
+
+    The `attributes` are created from the columns of the set when requested,
+    so changes to the returned dict do not affect the set. Use `add_attribute`
+    to change the attributes of an element.
+    '''
+    __slots__ = ('_element_set', '_position')
+
+    def __init__(self, element_set, position):
+        self._element_set = element_set
+        self._position = position
+
+    @property
+    def id(self):
+        return self._element_set.ids[self._position]
+
+    @property
+    def attributes(self):
+        return self._element_set._get_attributes(self._position)
+
+    def add_attribute(self, attribute_key, attr_dict, overwrite=False):
+        self._element_set._add_attribute(self._position,
+            attribute_key, attr_dict, overwrite=overwrite)
+
+    def __eq__(self, other):
+        '''
+        As with `BaseElement`, equality is determined solely by the identifier.
+        '''
+        return self.id == other.id
+
+    def __hash__(self):
+        return hash(self.id)
+
+    def __repr__(self):
+        return '{element_type} ({id})'.format(
+            element_type=self._element_set.element_typename.capitalize(),
+            id=self.id
+        )
+
+    def to_dict(self):
+        d = {}
+        d['id'] = self.id
+        d['attributes'] = {k:v.to_dict() for k,v in self.attributes.items()}
+        return d
+
+
+class CompactElementMap(object):
+    '''
+    A read-only mapping of the identifiers to the elements of a
+    `CompactElementSet`, which is used in the set operations of `BaseElementSet`.
+    '''
+    def __init__(self, element_set):
+        self.element_set = element_set
+
+    def __len__(self):
+        return len(self.element_set)
+
+    def __iter__(self):
+        return iter(self.element_set.ids)
+
+    def __contains__(self, _id):
+        return _id in self.element_set._index
+
+    def __getitem__(self, _id):
+        return CompactElement(self.element_set, self.element_set._index.get_loc(_id))
+
+    def items(self):
+        for i, _id in enumerate(self.element_set.ids):
+            yield (_id, CompactElement(self.element_set, i))
+
+
+class CompactElementSet(BaseElementSet):
+    '''
+    An alternative to `BaseElementSet` for large sets (e.g. FeatureSets
+    of tens of thousands of genes). Rather than keeping an `Observation` or
+    `Feature` instance (each with its own dict of attribute instances)
+    for each element, we keep an index of the identifiers and a column
+    (see `AttributeColumn`) for each attribute key.
+
+    The elements are exposed as `CompactElement` views, which are created
+    as needed. Hence, the set operations, equality checks, and serializers work
+    as they do for the standard sets. Changes to the attributes of
+    an element (via `add_attribute`) are kept separately so that
+    the columns are never modified (copy-on-write).
+    '''
+
+    def __init__(self, init_elements, multiple=True):
+        '''
+        `init_elements` is an iterable of `BaseElement` (or `CompactElement`)
+        instances.
+        '''
+        init_elements = list(init_elements)
+        self._initialize([x.id for x in init_elements],
+            [x.attributes for x in init_elements], multiple)
+
+    def _initialize(self, ids, attribute_dicts, multiple):
+        if self.element_typename is None:
+            raise NotImplementedError('Set the member "element_typename"'
+            ' in your child class implementation')
+
+        self._check_singleton(len(ids), multiple)
+        self._set_contents(ids, attribute_dicts)
+        self._check_unique(self._index.nunique(), len(ids))
+        self.multiple = multiple
+
+    @classmethod
+    def from_attribute_dicts(cls, ids, attribute_dicts, multiple=True):
+        '''
+        Creates the set from the identifiers and the attribute dicts
+        (mapping the keys to attribute instances) of the elements. This avoids
+        creating (and copying the attributes of) an `Observation` or 
+        `Feature` for each element, e.g. when deserializing.
+        '''
+        element_set = cls.__new__(cls)
+        element_set._initialize(list(ids), list(attribute_dicts), multiple)
+        return element_set
+
+    def _set_contents(self, ids, attribute_dicts):
+        self._index = pd.Index(ids, dtype=object)
+        keys = dict.fromkeys([k for d in attribute_dicts for k in d])
+        self._columns = {k: AttributeColumn.from_attributes([d.get(k) for d in attribute_dicts])
+            for k in keys}
+        # maps the position of an element to its attributes if they were
+        # changed after the set was created
+        self._modified_attributes = {}
+
+    @classmethod
+    def _from_items(cls, items):
+        '''
+        Creates the set from a list of dicts (with the "id" and "attributes"
+        keys) as returned by the set operations of `BaseElementSet`
+        '''
+        element_set = cls.__new__(cls)
+        element_set._set_contents([x['id'] for x in items], [x['attributes'] for x in items])
+        element_set.multiple = True
+        return element_set
+
+    def _take(self, positions):
+        '''
+        Returns a new set with the elements at `positions`
+        '''
+        element_set = self.__class__.__new__(self.__class__)
+        element_set._index = self._index[positions]
+        element_set._columns = {k: v.take(positions) for k, v in self._columns.items()}
+        element_set._modified_attributes = {}
+        if self._modified_attributes:
+            new_positions = {x: i for i, x in enumerate(positions)}
+            for position, attr_dict in self._modified_attributes.items():
+                if position in new_positions:
+                    element_set._modified_attributes[new_positions[position]] = dict(attr_dict)
+        element_set.multiple = True
+        return element_set
+
+    @property
+    def ids(self):
+        return self._index.values
+
+    @property
+    def elements(self):
+        return set([CompactElement(self, i) for i in range(len(self))])
+
+    @property
+    def _element_map(self):
+        return CompactElementMap(self)
+
+    def _get_attributes(self, position):
+        try:
+            return copy.deepcopy(self._modified_attributes[position])
+        except KeyError:
+            attr_dict = {}
+            for k, column in self._columns.items():
+                attribute = column.get_attribute(position)
+                if attribute is not None:
+                    attr_dict[k] = attribute
+            return attr_dict
+
+    def _add_attribute(self, position, attribute_key, attr_dict, overwrite=False):
+        attributes = self._get_attributes(position)
+        if (attribute_key in attributes) and (not overwrite):
+            raise ValidationError('The attribute identifier {attribute_key}'
+                ' already existed in the attributes.'.format(attribute_key=attribute_key))
+        attributes[attribute_key] = create_attribute(attribute_key, attr_dict)
+        self._modified_attributes[position] = attributes
+
+    def add_element(self, new_element):
+        self._check_new_element(new_element)
+        position = len(self)
+        self._index = self._index.append(pd.Index([new_element.id], dtype=object))
+        for column in self._columns.values():
+            column.append_missing()
+        self._modified_attributes[position] = copy.deepcopy(dict(new_element.attributes))
+
+    @classmethod
+    def multi_set_intersection(cls, element_sets):
+        return cls._from_items(BaseElementSet._multi_set_intersection(element_sets))
+
+    @classmethod
+    def multi_set_union(cls, element_sets):
+        return cls._from_items(BaseElementSet._multi_set_union(element_sets))
+
+    def set_intersection(self, other):
+        return self.multi_set_intersection([self, other])
+
+    def set_union(self, other):
+        return self.multi_set_union([self, other])
+
+    def set_difference(self, other):
+        is_shared = self._index.isin(list(other._element_map))
+        return self._take(np.flatnonzero(~is_shared))
+
+    def __len__(self):
+        return self._index.size
+
+
+class CompactObservationSet(CompactElementSet, ObservationSet):
+    '''
+    A compact `ObservationSet`. See `CompactElementSet`.
+    '''
+    pass
+
+
+class CompactFeatureSet(CompactElementSet, FeatureSet):
+    '''
+    A compact `FeatureSet`. See `CompactElementSet`.
+    '''
+    pass
@@ -54,33 +54,41 @@ class BaseElementSet(object):
             raise NotImplementedError('Set the member "element_typename"'
             ' in your child class implementation')
 
-        if (not multiple) and (len(init_elements) > 1):
+        self._check_singleton(len(init_elements), multiple)
+
+        self.elements = set(init_elements)
+        self._check_unique(len(self.elements), len(init_elements))
+
+        # maps the identifiers to the elements so that we can find the 
+        # element with a particular identifier (e.g. for checking the
+        # attributes in set operations) in constant time
+        self._element_map = {x.id: x for x in self.elements}
+
+        self.multiple = multiple
+
+    def _check_singleton(self, num_elements, multiple):
+        if (not multiple) and (num_elements > 1):
             raise ValidationError({'elements':
                 'The {element_typename}Set was declared to be a singleton, but'
                 ' multiple elements were passed to the constructor.'.format(
                     element_typename=self.element_typename.capitalize())
                 })
 
-        self.elements = set(init_elements)
-        if len(self.elements) < len(init_elements):
+    def _check_unique(self, num_unique_elements, num_elements):
+        if num_unique_elements < num_elements:
             raise ValidationError({'elements':
                 'Attempted to create an {element_typename}Set with a' 
                 ' duplicate element.'.format(
                     element_typename=self.element_typename.capitalize())
             })
 
-        self.multiple = multiple
-
-
-    def add_element(self, new_element):
+    def _check_new_element(self, new_element):
         '''
-        Adds a new `Observation` to the `ObservationSet` 
-        (or `Feature` to `FeatureSet`)
+        Checks that `new_element` can be added to this set.
         '''
-
         # if it's a singleton (multiple=False), prevent adding more
         # if the set length is already 1.
-        if not self.multiple and len(self.elements) == 1:
+        if not self.multiple and len(self) == 1:
             raise ValidationError(
                 'Tried to add a second {element_type} to a singleton'
                 ' {element_type}Set.'.format(
@@ -88,24 +96,79 @@ class BaseElementSet(object):
                 )
             )
 
-        prev_length = len(self.elements)
-        self.elements.add(new_element)
-        if len(self.elements) == prev_length:
+        if new_element.id in self._element_map:
             raise ValidationError(
                 'Tried to add a duplicate entry to an {element_type}Set.'.format(
                     element_type=self.element_typename.capitalize()
                 )
             )
 
+    def add_element(self, new_element):
+        '''
+        Adds a new `Observation` to the `ObservationSet` 
+        (or `Feature` to `FeatureSet`)
+        '''
+        self._check_new_element(new_element)
+        self.elements.add(new_element)
+        self._element_map[new_element.id] = new_element
+
     @staticmethod
-    def _get_element_with_id(element_list, id):
+    def _merge_attributes(element_list):
         '''
-        Utility method to get the list element that has 
-        the passed id
+        Returns a dict of the attributes of the elements in `element_list`,
+        which all share the same identifier. 
+        
+        We check that we don't have conflicting info. e.g. if one attribute 
+        dict sets a particular attribute to one value and the other is different, 
+        reject it. Don't make any assumptions about how that conflict should be handled.
         '''
+        attr_dict = {}
         for el in element_list:
-            if el.id == id:
-                return el
+            for k, v in el.attributes.items():
+                if (k in attr_dict) and (attr_dict[k] != v):
+                    raise ValidationError('When performing an intersection'
+                        ' or union of sets, encountered a conflict in the attributes.'
+                        ' The key "{k}" has differing values of {x} and {y}'.format(
+                            k = k,
+                            x = attr_dict[k],
+                            y = v
+                        )
+                    )
+                attr_dict[k] = v
+        return attr_dict
+
+    @staticmethod
+    def _multi_set_intersection(element_sets):
+        '''
+        Returns a list of dicts that represent the intersection of 
+        all the sets in `element_sets`. Will be turned into 
+        the properly typed sets by the child/calling class.
+        '''
+        element_maps = [x._element_map for x in element_sets]
+        # only the identifiers in the smallest set can be in the intersection
+        smallest_map = min(element_maps, key=len)
+        return_list = []
+        for _id in smallest_map:
+            if all([_id in m for m in element_maps]):
+                attr_dict = BaseElementSet._merge_attributes([m[_id] for m in element_maps])
+                return_list.append({'id':_id, 'attributes': attr_dict})
+        return return_list
+
+    @staticmethod
+    def _multi_set_union(element_sets):
+        '''
+        Returns a list of dicts that represent the UNION of all the sets 
+        in `element_sets`. The attributes of elements which are in more than 
+        one set are merged. Will be turned into properly typed sets 
+        (e.g. ObservationSet, FeatureSet) by the calling class (a child class)
+        '''
+        # maps the identifiers to the list of elements with that identifier
+        merged_elements = {}
+        for element_set in element_sets:
+            for _id, el in element_set._element_map.items():
+                merged_elements.setdefault(_id, []).append(el)
+        return [{'id':_id, 'attributes': BaseElementSet._merge_attributes(element_list)} 
+            for _id, element_list in merged_elements.items()]
 
     def _set_intersection(self, other):
         '''
@@ -113,35 +176,7 @@ class BaseElementSet(object):
         the intersection of the input sets. Will be turned into 
         the properly typed sets by the child/calling class.
         '''
-        return_list = []
-        intersection_set = self.elements.intersection(other.elements)
-        for x in intersection_set:
-            attr_dict = {}
-            _id = x.id
-            el1 = BaseElementSet._get_element_with_id(self.elements, _id)
-            el2 = BaseElementSet._get_element_with_id(other.elements, _id)
-            if el1 and el2:
-                # check that we don't have conflicting info. 
-                # e.g. if one attribute dict sets a particular attribute
-                # to one value and the other is different, reject it.
-                # Don't make any assumptions about how that conflict should be handled.
-                d1 = el1.attributes
-                d2 = el2.attributes
-                intersecting_attributes = [x for x in d1 if x in d2]
-                for k in intersecting_attributes:
-                    if d1[k] != d2[k]:
-                        raise ValidationError('When performing an intersection'
-                            ' of two sets, encountered a conflict in the attributes.'
-                            ' The key "{k}" has differing values of {x} and {y}'.format(
-                                k = k,
-                                x = d1[k],
-                                y = d2[k]
-                            )
-                        )
-                attr_dict.update(el1.attributes)
-                attr_dict.update(el2.attributes)
-            return_list.append({'id':_id, 'attributes': attr_dict})
-        return return_list
+        return BaseElementSet._multi_set_intersection([self, other])
 
     def _set_union(self, other):
         '''
@@ -149,28 +184,16 @@ class BaseElementSet(object):
         Will be turned into properly typed sets (e.g. ObservationSet, FeatureSet)
         by the calling class (a child class)
         '''
-        return_list = []
-
-        # need to check that the intersecting elements don't have any issues like
-        # conflicting attributes:
-        intersection_set = self.set_intersection(other)
-        union_set = self.elements.union(other.elements)
-        for x in union_set:
-            _id = x.id
-            el = BaseElementSet._get_element_with_id(intersection_set.elements, _id)
-            if el: # was part of the intersection set
-                return_list.append(el.to_dict())
-            else: # was NOT part of the intersection set
-                return_list.append({'id':_id, 'attributes': x.attributes})
-        return return_list
+        return BaseElementSet._multi_set_union([self, other])
 
     def _set_difference(self, other):
         '''
         Returns a set of Observation or Feature instances
         to the calling class of the child, which will be responsible
         for creating a full ObservationSet or FeatureSet
-        '''        
-        return self.elements.difference(other.elements)
+        '''
+        return set([el for _id, el in self._element_map.items() 
+            if not _id in other._element_map])
 
 
     def is_equivalent_to(self, other):
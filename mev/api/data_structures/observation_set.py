@@ -47,6 +47,30 @@ class ObservationSet(BaseElementSet):
             l.append(Observation(item['id'], item['attributes']))
         return ObservationSet(l)
 
+    @classmethod
+    def multi_set_intersection(cls, element_sets):
+        '''
+        Returns the intersection of all the ObservationSets in `element_sets`.
+        Equivalent to successive pairwise intersections, but does not 
+        create the intermediate sets.
+        '''
+        intersection_list = BaseElementSet._multi_set_intersection(element_sets)
+        l = []
+        for item in intersection_list:
+            l.append(Observation(item['id'], item['attributes']))
+        return ObservationSet(l)
+
+    @classmethod
+    def multi_set_union(cls, element_sets):
+        '''
+        Returns the union of all the ObservationSets in `element_sets`.
+        '''
+        union_list = BaseElementSet._multi_set_union(element_sets)
+        l = []
+        for item in union_list:
+            l.append(Observation(item['id'], item['attributes']))
+        return ObservationSet(l)
+
     def set_difference(self, other):
         diff_set = super()._set_difference(other)
         return ObservationSet(diff_set)
\ No newline at end of file
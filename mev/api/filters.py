@@ -1,5 +1,6 @@
 import operator
 import numpy as np
+import pandas as pd
 
 # we allow sorting of the resource contents (if sensible for the resource)
 SORT_PARAM = 'sort_vals'
@@ -10,6 +11,10 @@ SORTING_OPTIONS = [ASCENDING, DESCENDING]
 # A special filter option for specifying a filter on the row names
 ROWNAME_FILTER = '__rowname__'
 
+# A special option for only returning a subset of the columns. The value is
+# a comma-delimited list of the column names, e.g. __cols__=sampleA,sampleB
+COLUMN_PROJECTION_PARAM = '__cols__'
+
 # for query filter params:
 # When providing query filters, we will have something like:
 # <url>/?paramA=<comparison>:<val>, 
@@ -110,3 +115,73 @@ NUMERIC_OPERATORS = [
     ABS_VAL_LESS_THAN,
 ]
 
+
+# Vectorized versions of the operators above. Rather than being applied to
+# each value individually, these accept a pandas Series (e.g. a column of a
+# table) and return a boolean Series. The semantics are the same as the
+# element-wise versions; for instance, numeric comparisons against values that
+# cannot be interpreted as numbers evaluate to False.
+def _as_numeric(x, y):
+    '''
+    Returns the series `x` cast to numbers (where values which can't 
+    be interpreted as numbers become NaN, which will fail any comparison)
+    and the comparison value `y` as a float (or None if that is not possible)
+    '''
+    try:
+        y = float(y)
+    except (ValueError, TypeError) as ex:
+        return x, None
+    # categorical columns (from compact loading) are cast back to plain values first
+    if pd.api.types.is_categorical_dtype(x.dtype):
+        x = x.astype(object)
+    return pd.to_numeric(x, errors='coerce'), y
+
+def _numeric_comparison(op):
+    def f(x, y):
+        x, y = _as_numeric(x, y)
+        if y is None:
+            return pd.Series(False, index=x.index)
+        return op(x, y)
+    return f
+
+def vectorized_abs_val_gt(x, y):
+    x, y = _as_numeric(x, y)
+    if y is None:
+        return pd.Series(False, index=x.index)
+    return np.abs(x) > y
+
+def vectorized_abs_val_lt(x, y):
+    x, y = _as_numeric(x, y)
+    if y is None:
+        return pd.Series(False, index=x.index)
+    return np.abs(x) < y
+
+def vectorized_case_insensitive_string_compare(x, y):
+    return x.str.lower() == y.lower()
+
+def vectorized_case_insensitive_startswith(x, y):
+    return x.str.lower().str.startswith(y.lower(), na=False)
+
+def vectorized_list_contains(x, y):
+    # y is a comma-delimited string of identifiers to find.
+    # Split it only once, rather than for each value in x
+    y_list = [a.strip() for a in y.split(',')]
+    return x.isin(y_list)
+
+def vectorized_eq(x, y):
+    return x == y
+
+VECTORIZED_OPERATOR_MAPPING = {
+    LESS_THAN: _numeric_comparison(operator.lt),
+    LESS_THAN_OR_EQUAL: _numeric_comparison(operator.le),
+    GREATER_THAN: _numeric_comparison(operator.gt),
+    GREATER_THAN_OR_EQUAL: _numeric_comparison(operator.ge),
+    ABS_VAL_GREATER_THAN: vectorized_abs_val_gt,
+    ABS_VAL_LESS_THAN: vectorized_abs_val_lt,
+    EQUAL_TO: vectorized_eq,
+    '=': vectorized_eq,
+    '==': vectorized_eq,
+    CASE_INSENSITIVE_EQUALS: vectorized_case_insensitive_string_compare,
+    STARTSWITH: vectorized_case_insensitive_startswith,
+    IS_IN: vectorized_list_contains
+}
@@ -0,0 +1,123 @@
+import os
+import time
+import uuid
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from django.core.management.base import BaseCommand
+
+from resource_types.table_types import TableResource
+
+
+class Command(BaseCommand):
+    help = ('Compares the time to read/write table-based resources using the'
+        ' available engines (pandas, pyarrow) and the binary sidecar formats.')
+
+    def add_arguments(self, parser):
+
+        parser.add_argument(
+            'paths',
+            nargs='*',
+            help='Paths to the delimited files to benchmark. If none are given,'
+                ' a numeric matrix is generated (see --rows and --cols).'
+        )
+
+        parser.add_argument(
+            '--rows',
+            type=int,
+            default=20000,
+            help='The number of rows of the generated matrix.'
+        )
+
+        parser.add_argument(
+            '--cols',
+            type=int,
+            default=200,
+            help='The number of columns of the generated matrix.'
+        )
+
+        parser.add_argument(
+            '--repeats',
+            type=int,
+            default=3,
+            help='The number of times each operation is repeated. The best time is reported.'
+        )
+
+    def time_operation(self, f, repeats):
+        times = []
+        for i in range(repeats):
+            start = time.perf_counter()
+            f()
+            times.append(time.perf_counter() - start)
+        return min(times)
+
+    def generate_matrix(self, nrows, ncols):
+        '''
+        Creates a matrix which is typical of our numeric tables
+        (e.g. normalized expression) and returns the path of the TSV
+        '''
+        df = pd.DataFrame(
+            np.random.lognormal(size=(nrows, ncols)),
+            index=['g{i}'.format(i=i) for i in range(nrows)],
+            columns=['s{i}'.format(i=i) for i in range(ncols)]
+        )
+        path = os.path.join(tempfile.gettempdir(), '{u}.tsv'.format(u=uuid.uuid4()))
+        df.to_csv(path, sep='\t')
+        return path
+
+    def benchmark_file(self, path, repeats):
+        reader = TableResource.get_reader(path)
+        results = []
+        results.append(('read (pandas)',
+            self.time_operation(lambda: reader(path, index_col=0, comment='#'), repeats)))
+        if TableResource.read_with_pyarrow(path) is None:
+            self.stdout.write('The pyarrow engine could not be used for {p}.'
+                ' It would fall back to pandas.'.format(p=path))
+        else:
+            results.append(('read (pyarrow)',
+                self.time_operation(lambda: TableResource.read_with_pyarrow(path), repeats)))
+
+        table = reader(path, index_col=0, comment='#')
+        tsv_path = '{p}.benchmark.tsv'.format(p=path)
+        parquet_path = '{p}.benchmark.parquet'.format(p=path)
+        npy_path = '{p}.benchmark.npy'.format(p=path)
+        try:
+            results.append(('write TSV (pandas)',
+                self.time_operation(lambda: table.to_csv(tsv_path, sep='\t'), repeats)))
+            results.append(('write parquet',
+                self.time_operation(lambda: table.to_parquet(parquet_path), repeats)))
+            results.append(('read parquet',
+                self.time_operation(lambda: pd.read_parquet(parquet_path), repeats)))
+            if table.dtypes.nunique() == 1:
+                np.save(npy_path, table.values)
+                results.append(('row means (memory-mapped)',
+                    self.time_operation(
+                        lambda: pd.DataFrame(np.load(npy_path, mmap_mode='r'), copy=False).mean(axis=1),
+                        repeats)))
+        finally:
+            for p in [tsv_path, parquet_path, npy_path]:
+                if os.path.exists(p):
+                    os.remove(p)
+
+        self.stdout.write('{p} ({r} rows x {c} columns):'.format(
+            p = path,
+            r = table.shape[0],
+            c = table.shape[1]
+        ))
+        for name, t in results:
+            self.stdout.write('  {n:<28}{t:>10.3f} s'.format(n=name, t=t))
+
+    def handle(self, *args, **options):
+        paths = options['paths']
+        generated_path = None
+        if len(paths) == 0:
+            generated_path = self.generate_matrix(options['rows'], options['cols'])
+            paths = [generated_path]
+        try:
+            for p in paths:
+                self.benchmark_file(p, options['repeats'])
+        finally:
+            if generated_path is not None:
+                os.remove(generated_path)
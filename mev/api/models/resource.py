@@ -87,6 +87,15 @@ class Resource(AbstractResource):
         blank=True
     )
 
+    # The suffixes (delimited by SIDECAR_DELIMITER) of the sidecar files 
+    # (e.g. indexes) which were stored next to the file when it was
+    # validated. Only these are fetched from storage when reading the resource.
+    sidecars = models.CharField(max_length=500, 
+        default='', 
+        blank=True
+    )
+    SIDECAR_DELIMITER = ','
+
     def save(self, *args, **kwargs):
         '''
         This overrides the save method, implementing
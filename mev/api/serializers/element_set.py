@@ -3,6 +3,8 @@ import copy
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
 
+from api.data_structures import create_attribute
+
 
 class ElementSetSerializer(serializers.Serializer):
 
@@ -42,4 +44,31 @@ class ElementSetSerializer(serializers.Serializer):
         instances in the database.
         '''
         self.is_valid(raise_exception=True)
-        return self.create(self.validated_data)
\ No newline at end of file
+        return self.create(self.validated_data)
+
+
+class CompactElementSetMixin(object):
+    '''
+    Used with the `ElementSetSerializer` subclasses to deserialize to a
+    compact set (e.g. `CompactFeatureSet`). The set is built directly 
+    from the identifiers and attributes of the validated elements rather than
+    creating an `Observation` or `Feature` instance for each.
+    '''
+
+    def _build_set(self, data):
+        ids = []
+        attribute_dicts = []
+        for element_dict in data['elements']:
+            ids.append(element_dict['id'])
+            attr_dict = {}
+            for k, v in element_dict.get('attributes', {}).items():
+                # the validated attributes are typically already instances
+                if type(v) == dict:
+                    v = create_attribute(k, v)
+                attr_dict[k] = v
+            attribute_dicts.append(attr_dict)
+        return self.element_set_class.from_attribute_dicts(
+            ids, 
+            attribute_dicts, 
+            data['multiple']
+        )
@@ -1,13 +1,16 @@
 from rest_framework import serializers, exceptions
 
-from api.data_structures import FeatureSet
-from .element_set import ElementSetSerializer
+from api.data_structures import FeatureSet, CompactFeatureSet
+from .element_set import ElementSetSerializer, CompactElementSetMixin
 from .feature import FeatureSerializer, NullableFeatureSerializer
 
 class FeatureSetSerializer(ElementSetSerializer):
 
     elements = FeatureSerializer(required=False, many=True)
 
+    # the type of set created on deserialization
+    element_set_class = FeatureSet
+
     def _build_set(self, data):
         '''
         A helper method which attempts to build a FeatureSet
@@ -22,7 +25,7 @@ class FeatureSetSerializer(ElementSetSerializer):
             feature_serializer = FeatureSerializer(data=feature_dict)
             feat = feature_serializer.get_instance()
             feature_list.append(feat)
-        fl = FeatureSet(
+        fl = self.element_set_class(
             feature_list, 
             data['multiple']
         )
@@ -36,4 +39,11 @@ class FeatureSetSerializer(ElementSetSerializer):
         return self._build_set(validated_data)
 
 class NullableFeatureSetSerializer(FeatureSetSerializer):
-    elements = NullableFeatureSerializer(required=False, many=True)
\ No newline at end of file
+    elements = NullableFeatureSerializer(required=False, many=True)
+
+class CompactFeatureSetSerializer(CompactElementSetMixin, FeatureSetSerializer):
+    '''
+    Deserializes to a `CompactFeatureSet`, which is considerably smaller 
+    for large sets.
+    '''
+    element_set_class = CompactFeatureSet
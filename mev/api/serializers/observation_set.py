@@ -1,12 +1,15 @@
 from rest_framework import serializers, exceptions
 
-from api.data_structures import ObservationSet
-from .element_set import ElementSetSerializer
+from api.data_structures import ObservationSet, CompactObservationSet
+from .element_set import ElementSetSerializer, CompactElementSetMixin
 from .observation import ObservationSerializer, NullableObservationSerializer
 
 class ObservationSetSerializer(ElementSetSerializer):
 
     elements = ObservationSerializer(required=False, many=True)
+
+    # the type of set created on deserialization
+    element_set_class = ObservationSet
         
     def _build_set(self, data):
         '''
@@ -19,7 +22,7 @@ class ObservationSetSerializer(ElementSetSerializer):
             obs_serializer = ObservationSerializer(data=obs_dict)
             obs = obs_serializer.get_instance()
             obs_list.append(obs)
-        return ObservationSet(
+        return self.element_set_class(
             obs_list, 
             data['multiple']
         )
@@ -32,4 +35,11 @@ class ObservationSetSerializer(ElementSetSerializer):
         return self._build_set(validated_data)
 
 class NullableObservationSetSerializer(ObservationSetSerializer):
-    elements = NullableObservationSerializer(required=False, many=True)
\ No newline at end of file
+    elements = NullableObservationSerializer(required=False, many=True)
+
+class CompactObservationSetSerializer(CompactElementSetMixin, ObservationSetSerializer):
+    '''
+    Deserializes to a `CompactObservationSet`, which is considerably smaller 
+    for large sets.
+    '''
+    element_set_class = CompactObservationSet
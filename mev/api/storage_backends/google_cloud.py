@@ -212,6 +212,61 @@ class GoogleBucketStorage(RemoteBucketStorageBackend):
                 )
         return final_path
 
+    def store_sidecar(self, resource_instance, local_sidecar_path, suffix):
+        '''
+        Uploads a sidecar file (e.g. an index written when the resource was
+        standardized) so that it sits next to the file of the (already stored)
+        `resource_instance`.
+        '''
+        relative_path = '{p}.{s}'.format(
+            p=self.construct_relative_path(resource_instance),
+            s=suffix
+        )
+        bucket = self.get_or_create_bucket()
+        blob = storage.Blob(relative_path, bucket)
+        self.upload_blob(blob, local_sidecar_path)
+        return os.path.join(self.BUCKET_PREFIX, self.BUCKET_NAME, relative_path)
+
+    def get_local_sidecar_path(self, resource_instance, suffix):
+        '''
+        Returns the path to the sidecar file identified by `suffix`
+        in the local cache, downloading it if necessary. Returns None
+        if there is no such sidecar.
+        '''
+        local_resource_location = os.path.join(
+            settings.RESOURCE_CACHE_DIR,
+            self.construct_relative_path(resource_instance)
+        )
+        local_cache_location = '{p}.{s}'.format(
+            p=local_resource_location,
+            s=suffix
+        )
+        if os.path.exists(local_cache_location):
+            # If the resource file was downloaded again (e.g. after it was evicted
+            # from the cache), the cached sidecar is older and would be
+            # rejected as stale on every read. In that case, download it again.
+            if (not os.path.exists(local_resource_location)) or \
+                (os.path.getmtime(local_cache_location) >= os.path.getmtime(local_resource_location)):
+                return local_cache_location
+            logger.info('The cached sidecar at {p} is older than the'
+                ' resource file. Download it again.'.format(p=local_cache_location))
+
+        blob = self.get_blob('{p}.{s}'.format(p=resource_instance.path, s=suffix))
+        if blob is None:
+            return None
+
+        user_cache_dir = os.path.dirname(local_cache_location)
+        if not os.path.exists(user_cache_dir):
+            make_local_directory(user_cache_dir)
+        try:
+            self.download_blob(blob, local_cache_location)
+        except Exception as ex:
+            logger.error('Could not download the sidecar at {blob}'.format(
+                blob=blob
+            ))
+            return None
+        return local_cache_location
+
     def delete(self, path):
         logger.info('Requesting deletion of file at {path}'.format(
             path=path
@@ -52,6 +52,28 @@ class LocalStorage(BaseStorageBackend):
             # NOT on the local filesystem. go get it.
             return localize_remote_resource(resource_instance)
 
+    def store_sidecar(self, resource_instance, local_sidecar_path, suffix):
+        '''
+        Moves a sidecar file (e.g. an index written when the resource was
+        standardized) so that it sits next to the file of the (already stored)
+        `resource_instance`.
+        '''
+        destination = '{p}.{s}'.format(p=resource_instance.path, s=suffix)
+        return move_resource(local_sidecar_path, destination)
+
+    def get_local_sidecar_path(self, resource_instance, suffix):
+        '''
+        Returns the local path to the sidecar file identified by `suffix`,
+        or None if there is no such sidecar.
+        '''
+        sidecar_path = '{p}.{s}'.format(
+            p=self.get_local_resource_path(resource_instance), 
+            s=suffix
+        )
+        if os.path.exists(sidecar_path):
+            return sidecar_path
+        return None
+
     def delete(self, path):
         delete_local_file(path)
 
@@ -1,8 +1,40 @@
+import os
+import shutil
+import tempfile
+
 from rest_framework.test import APITestCase, APIClient
 from django.contrib.auth import get_user_model
 from django.conf import settings
 
 from api.tests import test_settings
+from resource_types import RESOURCE_MAPPING
+from resource_types.base import DataResource
+
+
+def remove_with_sidecars(path):
+    '''
+    Removes the file at `path` along with any sidecar files 
+    (e.g. a columnar copy or an index) that were written next to it.
+    '''
+    suffixes = set([x for c in RESOURCE_MAPPING.values() for x in c.SIDECAR_SUFFIXES])
+    for p in [path] + [DataResource.get_sidecar_path(path, x) for x in suffixes]:
+        if os.path.exists(p):
+            os.remove(p)
+
+
+def copy_to_temp_file(test_case, path):
+    '''
+    Copies the (checked-in) file at `path` to a temporary file with the 
+    same extension. Tests which validate or standardize a file in place 
+    should use the copy so they do not modify the test files. The copy 
+    and its sidecars are removed when `test_case` finishes.
+    '''
+    basename = os.path.basename(path)
+    fd, tmp_path = tempfile.mkstemp(suffix=basename[basename.index('.'):])
+    os.close(fd)
+    shutil.copy(path, tmp_path)
+    test_case.addCleanup(remove_with_sidecars, tmp_path)
+    return tmp_path
 
 
 class BaseAPITestCase(APITestCase):
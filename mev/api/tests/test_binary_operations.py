@@ -3,6 +3,9 @@ import os
 import json
 import unittest.mock as mock
 
+import numpy as np
+import pandas as pd
+
 from django.core.exceptions import ImproperlyConfigured
 
 from django.conf import settings
@@ -131,3 +134,32 @@ class FilterTests(BaseAPITestCase):
         self.assertTrue(op('abc','xyz,  abc,      qbc')) # space is fine
         self.assertFalse(op('Abc','xyz,abc,qbc')) # sensitive to case
         self.assertFalse(op('Abc','xyz'))
+
+    def test_vectorized_operators_match_elementwise(self):
+        '''
+        The vectorized operators (used for filtering tables) should
+        give the same results as the element-wise operators.
+        '''
+        numeric_series = pd.Series([-3.0, -1.0, 0.0, 0.01, 2.0, np.nan, np.inf])
+        string_series = pd.Series(['abc', 'ABD', 'xyz', '2', '0.5', 'Abc'])
+        cases = [
+            (settings.LESS_THAN, numeric_series, 0.01),
+            (settings.LESS_THAN_OR_EQUAL, numeric_series, 0.01),
+            (settings.GREATER_THAN, numeric_series, -1),
+            (settings.GREATER_THAN_OR_EQUAL, numeric_series, -1),
+            (settings.ABS_VAL_GREATER_THAN, numeric_series, 1.0),
+            (settings.ABS_VAL_LESS_THAN, numeric_series, 1.0),
+            (settings.EQUAL_TO, numeric_series, 2.0),
+            (settings.LESS_THAN, string_series, 1.0),
+            (settings.LESS_THAN, string_series, 'a'),
+            (settings.EQUAL_TO, string_series, 'abc'),
+            (settings.CASE_INSENSITIVE_EQUALS, string_series, 'abc'),
+            (settings.STARTSWITH, string_series, 'ab'),
+            (settings.IS_IN, string_series, 'xyz,  abc,2'),
+        ]
+        for op_str, series, val in cases:
+            op = settings.OPERATOR_MAPPING[op_str]
+            vectorized_op = settings.VECTORIZED_OPERATOR_MAPPING[op_str]
+            expected = [bool(op(x, val)) for x in series]
+            result = vectorized_op(series, val)
+            self.assertEqual(expected, result.tolist())
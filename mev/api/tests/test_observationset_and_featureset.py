@@ -1,6 +1,9 @@
 import unittest
+import unittest.mock as mock
 import copy
 
+import numpy as np
+
 from rest_framework.exceptions import ValidationError
 
 from api.data_structures import Observation, \
@@ -8,12 +11,21 @@ from api.data_structures import Observation, \
     Feature, \
     FeatureSet, \
     StringAttribute, \
+    IntegerAttribute, \
+    FloatAttribute, \
+    BoundedFloatAttribute, \
+    CompactObservationSet, \
+    CompactFeatureSet, \
     merge_element_set
 
 from api.serializers.observation import ObservationSerializer
-from api.serializers.observation_set import ObservationSetSerializer, NullableObservationSetSerializer
+from api.serializers.observation_set import ObservationSetSerializer, \
+    NullableObservationSetSerializer, \
+    CompactObservationSetSerializer
 from api.serializers.feature import FeatureSerializer
-from api.serializers.feature_set import FeatureSetSerializer, NullableFeatureSetSerializer
+from api.serializers.feature_set import FeatureSetSerializer, \
+    NullableFeatureSetSerializer, \
+    CompactFeatureSetSerializer
 
 class ElementSetTester(object):
     '''
@@ -102,6 +114,46 @@ class ElementSetTester(object):
         testcase.assertEqual(len(int_set), 1)
         testcase.assertEqual(int_set.elements, set([testcase.el2]))
 
+    def test_multi_set_operations(self, testcase):
+        '''
+        The n-ary intersection/union give the same results as
+        successive pairwise operations.
+        '''
+        element_set1 = self.element_set_class([testcase.el1, testcase.el2])
+        element_set2 = self.element_set_class([testcase.el2, testcase.el3])
+        element_set3 = self.element_set_class([testcase.el2])
+        element_sets = [element_set1, element_set2, element_set3]
+
+        int_set = self.element_set_class.multi_set_intersection(element_sets)
+        testcase.assertEqual(int_set.elements, set([testcase.el2]))
+        testcase.assertEqual(int_set, 
+            element_set1.set_intersection(element_set2).set_intersection(element_set3))
+
+        union_set = self.element_set_class.multi_set_union(element_sets)
+        testcase.assertEqual(union_set.elements, 
+            set([testcase.el1, testcase.el2, testcase.el3]))
+        testcase.assertEqual(union_set, 
+            element_set1.set_union(element_set2).set_union(element_set3))
+        for el in union_set.elements:
+            original_el = [x for x in [testcase.el1, testcase.el2, testcase.el3] if x.id == el.id][0]
+            testcase.assertEqual(el.attributes, original_el.attributes)
+
+        # the duplicate element has no attributes, so it merges
+        # with the attributes of its namesake
+        element_set4 = self.element_set_class([testcase.duplicate_element])
+        int_set = self.element_set_class.multi_set_intersection(
+            [element_set1, element_set4])
+        testcase.assertEqual(list(int_set.elements)[0].attributes, testcase.el1.attributes)
+
+        # conflicting attributes are rejected
+        element_set5 = self.element_set_class([testcase.el1])
+        element_set6 = self.element_set_class([testcase.el1.__class__(
+            testcase.el1.id, testcase.el2.attributes)])
+        with testcase.assertRaises(ValidationError):
+            self.element_set_class.multi_set_intersection([element_set5, element_set6])
+        with testcase.assertRaises(ValidationError):
+            self.element_set_class.multi_set_union([element_set5, element_set6])
+
     def test_element_set_merge(self, testcase):
         element_list1 = [testcase.el1, testcase.el2]
         element_list2 = [testcase.el3]
@@ -211,6 +263,111 @@ class TestFeatureSet(unittest.TestCase):
             m(self)
 
 
+class TestCompactObservationSet(TestObservationSet):
+    '''
+    Runs the same tests as for the ObservationSet, but using the
+    compact implementation
+    '''
+    def setUp(self):
+        super().setUp()
+        self.tester_class = ElementSetTester(CompactObservationSet)
+
+
+class TestCompactFeatureSet(TestFeatureSet):
+    def setUp(self):
+        super().setUp()
+        self.tester_class = ElementSetTester(CompactFeatureSet)
+
+
+class TestCompactElementSetStorage(unittest.TestCase):
+
+    def setUp(self):
+        self.elements = [
+            Feature('geneA', {
+                'count': IntegerAttribute(3),
+                'pval': BoundedFloatAttribute(0.01, min=0, max=1),
+                'symbol': StringAttribute('ABC')
+            }),
+            Feature('geneB', {
+                'count': IntegerAttribute(5),
+                'pval': BoundedFloatAttribute(0.2, min=0, max=1),
+            }),
+            Feature('geneC', {
+                'count': FloatAttribute(5.5),
+                'symbol': StringAttribute('XYZ')
+            })
+        ]
+
+    def test_columns(self):
+        '''
+        Attributes which share a type are kept as arrays of values and
+        the elements have the same attributes as the originals.
+        '''
+        f_set = CompactFeatureSet(self.elements)
+        self.assertEqual(f_set._columns['pval'].values.dtype, np.float64)
+        self.assertEqual(f_set._columns['symbol'].values.dtype, object)
+        # mixed integer/float attributes
+        self.assertIsNone(f_set._columns['count'].template)
+
+        self.assertEqual(len(f_set), 3)
+        self.assertEqual(f_set, FeatureSet(self.elements))
+        for el in self.elements:
+            compact_el = f_set._element_map[el.id]
+            self.assertEqual(compact_el.attributes, el.attributes)
+            self.assertEqual(compact_el.to_dict(), el.to_dict())
+            self.assertTrue(type(compact_el.attributes['count'].value) is 
+                type(el.attributes['count'].value))
+
+        s1 = FeatureSetSerializer(FeatureSet(self.elements)).data
+        s2 = FeatureSetSerializer(f_set).data
+        self.assertCountEqual(
+            [dict(x) for x in s1['elements']], 
+            [dict(x) for x in s2['elements']]
+        )
+
+    def test_copy_on_write(self):
+        '''
+        Changes to the attributes of an element do not affect
+        other sets created from the same elements.
+        '''
+        f_set = CompactFeatureSet(self.elements)
+        diff_set = f_set.set_difference(FeatureSet([self.elements[2]]))
+        el = diff_set._element_map['geneB']
+        el.add_attribute('symbol', {'attribute_type': 'String', 'value': 'DEF'})
+        self.assertEqual(el.attributes['symbol'].value, 'DEF')
+        self.assertFalse('symbol' in f_set._element_map['geneB'].attributes)
+        with self.assertRaises(ValidationError):
+            el.add_attribute('symbol', {'attribute_type': 'String', 'value': 'GHI'})
+
+        # modifying the returned attributes does nothing:
+        el.attributes['count'].value = 100
+        self.assertEqual(el.attributes['count'].value, 5)
+
+        # the modified attributes are kept in subsequent operations
+        int_set = diff_set.set_intersection(f_set)
+        self.assertEqual(int_set._element_map['geneB'].attributes['symbol'].value, 'DEF')
+        with self.assertRaises(ValidationError):
+            diff_set.set_union(FeatureSet([Feature('geneB', {
+                'symbol': StringAttribute('GHI')})]))
+
+    def test_add_element_and_merge(self):
+        f_set = CompactFeatureSet(self.elements[:2])
+        f_set.add_element(self.elements[2])
+        self.assertEqual(f_set, FeatureSet(self.elements))
+        self.assertEqual(f_set._element_map['geneC'].attributes, 
+            self.elements[2].attributes)
+        with self.assertRaises(ValidationError):
+            f_set.add_element(Feature('geneC'))
+
+        # compact and standard sets of the same element type can be merged
+        new_feature = Feature('geneD')
+        merged_set = merge_element_set([f_set, FeatureSet([new_feature])])
+        self.assertTrue(type(merged_set) is CompactFeatureSet)
+        self.assertEqual(merged_set, FeatureSet(self.elements + [new_feature]))
+        with self.assertRaises(Exception):
+            merge_element_set([f_set, ObservationSet([Observation('geneD')])])
+
+
 class ElementSetSerializerTester(object):
     '''
     The idea here is that we have very similar "base"
@@ -502,4 +659,31 @@ class TestFeatureSetSerializer(unittest.TestCase):
         self.assertFalse(s.is_valid())
 
         s = NullableFeatureSetSerializer(data=data)
-        self.assertTrue(s.is_valid())
\ No newline at end of file
+        self.assertTrue(s.is_valid())
+
+
+class TestCompactObservationSetSerializer(TestObservationSetSerializer):
+    def setUp(self):
+        super().setUp()
+        self.element_set = CompactObservationSet([self.el1, self.el2])
+        self.tester_class = ElementSetSerializerTester(CompactObservationSetSerializer)
+
+
+class TestCompactFeatureSetSerializer(TestFeatureSetSerializer):
+    def setUp(self):
+        super().setUp()
+        self.element_set = CompactFeatureSet([self.el1, self.el2])
+        self.tester_class = ElementSetSerializerTester(CompactFeatureSetSerializer)
+
+    def test_features_not_created_on_deserialization(self):
+        '''
+        The compact set is built directly from the validated data,
+        without creating a Feature for each element.
+        '''
+        data = FeatureSetSerializer(self.element_set).data
+        with mock.patch('api.serializers.feature.Feature') as mock_feature:
+            f_set = CompactFeatureSetSerializer(data=data).get_instance()
+            mock_feature.assert_not_called()
+        self.assertTrue(type(f_set) is CompactFeatureSet)
+        self.assertEqual(f_set, self.element_set)
+        self.assertCountEqual(FeatureSetSerializer(f_set).data['elements'], data['elements'])
@@ -1,10 +1,16 @@
 import unittest
+import unittest.mock as mock
 import os
+import tempfile
 
 import pandas as pd
 import numpy as np
 
-from resource_types import RESOURCE_MAPPING
+from django.conf import settings
+from django.core.cache import cache
+
+from resource_types import RESOURCE_MAPPING, ParseException
+from api.tests.base import remove_with_sidecars
 
 TESTDIR = os.path.dirname(__file__)
 TESTDIR = os.path.join(TESTDIR, 'resource_validation_test_files')
@@ -15,6 +21,21 @@ class TestResourcePreview(unittest.TestCase):
     format.
     '''
 
+    def setUp(self):
+        # results of previous filters/sorts are cached by file
+        cache.clear()
+
+    def write_temp_table(self, df):
+        '''
+        Writes `df` to a temporary TSV file, which (along with any sidecars)
+        is removed when the test finishes. Returns the path.
+        '''
+        fd, path = tempfile.mkstemp(suffix='.tsv')
+        os.close(fd)
+        self.addCleanup(remove_with_sidecars, path)
+        df.to_csv(path, sep='\t')
+        return path
+
     def test_table_preview(self):
         '''
         Tests that the returned preview has the expected format.
@@ -48,4 +69,176 @@ class TestResourcePreview(unittest.TestCase):
         mtx_class = RESOURCE_MAPPING['MTX']
         mtx_type = mtx_class()
         with self.assertRaises(Exception):
-            mtx_type.get_contents(path)
\ No newline at end of file
+            mtx_type.get_contents(path)
+
+    def test_table_contents_serialized_by_page(self):
+        '''
+        The contents are "lazy" and only the requested rows are
+        converted into serializable dicts.
+        '''
+        df = pd.DataFrame(
+            {'colA': np.arange(10, dtype=float), 'colB': np.arange(10)},
+            index=['gene%d' % i for i in range(10)]
+        )
+        df.loc['gene3', 'colA'] = np.nan
+        df.loc['gene4', 'colA'] = np.inf
+        path = self.write_temp_table(df)
+
+        mtx_type = RESOURCE_MAPPING['MTX']()
+        contents = mtx_type.get_contents(path)
+        self.assertEqual(len(contents), 10)
+
+        # count the converted rows with a plain function since pandas
+        # treats a mock passed to `DataFrame.apply` as a list of functions
+        converted_rows = []
+        original_converter = mtx_type.main_contents_converter
+        def counting_converter(row):
+            converted_rows.append(row.name)
+            return original_converter(row)
+
+        with mock.patch.object(mtx_type, 'main_contents_converter', counting_converter):
+            page = contents[2:5]
+        self.assertEqual(converted_rows, ['gene2', 'gene3', 'gene4'])
+
+        self.assertEqual([x['rowname'] for x in page], ['gene2', 'gene3', 'gene4'])
+        self.assertIsNone(page[1]['values']['colA'])
+        self.assertEqual(page[2]['values']['colA'], settings.POSITIVE_INF_MARKER)
+        self.assertEqual(contents[-1]['rowname'], 'gene9')
+        self.assertEqual(len(contents.tolist()), 10)
+        self.assertEqual(list(contents), contents.tolist())
+
+    def test_filter_and_sort_results_cached(self):
+        '''
+        Repeated requests with the same filter/sort (e.g. for
+        successive pages) use the cached row positions.
+        '''
+        df = pd.DataFrame(
+            {'colA': [5, 1, 4, 2, 3], 'colB': [0, 1, 0, 1, 1]},
+            index=['geneA', 'geneB', 'geneC', 'geneD', 'geneE']
+        )
+        path = self.write_temp_table(df)
+        query_params = {
+            'colB': '[eq]:1',
+            settings.SORT_PARAM: '[desc]:colA',
+            settings.PAGE_PARAM: '1'
+        }
+        mtx_type = RESOURCE_MAPPING['MTX']()
+        contents = mtx_type.get_contents(path, query_params)
+        expected = ['geneE', 'geneD', 'geneB']
+        self.assertEqual([x['rowname'] for x in contents], expected)
+
+        # the page param does not affect which rows are returned:
+        query_params[settings.PAGE_PARAM] = '2'
+        mtx_type = RESOURCE_MAPPING['MTX']()
+        with mock.patch.object(mtx_type, 'filter_against_query_params') as mock_filter:
+            with mock.patch.object(mtx_type, 'perform_sorting') as mock_sort:
+                contents = mtx_type.get_contents(path, query_params)
+                mock_filter.assert_not_called()
+                mock_sort.assert_not_called()
+        self.assertEqual([x['rowname'] for x in contents], expected)
+
+    def test_partial_sort_matches_full_sort(self):
+        '''
+        When only the first page(s) of a sorted table are requested,
+        we only partially sort. Check that those rows are identical to
+        the full sort, including for ties and NaNs.
+        '''
+        np.random.seed(0)
+        N = 200
+        df = pd.DataFrame({
+                'colA': np.random.randint(0, 10, size=N).astype(float),
+                'colB': np.random.random(size=N)
+            },
+            index=['gene%d' % i for i in range(N)]
+        )
+        df.loc[df.index[::7], 'colA'] = np.nan
+        sort_strings = ['[asc]:colA,[desc]:colB', '[desc]:colA,[asc]:colB', '[asc]:colB']
+        for sort_str in sort_strings:
+            for page in [1, 2, 8]:
+                query_params = {
+                    settings.SORT_PARAM: sort_str,
+                    settings.PAGE_PARAM: page,
+                    settings.PAGE_SIZE_PARAM: 20
+                }
+                t = RESOURCE_MAPPING['MTX']()
+                t.table = df.copy()
+                t.perform_sorting(query_params)
+
+                full = RESOURCE_MAPPING['MTX']()
+                full.table = df.copy()
+                full.perform_sorting({settings.SORT_PARAM: sort_str})
+
+                n = page * 20
+                self.assertEqual(t.table.shape, df.shape)
+                self.assertEqual(t.table.index[:n].tolist(), full.table.index[:n].tolist())
+
+    def test_column_projection(self):
+        '''
+        Only the requested columns are read and returned, although
+        columns used for filtering and sorting are also read.
+        '''
+        df = pd.DataFrame(
+            {
+                'colA': [5, 1, 4, 2, 3], 
+                'colB': [0.1, 0.2, 0.3, 0.4, 0.5],
+                'colC': [10, 20, 30, 40, 50],
+                'colD': [0, 1, 0, 1, 1]
+            },
+            index=['geneA', 'geneB', 'geneC', 'geneD', 'geneE']
+        )
+        path = self.write_temp_table(df)
+        query_params = {
+            settings.COLUMN_PROJECTION_PARAM: 'colC',
+            'colD': '[eq]:1',
+            settings.SORT_PARAM: '[desc]:colA'
+        }
+        mtx_type = RESOURCE_MAPPING['MTX']()
+        with mock.patch('resource_types.table_types.pd.read_table', 
+            wraps=pd.read_table) as mock_reader:
+            contents = mtx_type.get_contents(path, query_params)
+            mock_reader.assert_called_with(path, index_col=0, comment='#', usecols=[0,1,3,4])
+        self.assertEqual(mtx_type.table.shape[1], 3)
+        self.assertEqual(contents.tolist(), [
+            {'rowname': 'geneE', 'values': {'colC': 50}},
+            {'rowname': 'geneD', 'values': {'colC': 40}},
+            {'rowname': 'geneB', 'values': {'colC': 20}},
+        ])
+
+        # without the filter and sort, only the requested columns are read
+        mtx_type = RESOURCE_MAPPING['MTX']()
+        contents = mtx_type.get_contents(path, {settings.COLUMN_PROJECTION_PARAM: 'colB'})
+        self.assertEqual(mtx_type.table.columns.tolist(), ['colB'])
+        self.assertEqual(contents[0], {'rowname': 'geneA', 'values': {'colB': 0.1}})
+
+        # requesting a column that does not exist is an error
+        mtx_type = RESOURCE_MAPPING['MTX']()
+        with self.assertRaises(ParseException):
+            mtx_type.get_contents(path, {settings.COLUMN_PROJECTION_PARAM: 'colB,colX'})
+
+    def test_column_projection_with_short_header(self):
+        '''
+        If the header does not have a label for the row names 
+        (one fewer field than the rows), the projected columns
+        still have the correct values.
+        '''
+        path = os.path.join(os.path.dirname(__file__), 
+            'resource_contents_test_files', 'rowmeans_test_file.tsv')
+        full = RESOURCE_MAPPING['MTX']()
+        full.read_resource(path)
+        mtx_type = RESOURCE_MAPPING['MTX']()
+        mtx_type.read_resource(path, columns=['sC', 'sA'])
+        self.assertCountEqual(mtx_type.table.columns.tolist(), ['sA', 'sC'])
+        pd.testing.assert_frame_equal(mtx_type.table[['sC', 'sA']], full.table[['sC', 'sA']])
+
+    def test_submatrix_with_short_header(self):
+        '''
+        The sub-matrix has the values of the requested rows/columns
+        (in the requested order) when the header has no label for the row names.
+        '''
+        path = os.path.join(os.path.dirname(__file__), 
+            'resource_contents_test_files', 'rowmeans_test_file.tsv')
+        mtx_type = RESOURCE_MAPPING['MTX']()
+        table = mtx_type.get_submatrix(path, rows=['g3', 'g1'], columns=['sC', 'sA'])
+        self.assertEqual(table.index.tolist(), ['g3', 'g1'])
+        self.assertEqual(table.columns.tolist(), ['sC', 'sA'])
+        self.assertEqual(table.values.tolist(), [[22, 20], [2, 0]])
@@ -33,11 +33,13 @@ from api.utilities.resource_utilities import move_resource_to_final_location, \
     check_extension, \
     add_metadata_to_resource, \
     get_resource_by_pk, \
-    write_resource
+    write_resource, \
+    store_resource_sidecars, \
+    localize_resource_sidecars
 from api.utilities.operations import read_operation_json, \
     check_for_resource_operations
 from api.exceptions import NoResourceFoundException
-from api.tests.base import BaseAPITestCase
+from api.tests.base import BaseAPITestCase, copy_to_temp_file
 from api.tests import test_settings
 
 BASE_TESTDIR = os.path.dirname(__file__)
@@ -666,7 +668,8 @@ class TestResourceUtilities(BaseAPITestCase):
         a file was initially set to a general type (and thus the metadata was effectively empty).
         After trying to validate it as an annotation type, it was raising json serializer errors.
         '''
-        resource_path = os.path.join(VAL_TESTDIR, 'test_annotation_valid.tsv')
+        # validating standardizes the file (and writes sidecars) in place
+        resource_path = copy_to_temp_file(self, os.path.join(VAL_TESTDIR, 'test_annotation_valid.tsv'))
         mock_move_resource_to_final_location.return_value = resource_path
 
         mock_f = mock.MagicMock()
@@ -690,7 +693,8 @@ class TestResourceUtilities(BaseAPITestCase):
     @mock.patch('api.utilities.resource_utilities.move_resource_to_final_location')
     @mock.patch('api.utilities.resource_utilities.get_storage_backend')
     def test_metadata_when_type_changed_case2(self, mock_get_storage_backend, mock_move_resource_to_final_location):
-        resource_path = os.path.join(VAL_TESTDIR, 'test_matrix.tsv')
+        # validating standardizes the file (and writes sidecars) in place
+        resource_path = copy_to_temp_file(self, os.path.join(VAL_TESTDIR, 'test_matrix.tsv'))
         mock_move_resource_to_final_location.return_value = resource_path
 
         mock_f = mock.MagicMock()
@@ -713,4 +717,41 @@ class TestResourceUtilities(BaseAPITestCase):
         obs_set = rm.observation_set
         samples = [x['id'] for x in obs_set['elements']]
         expected = ['SW1_Control','SW2_Control','SW3_Control','SW4_Treated','SW5_Treated','SW6_Treated']
-        self.assertCountEqual(samples, expected)
\ No newline at end of file
+        self.assertCountEqual(samples, expected)
+
+    @mock.patch('api.utilities.resource_utilities.get_storage_backend')
+    def test_only_stored_sidecars_are_localized(self, mock_get_storage_backend):
+        '''
+        The sidecars that were stored at validation are recorded on the 
+        resource and only those are requested from the storage backend.
+        '''
+        mock_storage_backend = mock.MagicMock()
+        mock_get_storage_backend.return_value = mock_storage_backend
+        mtx_type = RESOURCE_MAPPING['MTX']()
+        local_path = '/tmp/{u}.tsv'.format(u=uuid.uuid4())
+        stored_suffix = mtx_type.SIDECAR_SUFFIXES[0]
+        sidecar_path = mtx_type.get_sidecar_path(local_path, stored_suffix)
+        with open(sidecar_path, 'w') as fout:
+            fout.write('')
+
+        r = Resource.objects.create(
+            name = 'foo.tsv',
+            owner = self.regular_user_1,
+            is_active=True,
+            path = local_path,
+            resource_type = 'MTX'
+        )
+        store_resource_sidecars(r, local_path, mtx_type)
+        os.remove(sidecar_path)
+        mock_storage_backend.store_sidecar.assert_called_once_with(r, sidecar_path, stored_suffix)
+        self.assertEqual(r.sidecars, stored_suffix)
+
+        localize_resource_sidecars(r)
+        mock_storage_backend.get_local_sidecar_path.assert_called_once_with(r, stored_suffix)
+
+        # resources without any recorded sidecars (e.g. validated before
+        # the sidecars existed) do not query the storage
+        mock_storage_backend.reset_mock()
+        r.sidecars = ''
+        localize_resource_sidecars(r)
+        mock_storage_backend.get_local_sidecar_path.assert_not_called()
@@ -1,7 +1,12 @@
 import unittest
 import os
+import uuid
+import shutil
 
+import numpy as np
 import pandas as pd
+from django.test import override_settings
+
 from resource_types.table_types import TableResource, \
     Matrix, \
     IntegerMatrix, \
@@ -97,6 +102,43 @@ class TestBasicTable(unittest.TestCase):
         self.assertIsNone(err)
 
 
+    def test_pyarrow_engine_matches_pandas(self):
+        '''
+        The pyarrow engine gives the same table as pandas, and
+        declines files which it would parse differently (e.g. those
+        with comment lines)
+        '''
+        for f in ['test_matrix.tsv', 'test_integer_matrix.csv', 
+            'test_integer_matrix.with_na.csv', 'test_integer_matrix.no_gene_label.tsv']:
+            p = os.path.join(TESTDIR, f)
+            reader = TableResource.get_reader(p)
+            table = TableResource.read_with_pyarrow(p)
+            self.assertIsNotNone(table)
+            pd.testing.assert_frame_equal(table, reader(p, index_col=0, comment='#'))
+
+        p = os.path.join(TESTDIR, 'test_general_table.with_comment.tsv')
+        self.assertIsNone(TableResource.read_with_pyarrow(p))
+        with override_settings(TABLE_READ_ENGINE='pyarrow'):
+            t = TableResource()
+            t.read_resource(p)
+        pd.testing.assert_frame_equal(t.table, pd.read_table(p, index_col=0, comment='#'))
+
+        # an inline comment beyond the rows compared with pandas
+        df = pd.DataFrame(np.arange(600).reshape((200,3)), 
+            index=['g%d' % i for i in range(200)],
+            columns=['colA', 'colB', 'colC'])
+        p = '/tmp/{u}.tsv'.format(u=uuid.uuid4())
+        df.to_csv(p, sep='\t')
+        with open(p, 'a') as fout:
+            fout.write('gX\t1\t2\t3 # some note\n')
+        self.addCleanup(os.remove, p)
+        self.assertIsNone(TableResource.read_with_pyarrow(p))
+        with override_settings(TABLE_READ_ENGINE='pyarrow'):
+            t = TableResource()
+            t.read_resource(p)
+        pd.testing.assert_frame_equal(t.table, pd.read_table(p, index_col=0, comment='#'))
+
+
 class TestMatrix(unittest.TestCase):
     '''
     Tests tables where all entries must be numeric
@@ -342,6 +384,28 @@ class TestIntegerMatrix(unittest.TestCase):
         self.assertFalse(is_valid)
 
 
+    def test_integer_check_with_na(self):
+        '''
+        Columns parsed as floats (due to missing values) are accepted
+        only if all the other values are integers, including negative
+        integers. Values with a fractional part (even if they "start" like
+        an integer, e.g. 2.05) are rejected.
+        '''
+        m = IntegerMatrix()
+        table = pd.DataFrame({
+            'colA': [1, 2, 3],
+            'colB': [-2.0, np.nan, 5.0],
+            'colC': [2.05, np.nan, 1.0],
+            'colD': [1.0, np.inf, np.nan],
+        }, index=['gA', 'gB', 'gC'])
+        self.assertEqual(m.get_non_integer_columns(table), [('colC', 3), ('colD', 4)])
+
+    def test_index_all_numbers(self):
+        self.assertTrue(TableResource.index_all_numbers(pd.Index([1, 2, 3])))
+        self.assertTrue(TableResource.index_all_numbers(['1', '2a']))
+        self.assertFalse(TableResource.index_all_numbers(['1', 'a2']))
+        self.assertFalse(TableResource.index_all_numbers(pd.Index(['gA', np.nan])))
+
 class TestAnnotationMatrix(unittest.TestCase):
 
     def test_table_without_header(self):
@@ -401,6 +465,63 @@ class TestAnnotationMatrix(unittest.TestCase):
         with self.assertRaises(Exception):
             t.extract_metadata(p)
 
+class TestChunkedValidation(unittest.TestCase):
+    '''
+    Tests that validating large files in chunks gives the same
+    results as validating the full table. We set the thresholds
+    so that the test files are "large".
+    '''
+
+    def _validate_both_ways(self, resource_class, filename):
+        p = os.path.join(TESTDIR, filename)
+        r = resource_class()
+        expected = r.validate_type(p)
+        self.assertFalse(r.validated_in_chunks)
+
+        with override_settings(CHUNKED_VALIDATION_THRESHOLD_BYTES=0,
+            TABLE_VALIDATION_MEMORY_CEILING_BYTES=1):
+            r = resource_class()
+            result = r.validate_type(p)
+            self.assertTrue(r.validated_in_chunks)
+            self.assertIsNone(r.table)
+        self.assertEqual(result, expected)
+
+    def test_chunked_validation_matches_full_validation(self):
+        self._validate_both_ways(Matrix, 'test_matrix.tsv')
+        self._validate_both_ways(Matrix, 'test_matrix.duplicate_rownames.tsv')
+        self._validate_both_ways(Matrix, 'test_integer_matrix.no_rownames.tsv')
+        self._validate_both_ways(Matrix, 'test_integer_matrix.no_header.tsv')
+        self._validate_both_ways(IntegerMatrix, 'test_integer_matrix.tsv')
+        self._validate_both_ways(IntegerMatrix, 'test_matrix.tsv')
+        self._validate_both_ways(IntegerMatrix, 'test_integer_matrix.with_na.csv')
+        self._validate_both_ways(IntegerMatrix, 'test_integer_matrix.with_na_and_float.csv')
+
+    def test_chunked_standardization(self):
+        '''
+        The table is written in the standardized format without
+        loading the entire table
+        '''
+        # work on a copy, since standardizing writes next to the original
+        # and would overwrite the tracked TSV fixture
+        p = '/tmp/{u}.csv'.format(u=uuid.uuid4())
+        shutil.copy(os.path.join(TESTDIR, 'test_integer_matrix.csv'), p)
+        expected = pd.read_csv(p, index_col=0)
+        with override_settings(CHUNKED_VALIDATION_THRESHOLD_BYTES=0,
+            TABLE_VALIDATION_MEMORY_CEILING_BYTES=1):
+            m = IntegerMatrix()
+            is_valid, err = m.validate_type(p)
+            self.assertTrue(is_valid)
+            new_path, new_name = m.save_in_standardized_format(p, 'foo.csv')
+        try:
+            self.assertEqual(new_name, 'foo.tsv')
+            result = pd.read_table(new_path, index_col=0)
+            pd.testing.assert_frame_equal(result, expected)
+        finally:
+            for x in [p, new_path] + [m.get_sidecar_path(new_path, y) 
+                for y in m.SIDECAR_SUFFIXES]:
+                if os.path.exists(x):
+                    os.remove(x)
+
 class TestBed(unittest.TestCase):
 
     def test_bed_without_header_fails(self):
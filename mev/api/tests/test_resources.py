@@ -1,7 +1,11 @@
 import uuid
 import os
 import json
+import struct
 import unittest.mock as mock
+from urllib.parse import urlparse, parse_qs
+
+import numpy as np
 
 from django.urls import reverse
 from django.core.exceptions import ImproperlyConfigured
@@ -2275,6 +2279,194 @@ class ResourceContentTests(BaseAPITestCase):
         results = response.json()['results']
         self.assertTrue(len(results) == 12)
 
+    @mock.patch('api.views.resource_views.ResourceContents.check_request_validity')
+    @mock.patch('api.utilities.resource_utilities.get_storage_backend')
+    def test_large_contents_streamed(self, mock_get_storage_backend, mock_check_request_validity):
+        '''
+        Unpaginated contents with many records are streamed. The
+        streamed payload is the same as the non-streamed response.
+        '''
+        f = os.path.join(self.TESTDIR, 'rowmeans_test_file.tsv')
+        self.resource.path = f
+        self.resource.resource_type = HUMAN_READABLE_TO_DB_STRINGS['Numeric table']
+        self.resource.save()
+        mock_check_request_validity.return_value = self.resource
+        mock_storage_backend = mock.MagicMock()
+        mock_storage_backend.get_local_resource_path.return_value = f
+        mock_get_storage_backend.return_value = mock_storage_backend
+
+        url = reverse(
+            'resource-contents', 
+            kwargs={'pk':self.resource.pk}
+        ) + '?__incl_rowmeans__&sort_vals=[desc]:__rowmean__'
+        response = self.authenticated_regular_client.get(
+            url, format='json'
+        )
+        self.assertEqual(response.status_code, 
+            status.HTTP_200_OK)
+        self.assertFalse(response.streaming)
+        expected_results = response.json()
+
+        with self.settings(STREAMING_CONTENTS_MIN_RECORDS=0, STREAMING_CONTENTS_BATCH_SIZE=5):
+            response = self.authenticated_regular_client.get(
+                url, format='json'
+            )
+        self.assertEqual(response.status_code, 
+            status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        results = json.loads(b''.join(response.streaming_content))
+        self.assertEqual(results, expected_results)
+
+        # paginated responses are not streamed
+        with self.settings(STREAMING_CONTENTS_MIN_RECORDS=0):
+            response = self.authenticated_regular_client.get(
+                url + '&page=1&page_size=5', format='json'
+            )
+        self.assertFalse(response.streaming)
+        self.assertEqual(response.json()['results'], expected_results[:5])
+
+    @mock.patch('api.views.resource_views.ResourceContents.check_request_validity')
+    @mock.patch('api.utilities.resource_utilities.get_storage_backend')
+    def test_cursor_pagination(self, mock_get_storage_backend, mock_check_request_validity):
+        '''
+        Following the "next" links of the cursor-based pagination returns
+        all the records, in the same order as the unpaginated request.
+        '''
+        f = os.path.join(self.TESTDIR, 'rowmeans_test_file.tsv')
+        self.resource.path = f
+        self.resource.resource_type = HUMAN_READABLE_TO_DB_STRINGS['Numeric table']
+        self.resource.save()
+        mock_check_request_validity.return_value = self.resource
+        mock_storage_backend = mock.MagicMock()
+        mock_storage_backend.get_local_resource_path.return_value = f
+        mock_get_storage_backend.return_value = mock_storage_backend
+
+        base_url = reverse(
+            'resource-contents',
+            kwargs={'pk':self.resource.pk}
+        )
+        url = base_url + '?__incl_rowmeans__&sort_vals=[desc]:__rowmean__'
+        response = self.authenticated_regular_client.get(
+            url, format='json'
+        )
+        expected_results = response.json()
+
+        url = url + '&page_size=5&cursor='
+        results = []
+        num_pages = 0
+        cursor = None
+        while url is not None:
+            response = self.authenticated_regular_client.get(
+                url, format='json'
+            )
+            self.assertEqual(response.status_code,
+                status.HTTP_200_OK)
+            j = response.json()
+            self.assertFalse('count' in j)
+            if num_pages == 0:
+                self.assertIsNone(j['previous'])
+            else:
+                self.assertIsNotNone(j['previous'])
+            self.assertTrue(len(j['results']) <= 5)
+            results.extend(j['results'])
+            num_pages += 1
+            url = j['next']
+            if url is not None:
+                cursor = parse_qs(urlparse(url).query)['cursor'][0]
+        self.assertEqual(results, expected_results)
+        self.assertEqual(num_pages, -(-len(expected_results) // 5))
+
+        # a cursor cannot be used with a different filter/sort:
+        response = self.authenticated_regular_client.get(
+            base_url + '?page_size=5&cursor=' + cursor,
+            format='json'
+        )
+        self.assertEqual(response.status_code,
+            status.HTTP_400_BAD_REQUEST)
+
+        # nor can a malformed cursor
+        response = self.authenticated_regular_client.get(
+            base_url + '?cursor=abc',
+            format='json'
+        )
+        self.assertEqual(response.status_code,
+            status.HTTP_400_BAD_REQUEST)
+
+    @mock.patch('api.utilities.resource_utilities.get_storage_backend')
+    def test_submatrix(self, mock_get_storage_backend):
+        '''
+        Tests that we return the requested rows/columns of a matrix
+        as a dense binary array.
+        '''
+        f = os.path.join(self.TESTDIR, 'rowmeans_test_file.tsv')
+        self.resource.path = f
+        self.resource.resource_type = HUMAN_READABLE_TO_DB_STRINGS['Numeric table']
+        self.resource.save()
+        mock_storage_backend = mock.MagicMock()
+        mock_storage_backend.get_local_resource_path.return_value = f
+        mock_get_storage_backend.return_value = mock_storage_backend
+
+        url = reverse(
+            'resource-submatrix',
+            kwargs={'pk':self.resource.pk}
+        )
+        payload = {
+            'rows': ['g3', 'g1'],
+            'columns': {
+                'multiple': True,
+                'elements': [{'id': 'sC'}, {'id': 'sA'}]
+            }
+        }
+        response = self.authenticated_regular_client.post(
+            url, data=payload, format='json'
+        )
+        self.assertEqual(response.status_code,
+            status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/octet-stream')
+        content = response.content
+        header_length = struct.unpack('<I', content[:4])[0]
+        self.assertEqual((4 + header_length) % 4, 0)
+        header = json.loads(content[4:4 + header_length])
+        self.assertEqual(header['rows'], ['g3', 'g1'])
+        self.assertEqual(header['columns'], ['sC', 'sA'])
+        self.assertEqual(header['shape'], [2, 2])
+        values = np.frombuffer(content[4 + header_length:], dtype=header['dtype'])
+        self.assertTrue(np.allclose(values.reshape(header['shape']),
+            np.array([[22, 20], [2, 0]])))
+
+        # all the columns are returned if they are not given
+        response = self.authenticated_regular_client.post(
+            url, data={'rows': ['g2']}, format='json'
+        )
+        self.assertEqual(response.status_code,
+            status.HTTP_200_OK)
+        header_length = struct.unpack('<I', response.content[:4])[0]
+        header = json.loads(response.content[4:4 + header_length])
+        self.assertEqual(header['columns'], ['sA', 'sB', 'sC'])
+        values = np.frombuffer(response.content[4 + header_length:], dtype=header['dtype'])
+        self.assertTrue(np.allclose(values, [10, 11, 12]))
+
+        # unknown rows/columns are rejected
+        response = self.authenticated_regular_client.post(
+            url, data={'rows': ['g1', 'junk']}, format='json'
+        )
+        self.assertEqual(response.status_code,
+            status.HTTP_400_BAD_REQUEST)
+        response = self.authenticated_regular_client.post(
+            url, data={'columns': ['junk']}, format='json'
+        )
+        self.assertEqual(response.status_code,
+            status.HTTP_400_BAD_REQUEST)
+
+        # as are resources which are not matrices
+        self.resource.resource_type = HUMAN_READABLE_TO_DB_STRINGS['Annotation table']
+        self.resource.save()
+        response = self.authenticated_regular_client.post(
+            url, data={'rows': ['g1']}, format='json'
+        )
+        self.assertEqual(response.status_code,
+            status.HTTP_400_BAD_REQUEST)
+
     @mock.patch('api.views.resource_views.ResourceContents.check_request_validity')
     @mock.patch('api.utilities.resource_utilities.get_storage_backend')
     def test_matrix_specific_content_requests_with_na_and_infty(self, mock_get_storage_backend, mock_check_request_validity):
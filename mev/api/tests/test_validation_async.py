@@ -19,7 +19,7 @@ from resource_types import RESOURCE_MAPPING, \
 from resource_types.base import DataResource
     
 from api.utilities.resource_utilities import handle_valid_resource
-from api.tests.base import BaseAPITestCase
+from api.tests.base import BaseAPITestCase, copy_to_temp_file
 from resource_types import get_resource_type_instance
 
 from api.exceptions import NoResourceFoundException
@@ -371,7 +371,8 @@ class TestValidateResource(BaseAPITestCase):
         and tied to the appropriate resource.
         '''
         # create a Resource and give it our test integer matrix
-        resource_path = os.path.join(TESTDIR, 'test_integer_matrix.tsv')
+        # validating standardizes the file (and writes sidecars) in place
+        resource_path = copy_to_temp_file(self, os.path.join(TESTDIR, 'test_integer_matrix.tsv'))
 
         # note that we can't mock the class implementing the resource type, as
         # we need its implementation to get the metadata. HOWEVER, we need to ensure
@@ -424,7 +425,8 @@ class TestValidateResource(BaseAPITestCase):
         r = rr[0]
 
         # give that Resource our test integer matrix
-        resource_path = os.path.join(TESTDIR, 'test_integer_matrix.tsv')
+        # validating standardizes the file (and writes sidecars) in place
+        resource_path = copy_to_temp_file(self, os.path.join(TESTDIR, 'test_integer_matrix.tsv'))
         r.path = resource_path
         r.save()
         # note that we can't mock the class implementing the resource type, as
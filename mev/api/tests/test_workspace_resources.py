@@ -1,4 +1,5 @@
 import uuid
+import os
 import unittest.mock as mock
 
 from django.urls import reverse
@@ -7,6 +8,7 @@ from rest_framework import status
 
 from api.models import Resource, Workspace
 from api.tests.base import BaseAPITestCase
+from resource_types import HUMAN_READABLE_TO_DB_STRINGS
 
 
 class WorkspaceResourceListTests(BaseAPITestCase):
@@ -494,4 +496,124 @@ class WorkspaceResourceRemoveTests(BaseAPITestCase):
         current_assoc_workspaces = set([x.pk for x in r.workspaces.all()])
         self.assertEqual(
             original_assoc_workspaces,
-            current_assoc_workspaces)
\ No newline at end of file
+            current_assoc_workspaces)
+
+
+class WorkspaceResourceRowsTests(BaseAPITestCase):
+
+    def setUp(self):
+
+        self.establish_clients()
+        self.TESTDIR = os.path.join(
+            os.path.dirname(__file__),
+            'resource_contents_test_files'    
+        )
+
+        # find a Workspace for the regular user that has at least
+        # two associated Resources
+        self.demo_workspace = None
+        for w in Workspace.objects.filter(owner=self.regular_user_1):
+            if len(w.resources.all()) > 1:
+                self.demo_workspace = w
+                break
+        if self.demo_workspace is None:
+            msg = '''
+                Testing not setup correctly.  Please ensure that there is at least one
+                Workspace for user {user} with multiple Resources.
+            '''.format(user=self.regular_user_1)
+            raise ImproperlyConfigured(msg)
+
+        r1, r2 = self.demo_workspace.resources.all()[:2]
+        r1.path = os.path.join(self.TESTDIR, 'demo_file1.tsv')
+        r1.resource_type = HUMAN_READABLE_TO_DB_STRINGS['Feature table']
+        r1.is_active = True
+        r1.save()
+        r2.path = os.path.join(self.TESTDIR, 'demo_file2.tsv')
+        r2.resource_type = HUMAN_READABLE_TO_DB_STRINGS['Numeric table']
+        r2.is_active = True
+        r2.save()
+        self.resources = [r1, r2]
+
+        self.url = reverse(
+            'workspace-resource-rows', 
+            kwargs={'workspace_pk':self.demo_workspace.pk}
+        )
+
+    @mock.patch('api.utilities.resource_utilities.get_storage_backend')
+    def test_rows_fetched_from_multiple_resources(self, mock_get_storage_backend):
+        '''
+        Tests that the matching rows are returned for each resource
+        '''
+        mock_storage_backend = mock.MagicMock()
+        mock_storage_backend.get_local_resource_path.side_effect = lambda r: r.path
+        mock_get_storage_backend.return_value = mock_storage_backend
+
+        payload = {
+            'resources': [str(x.pk) for x in self.resources],
+            'rows': ['gB', 'gC']
+        }
+        response = self.authenticated_regular_client.post(
+            self.url, data=payload, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        j = response.json()
+        r1_rows = j[str(self.resources[0].pk)]
+        self.assertEqual([x['rowname'] for x in r1_rows], ['gB'])
+        self.assertEqual(r1_rows[0]['values']['overall_mean'], 2.31233128351825)
+        r2_rows = j[str(self.resources[1].pk)]
+        self.assertEqual(r2_rows, [
+            {'rowname': 'gB', 'values': {'colA': 10, 'colB': 11, 'colC': 12}}
+        ])
+
+    @mock.patch('api.utilities.resource_utilities.get_storage_backend')
+    def test_non_table_resource_reports_error(self, mock_get_storage_backend):
+        '''
+        Resources which are not tables report an error, but the rows
+        from the other resources are still returned.
+        '''
+        mock_storage_backend = mock.MagicMock()
+        mock_storage_backend.get_local_resource_path.side_effect = lambda r: r.path
+        mock_get_storage_backend.return_value = mock_storage_backend
+        r1, r2 = self.resources
+        r1.resource_type = HUMAN_READABLE_TO_DB_STRINGS['JSON-format file']
+        r1.save()
+
+        payload = {
+            'resources': [str(x.pk) for x in self.resources],
+            'rows': ['gB']
+        }
+        response = self.authenticated_regular_client.post(
+            self.url, data=payload, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        j = response.json()
+        self.assertTrue('error' in j[str(r1.pk)])
+        self.assertEqual(len(j[str(r2.pk)]), 1)
+
+    def test_bad_requests_rejected(self):
+        '''
+        Tests that we reject malformed requests and those referencing
+        resources which are not in the workspace.
+        '''
+        response = self.authenticated_regular_client.post(
+            self.url, data={'rows': ['gB']}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.authenticated_regular_client.post(
+            self.url, data={'resources': [str(uuid.uuid4())], 'rows': ['gB']}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.authenticated_regular_client.post(
+            self.url, data={'resources': ['abc'], 'rows': ['gB']}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        # other users cannot access the workspace
+        response = self.authenticated_other_client.post(
+            self.url, 
+            data={'resources': [str(self.resources[0].pk)], 'rows': ['gB']}, 
+            format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
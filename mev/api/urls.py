@@ -34,6 +34,7 @@ urlpatterns = [
     path('resources/', api.views.ResourceList.as_view(), name='resource-list'),
     path('resources/<uuid:pk>/', api.views.ResourceDetail.as_view(), name='resource-detail'),
     path('resources/<uuid:pk>/contents/', api.views.ResourceContents.as_view(), name='resource-contents'),
+    path('resources/<uuid:pk>/submatrix/', api.views.ResourceSubmatrix.as_view(), name='resource-submatrix'),
     path('resources/add-bucket-resources/', api.views.AddBucketResourceView.as_view(), name='bucket-resource-add'),
     path('resources/<uuid:pk>/metadata/', api.views.ResourceMetadataView.as_view(), name='resource-metadata-detail'),
     path('resources/<uuid:pk>/metadata/observations/', api.views.ResourceMetadataObservationsView.as_view(), name='resource-metadata-observations'),
@@ -54,6 +55,7 @@ urlpatterns = [
     path('workspaces/<uuid:workspace_pk>/resources/', api.views.WorkspaceResourceList.as_view(), name='workspace-resource-list'),
     path('workspaces/<uuid:workspace_pk>/resources/<uuid:resource_pk>/remove/', api.views.WorkspaceResourceRemove.as_view(), name='workspace-resource-remove'),
     path('workspaces/<uuid:workspace_pk>/resources/add/', api.views.WorkspaceResourceAdd.as_view(), name='workspace-resource-add'),
+    path('workspaces/<uuid:workspace_pk>/resources/rows/', api.views.WorkspaceResourceRows.as_view(), name='workspace-resource-rows'),
 
     # endpoints for working with metadata
     path('workspaces/<uuid:workspace_pk>/metadata/observations/', api.views.WorkspaceMetadataObservationsView.as_view(), name='workspace-observations-metadata'),
@@ -2,10 +2,13 @@ import os
 import uuid
 import json
 import logging
+from concurrent.futures import ThreadPoolExecutor
 
+from django.conf import settings
 from django.utils.module_loading import import_string
 from django.db.utils import OperationalError
 from rest_framework.exceptions import ValidationError
+from rest_framework.utils.encoders import JSONEncoder
 
 from api.models import Resource, ResourceMetadata, ExecutedOperation, OperationResource
 from api.exceptions import AttributeValueError
@@ -28,7 +31,9 @@ from resource_types import get_contents, \
     FEATURE_SET_KEY, \
     RESOURCE_KEY, \
     RESOURCE_TYPES_WITHOUT_CONTENTS_VIEW, \
-    RESOURCE_MAPPING
+    RESOURCE_MAPPING, \
+    ParseException
+from resource_types.table_types import TableResource, Matrix
 from api.exceptions import NoResourceFoundException, \
     InactiveResourceException, \
     OwnershipException
@@ -132,8 +137,190 @@ def get_resource_view(resource_instance, query_params={}):
         return None
     else:
         local_path = get_storage_backend().get_local_resource_path(resource_instance)
+        localize_resource_sidecars(resource_instance)
         return get_contents(local_path, resource_instance.resource_type, query_params)
 
+def get_rows_from_resources(resource_instances, row_names):
+    '''
+    Returns a dict mapping the UUID of each of the `resource_instances`
+    to a list of its rows which are named in `row_names`. 
+
+    The files of the resources are parsed concurrently. These use
+    the same path as the contents endpoint (a row name filter), so any
+    cached tables and row name indexes are used.
+
+    If the rows could not be fetched for a resource (e.g. it is not
+    a table), the value is a dict with an "error" key.
+    '''
+    query_params = {
+        settings.ROWNAME_FILTER: '{op}{d}{v}'.format(
+            op = settings.IS_IN,
+            d = settings.QUERY_PARAM_DELIMITER,
+            v = ','.join(row_names)
+        )
+    }
+
+    # The database and storage lookups (which use the ORM) are performed
+    # here, on the calling thread. The worker threads are only given plain
+    # values (the local path and the resource type) so they only parse files.
+    lookups = []
+    for resource_instance in resource_instances:
+        resource_class = RESOURCE_MAPPING.get(resource_instance.resource_type)
+        if (resource_class is None) or (not issubclass(resource_class, TableResource)):
+            lookups.append({'error': 'Rows can only be fetched from table-based resources.'})
+            continue
+        if not resource_instance.is_active:
+            lookups.append({'error': 'The resource is not active.'})
+            continue
+        logger.info('Retrieving rows for resource: {resource}.'.format(
+            resource=resource_instance
+        ))
+        try:
+            local_path = get_storage_backend().get_local_resource_path(resource_instance)
+            localize_resource_sidecars(resource_instance)
+        except Exception as ex:
+            logger.error('Failed to localize resource {pk}.'
+                ' Exception was: {ex}'.format(
+                    pk = resource_instance.pk,
+                    ex = ex
+                )
+            )
+            lookups.append({'error': 'Experienced an issue when fetching the rows.'})
+            continue
+        lookups.append((str(resource_instance.pk), local_path, resource_instance.resource_type))
+
+    def fetch_rows(lookup):
+        if isinstance(lookup, dict):
+            # an error was already encountered
+            return lookup
+        pk, local_path, resource_type = lookup
+        try:
+            return get_contents(local_path, resource_type, query_params)[:]
+        except ParseException as ex:
+            return {'error': str(ex)}
+        except Exception as ex:
+            logger.error('Failed to fetch rows from resource {pk}.'
+                ' Exception was: {ex}'.format(
+                    pk = pk,
+                    ex = ex
+                )
+            )
+            return {'error': 'Experienced an issue when fetching the rows.'}
+
+    with ThreadPoolExecutor(max_workers=settings.MULTI_RESOURCE_FETCH_MAX_WORKERS) as executor:
+        results = list(executor.map(fetch_rows, lookups))
+    return {str(r.pk): x for r,x in zip(resource_instances, results)}
+
+def get_resource_submatrix(resource_instance, rows=None, columns=None):
+    '''
+    Returns the binary representation (see `Matrix.serialize_dense`) of 
+    the requested rows and columns of a matrix-type resource.
+
+    Raises a ParseException if the resource is not a matrix type or if
+    any of the requested rows/columns are not found.
+    '''
+    resource_class = RESOURCE_MAPPING.get(resource_instance.resource_type)
+    if (resource_class is None) or (not issubclass(resource_class, Matrix)):
+        raise ParseException('Sub-matrices can only be requested for'
+            ' numeric matrix-type resources.')
+    logger.info('Retrieving sub-matrix for resource: {resource}.'.format(
+        resource=resource_instance
+    ))
+    local_path = get_storage_backend().get_local_resource_path(resource_instance)
+    localize_resource_sidecars(resource_instance)
+    resource_type = resource_class()
+    table = resource_type.get_submatrix(local_path, rows=rows, columns=columns)
+    return resource_type.serialize_dense(table)
+
+def localize_resource_sidecars(resource_instance):
+    '''
+    Some resource types write additional "sidecar" files (e.g. a binary
+    copy or an index) next to the resource. If the storage backend is remote,
+    these need to be pulled into the local cache alongside the resource
+    so that they can be used.
+    '''
+    resource_class = RESOURCE_MAPPING[resource_instance.resource_type]
+    # Only request the sidecars that were stored when the resource was 
+    # validated. Others (e.g. for resources validated before a sidecar 
+    # was introduced) would cost a round-trip to the storage on every request.
+    stored_suffixes = get_stored_sidecar_suffixes(resource_instance)
+    storage_backend = get_storage_backend()
+    for suffix in resource_class.SIDECAR_SUFFIXES:
+        if suffix in stored_suffixes:
+            storage_backend.get_local_sidecar_path(resource_instance, suffix)
+
+def get_stored_sidecar_suffixes(resource_instance):
+    '''
+    Returns the list of sidecar suffixes that were stored next to
+    the file of `resource_instance`
+    '''
+    sidecars = getattr(resource_instance, 'sidecars', '')
+    if not sidecars:
+        return []
+    return sidecars.split(Resource.SIDECAR_DELIMITER)
+
+def store_resource_sidecars(resource_instance, local_resource_path, resource_class_instance):
+    '''
+    Sends any sidecar files that were written next to the local file
+    at `local_resource_path` to the storage backend, placing them
+    next to the (already stored) resource.
+    '''
+    storage_backend = get_storage_backend()
+    stored_suffixes = []
+    for suffix in resource_class_instance.SIDECAR_SUFFIXES:
+        local_sidecar_path = resource_class_instance.get_sidecar_path(
+            local_resource_path, suffix)
+        if os.path.exists(local_sidecar_path):
+            try:
+                storage_backend.store_sidecar(resource_instance, local_sidecar_path, suffix)
+                stored_suffixes.append(suffix)
+            except Exception as ex:
+                # the sidecars are only used for faster access, so this
+                # is not fatal.
+                logger.error('Failed to store the sidecar at {p}.'
+                    ' Exception was: {ex}'.format(
+                        p = local_sidecar_path,
+                        ex = ex
+                    )
+                )
+    resource_instance.sidecars = Resource.SIDECAR_DELIMITER.join(stored_suffixes)
+
+def contents_should_be_streamed(contents):
+    '''
+    Returns True if the (unpaginated) contents returned by `get_resource_view`
+    are large enough that we should stream the response rather than
+    encode the full payload in memory. Only array-like contents (e.g. the rows
+    of a table) can be streamed.
+    '''
+    if isinstance(contents, (dict, str)):
+        return False
+    try:
+        return len(contents) > settings.STREAMING_CONTENTS_MIN_RECORDS
+    except TypeError:
+        return False
+
+def stream_contents(contents):
+    '''
+    A generator which incrementally encodes array-like contents as a JSON 
+    array. The records are encoded and sent in batches so that neither the 
+    full list of records nor the full JSON string is held in memory.
+    '''
+    # use the same encoder as the JSON renderer in the REST framework,
+    # so that the streamed response matches the non-streamed response.
+    encoder = JSONEncoder(allow_nan=False, ensure_ascii=False, separators=(',', ':'))
+    yield '['
+    batch = []
+    is_first_batch = True
+    for record in contents:
+        batch.append(encoder.encode(record))
+        if len(batch) == settings.STREAMING_CONTENTS_BATCH_SIZE:
+            yield ('' if is_first_batch else ',') + ','.join(batch)
+            is_first_batch = False
+            batch = []
+    if len(batch) > 0:
+        yield ('' if is_first_batch else ',') + ','.join(batch)
+    yield ']'
+
 def get_resource_paginator(resource_type):
     '''
     Depending on how a data resource is represented in the backend,
@@ -270,6 +457,9 @@ def handle_valid_resource(resource, resource_class_instance, requested_resource_
     final_path = move_resource_to_final_location(resource)
 
     resource.path = final_path
+    resource.sidecars = ''
+    if resource_class_instance.performs_validation():
+        store_resource_sidecars(resource, new_path, resource_class_instance)
     resource.resource_type = requested_resource_type
     resource.status = Resource.READY
 
@@ -14,8 +14,12 @@ from .resource_views import ResourceList, \
     ResourceContents, \
     AddBucketResourceView
 from .resource_download import ResourceDownload
+from .resource_submatrix import ResourceSubmatrix
 from .operation_resource_views import OperationResourceList, OperationResourceFieldList
-from .workspace_resource_views import WorkspaceResourceList, WorkspaceResourceAdd, WorkspaceResourceRemove
+from .workspace_resource_views import WorkspaceResourceList, \
+    WorkspaceResourceAdd, \
+    WorkspaceResourceRemove, \
+    WorkspaceResourceRows
 from .workspace_metadata_views import WorkspaceMetadataObservationsView, \
     WorkspaceMetadataFeaturesView
 from .metadata_operations_views import MetadataIntersectView, \
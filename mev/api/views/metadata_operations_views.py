@@ -1,13 +1,11 @@
-from functools import reduce
-
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.exceptions import ValidationError
 
-from api.serializers.observation_set import ObservationSetSerializer
-from api.serializers.feature_set import FeatureSetSerializer
-from api.data_structures import ObservationSet, FeatureSet
+from api.serializers.observation_set import CompactObservationSetSerializer
+from api.serializers.feature_set import CompactFeatureSetSerializer
+from api.data_structures import CompactObservationSet, CompactFeatureSet
 
 
 class MetadataMixin(object):
@@ -22,13 +20,16 @@ class MetadataMixin(object):
     # worry about that dictionary
     IGNORE_ATTR_KEY = 'ignore_attributes'
 
+    # The sets (e.g. of all the genes in a matrix) can be large, so
+    # we use the compact implementations which do not create an
+    # Observation/Feature instance for each element.
     serializer_choices = {
-        'observation': ObservationSetSerializer,
-        'feature': FeatureSetSerializer
+        'observation': CompactObservationSetSerializer,
+        'feature': CompactFeatureSetSerializer
     }
     elementset_choices = {
-        'observation': ObservationSet,
-        'feature': FeatureSet
+        'observation': CompactObservationSet,
+        'feature': CompactFeatureSet
     }
 
     def _get_serializer(self, set_type):
@@ -84,7 +85,8 @@ class MetadataMixin(object):
 class MetadataIntersectView(APIView, MetadataMixin):
     def post(self, request, *args, **kwargs):
         element_set_list = self.prep(request)
-        r = reduce(lambda x,y: x.set_intersection(y), element_set_list)
+        element_set_class = self.elementset_choices[request.data[self.SET_TYPE]]
+        r = element_set_class.multi_set_intersection(element_set_list)
         serializer = self._get_serializer(request.data[self.SET_TYPE])
         return Response(serializer(r).data)
 
@@ -92,7 +94,8 @@ class MetadataIntersectView(APIView, MetadataMixin):
 class MetadataUnionView(APIView, MetadataMixin):
     def post(self, request, *args, **kwargs):
         element_set_list = self.prep(request)
-        r = reduce(lambda x,y: x.set_union(y), element_set_list)
+        element_set_class = self.elementset_choices[request.data[self.SET_TYPE]]
+        r = element_set_class.multi_set_union(element_set_list)
         serializer = self._get_serializer(request.data[self.SET_TYPE])
         return Response(serializer(r).data)
 
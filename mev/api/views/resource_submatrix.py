@@ -0,0 +1,95 @@
+import logging
+
+from django.http import HttpResponse
+from rest_framework import permissions as framework_permissions
+from rest_framework.views import APIView
+from rest_framework import status
+from rest_framework.response import Response
+
+from api.exceptions import NoResourceFoundException, \
+    InactiveResourceException, \
+    OwnershipException
+from api.utilities.resource_utilities import check_resource_request_validity, \
+    get_resource_submatrix
+from resource_types import ParseException
+
+logger = logging.getLogger(__name__)
+
+
+class ResourceSubmatrix(APIView):
+    '''
+    Returns a subset of the rows and columns of a matrix-type resource
+    as a dense binary array. Compared to the JSON-format records
+    returned by the contents endpoint, this is a much smaller payload
+    for visualizations such as heatmaps which need the dense matrix.
+
+    The rows and columns are given in the payload, e.g.
+    {
+        "rows": ["geneA", "geneB"],
+        "columns": <ObservationSet>
+    }
+    where each can be a list of names or an ObservationSet/FeatureSet. If
+    either is omitted, all the rows/columns are returned.
+
+    See `Matrix.serialize_dense` for the format of the response.
+    '''
+
+    ROWS = 'rows'
+    COLUMNS = 'columns'
+    ELEMENTS = 'elements'
+    CONTENT_TYPE = 'application/octet-stream'
+
+    permission_classes = [framework_permissions.IsAuthenticated]
+
+    def get_names(self, request, key):
+        '''
+        Returns the list of row/column names given in the payload
+        or None if they were not given.
+        '''
+        try:
+            names = request.data[key]
+        except KeyError:
+            return None
+        # an ObservationSet/FeatureSet- we only need the identifiers
+        if isinstance(names, dict):
+            try:
+                names = [x['id'] for x in names[self.ELEMENTS]]
+            except (KeyError, TypeError):
+                raise ParseException('The "{k}" key referenced an object which'
+                    ' did not look like an ObservationSet or FeatureSet.'.format(k=key))
+        if not isinstance(names, list):
+            raise ParseException('The "{k}" key should reference a list of names,'
+                ' an ObservationSet, or a FeatureSet.'.format(k=key))
+        return [str(x) for x in names]
+
+    def post(self, request, *args, **kwargs):
+        user = request.user
+        resource_pk=kwargs['pk']
+        try:
+            r = check_resource_request_validity(user, resource_pk)
+        except NoResourceFoundException:
+            return Response(status=status.HTTP_404_NOT_FOUND)
+        except InactiveResourceException:
+            return Response(
+                {'error': 'The resource is inactive.'},
+                status=status.HTTP_400_BAD_REQUEST)
+        except OwnershipException:
+            return Response(status=status.HTTP_403_FORBIDDEN)
+
+        try:
+            rows = self.get_names(request, self.ROWS)
+            columns = self.get_names(request, self.COLUMNS)
+            contents = get_resource_submatrix(r, rows=rows, columns=columns)
+        except ParseException as ex:
+            return Response(
+                {'error': 'There was a problem when parsing the request: {ex}'.format(ex=ex)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        except Exception as ex:
+            logger.error('Failed to create the sub-matrix for resource {pk}.'
+                ' Exception was: {ex}'.format(pk=resource_pk, ex=ex))
+            return Response(
+                {'error': 'Experienced an issue when preparing the sub-matrix: {ex}'.format(ex=ex)},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+        return HttpResponse(content=contents, content_type=self.CONTENT_TYPE)
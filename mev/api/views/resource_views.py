@@ -2,6 +2,7 @@ import logging
 import json
 
 from django.conf import settings
+from django.http import StreamingHttpResponse
 from rest_framework import permissions as framework_permissions
 from rest_framework import generics
 from rest_framework.views import APIView
@@ -15,6 +16,8 @@ import api.permissions as api_permissions
 from api.utilities.operations import check_for_resource_operations
 from api.utilities.resource_utilities import get_resource_view, \
     get_resource_paginator, \
+    contents_should_be_streamed, \
+    stream_contents, \
     set_resource_to_inactive, \
     resource_supports_pagination
 from api.storage_backends import get_storage_backend
@@ -22,6 +25,7 @@ from api.async_tasks.async_resource_tasks import delete_file as async_delete_fil
 from api.async_tasks.async_resource_tasks import validate_resource as async_validate_resource
 from api.exceptions import NonIterableContentsException
 from resource_types import ParseException
+from resource_types.pagination import ResourceCursorPagination
 
 
 logger = logging.getLogger(__name__)
@@ -208,7 +212,21 @@ class ResourceContents(APIView):
                     status=status.HTTP_200_OK
                 )
             else:
-                if (settings.PAGE_PARAM in request.query_params) and (resource_supports_pagination(r.resource_type)):
+                if (settings.CURSOR_PARAM in request.query_params) and (resource_supports_pagination(r.resource_type)):
+                    # cursor-based pagination, which does not require a
+                    # count of all the records
+                    paginator = ResourceCursorPagination()
+                    try:
+                        results = paginator.paginate_queryset(contents, request)
+                    except NonIterableContentsException as ex:
+                        return Response(contents)
+                    except ParseException as ex:
+                        return Response(
+                            {'error': 'There was a problem when parsing the request: {ex}'.format(ex=ex)},
+                            status=status.HTTP_400_BAD_REQUEST
+                        )
+                    return paginator.get_paginated_response(results)
+                elif (settings.PAGE_PARAM in request.query_params) and (resource_supports_pagination(r.resource_type)):
                     paginator = get_resource_paginator(r.resource_type)
                     try:
                         results = paginator.paginate_queryset(contents, request)
@@ -222,6 +240,14 @@ class ResourceContents(APIView):
                         )
                         return Response(contents)
                     return paginator.get_paginated_response(results)
+                elif contents_should_be_streamed(contents):
+                    # for large contents, stream the records rather than
+                    # creating the entire payload in memory
+                    logger.info('Streaming the contents of resource ({pk}).'.format(
+                        pk = resource_pk
+                    ))
+                    return StreamingHttpResponse(stream_contents(contents),
+                        content_type='application/json')
                 else:
                     return Response(contents)
 
@@ -6,6 +6,7 @@ from rest_framework.views import APIView
 from rest_framework import status
 from rest_framework.exceptions import NotFound, ParseError
 from rest_framework.response import Response
+from django.core.exceptions import ValidationError
 
 from api.models import Resource, Workspace
 from api.serializers.resource import ResourceSerializer
@@ -13,6 +14,7 @@ from api.serializers.workspace_resource import WorkspaceResourceSerializer
 from api.serializers.workspace_resource_add import WorkspaceResourceAddSerializer
 import api.permissions as api_permissions
 from api.utilities.operations import check_for_resource_operations
+from api.utilities.resource_utilities import get_rows_from_resources
 
 logger = logging.getLogger(__name__)
 
@@ -230,3 +232,68 @@ class WorkspaceResourceAdd(APIView):
                 )
         else:
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class WorkspaceResourceRows(APIView):
+    '''
+    This endpoint returns the rows (e.g. genes) with the requested names 
+    from multiple table-based Resources in a Workspace, e.g. to compare
+    a gene across several expression matrices and differential
+    expression results.
+
+    The payload gives the UUIDs of the Resources and the row names:
+    {
+        "resources": [<UUID>, <UUID>],
+        "rows": ["geneA", "geneB"]
+    }
+    The response maps each Resource UUID to its matching rows.
+    '''
+    permission_classes = [framework_permissions.IsAuthenticated]
+
+    RESOURCES = 'resources'
+    ROWS = 'rows'
+
+    def get_list(self, request, key):
+        try:
+            x = request.data[key]
+        except KeyError:
+            raise ParseError({key: 'This key is required.'})
+        if (not isinstance(x, list)) or (len(x) == 0):
+            raise ParseError({key: 'This key should reference a non-empty list.'})
+        return [str(y) for y in x]
+
+    def post(self, request, *args, **kwargs):
+        workspace_uuid = kwargs['workspace_pk']
+        try:
+            workspace = Workspace.objects.get(pk=workspace_uuid)
+        except Workspace.DoesNotExist:
+            raise NotFound()
+        requesting_user = request.user
+        if not ((requesting_user.is_staff) or (requesting_user == workspace.owner)):
+            return Response(status=status.HTTP_403_FORBIDDEN)
+
+        resource_uuids = list(dict.fromkeys(self.get_list(request, self.RESOURCES)))
+        row_names = self.get_list(request, self.ROWS)
+
+        try:
+            resources = {str(r.pk): r for r in 
+                workspace.resources.filter(pk__in=resource_uuids)}
+        except ValidationError:
+            # raised if any of the UUIDs were not formatted correctly
+            raise ParseError({self.RESOURCES: 'The resource UUIDs were not valid.'})
+        missing_uuids = [x for x in resource_uuids if not x in resources]
+        if len(missing_uuids) > 0:
+            raise ParseError({self.RESOURCES: 'The resource(s) {u} were not found'
+                ' in this workspace.'.format(u=','.join(missing_uuids))
+            })
+
+        logger.info('Fetching rows {rows} from resources {resources}'
+            ' in workspace ({workspace_uuid})'.format(
+                rows = ','.join(row_names),
+                resources = ','.join(resource_uuids),
+                workspace_uuid = str(workspace_uuid)
+            )
+        )
+        results = get_rows_from_resources(
+            [resources[x] for x in resource_uuids], row_names)
+        return Response(results)
@@ -546,6 +546,11 @@ NEGATIVE_INF_MARKER = '--inf--'
 PAGE_PARAM = 'page'
 PAGE_SIZE_PARAM = 'page_size'
 
+# For cursor-based pagination of resource contents. The value is an opaque
+# string returned in the "next"/"previous" links. An empty value requests
+# the first page.
+CURSOR_PARAM = 'cursor'
+
 # import all the filtering operations that can be applied when querying for the content
 # of data resources
 from api.filters import *
@@ -554,3 +559,72 @@ from api.filters import *
 # END settings/imports for filtering
 ###############################################################################
 
+
+###############################################################################
+# START settings for reading resource contents
+###############################################################################
+
+# Parsed resources (e.g. the dataframes behind table-based resources) are
+# kept in an in-process cache so that requests for successive pages of the
+# same resource do not re-parse the file each time. Note that this budget
+# is per worker process.
+PARSED_RESOURCE_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+# When the contents of a table are filtered and/or sorted, the resulting row
+# positions are kept in the cache (e.g. redis) so that requesting other pages
+# of the same result does not require repeating the filter/sort. This sets 
+# the timeout (in seconds) for those entries.
+TABLE_RESULT_CACHE_TIMEOUT_SECONDS = 60 * 60
+
+# When a sorted table is paginated and only the first pages are requested,
+# we only sort the rows needed for those pages. This sets the maximum number
+# of rows for which we use this partial sort; deeper pages use a full sort.
+PARTIAL_SORT_MAX_ROWS = 10000
+
+# Table-based files larger than this (in bytes) are validated in chunks
+# so that very large files (e.g. count matrices) do not need to be loaded
+# into memory all at once.
+CHUNKED_VALIDATION_THRESHOLD_BYTES = 512 * 1024 * 1024
+
+# When validating in chunks, the size of each chunk is chosen so that
+# the memory used stays (approximately) below this ceiling. The number of
+# rows per chunk is estimated from a sample of the first rows.
+TABLE_VALIDATION_MEMORY_CEILING_BYTES = 256 * 1024 * 1024
+CHUNKED_VALIDATION_SAMPLE_ROWS = 100
+
+# When the (unpaginated) contents of a resource contain more than this
+# number of records, the response is streamed in batches of
+# STREAMING_CONTENTS_BATCH_SIZE records rather than encoded all at once.
+STREAMING_CONTENTS_MIN_RECORDS = 5000
+STREAMING_CONTENTS_BATCH_SIZE = 1000
+
+# When fetching rows from multiple resources at once, the number of
+# resources which are read concurrently.
+MULTI_RESOURCE_FETCH_MAX_WORKERS = 4
+
+# When reading tables to return their contents, should we store them compactly?
+# This stores numeric columns with smaller dtypes (when no values change)
+# and, for annotation-type tables, string columns with few distinct values
+# as categoricals. A column is converted to a categorical if the number of 
+# distinct values is at most CATEGORICAL_MAX_UNIQUE_FRACTION of the rows.
+COMPACT_TABLE_LOADING = True
+CATEGORICAL_MAX_UNIQUE_FRACTION = 0.5
+
+# The engine used to parse delimited (CSV/TSV) files. Either 'pandas' or
+# 'pyarrow', which is multithreaded and typically much faster for large tables.
+# When using pyarrow, files with a comment character ("#") are parsed with 
+# pandas. Otherwise, the first TABLE_READ_ENGINE_CHECK_ROWS rows are 
+# compared with those parsed by pandas and we fall back to pandas if
+# they differ. See the benchmark_table_io management command for a comparison.
+TABLE_READ_ENGINE = 'pandas'
+TABLE_READ_ENGINE_CHECK_ROWS = 100
+
+# Should the standardized copies of table-based resources be gzip-compressed
+# (e.g. "counts.tsv.gz")? This considerably reduces storage for large matrices,
+# but the tools which consume the files need to handle the compression. 
+# Note that compressed uploads are accepted regardless of this setting.
+COMPRESS_STANDARDIZED_TABLES = False
+
+###############################################################################
+# END settings for reading resource contents
+###############################################################################
@@ -1,5 +1,12 @@
+import os
+
 WILDCARD = '*'
 
+# Files compressed with gzip (or bgzip, which is gzip-compatible) are
+# named with this extension following their "usual" extension, 
+# e.g. "counts.tsv.gz"
+GZIP_EXTENSION = 'gz'
+
 class ParseException(Exception):
     '''
     For raising exceptions when the parser
@@ -27,6 +34,13 @@ class DataResource(object):
     PARENT_OP = 'parent_operation'
     RESOURCE = 'resource'
 
+    # Some resource types write additional files ("sidecars") next to the
+    # standardized file, such as binary copies or indexes which allow faster
+    # access to the contents. Each is identified by a suffix which is appended
+    # to the path of the resource. These are listed so that they can be
+    # stored and retrieved alongside the resource by the storage backends.
+    SIDECAR_SUFFIXES = []
+
     def validate_type(self, resource_path):
         raise NotImplementedError('You must'
         ' implement this method in the derived class')
@@ -58,9 +72,41 @@ class DataResource(object):
     def get_extension(path):
         '''
         A single method to return the extension of the file. By convention,
-        the lower-cased contents AFTER the final dot/period.
+        the lower-cased contents AFTER the final dot/period. For compressed
+        files (e.g. "counts.tsv.gz") we return the extension preceding the
+        compression extension (e.g. "tsv").
+        '''
+        contents = os.path.basename(path).lower().split('.')
+        if (len(contents) > 2) and (contents[-1] == GZIP_EXTENSION):
+            return contents[-2]
+        return contents[-1]
+
+    @staticmethod
+    def is_compressed(path):
+        '''
+        Returns True if the path indicates a gzip-compressed file.
+        '''
+        return path.lower().endswith('.' + GZIP_EXTENSION)
+
+    @staticmethod
+    def get_sidecar_path(resource_path, suffix):
+        '''
+        Returns the path of the sidecar file (identified by `suffix`) 
+        that accompanies the file at `resource_path`
+        '''
+        return '{p}.{s}'.format(p=resource_path, s=suffix)
+
+    @staticmethod
+    def sidecar_is_current(resource_path, sidecar_path):
+        '''
+        Returns True if the sidecar exists and was written after the file
+        it was derived from. Otherwise the sidecar could be stale and should
+        not be used.
         '''
-        return path.split('.')[-1].lower()
+        try:
+            return os.path.getmtime(sidecar_path) >= os.path.getmtime(resource_path)
+        except OSError:
+            return False
 
     @staticmethod
     def get_paginator():
@@ -0,0 +1,137 @@
+import os
+import sys
+import logging
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ParsedResourceCache(object):
+    '''
+    An in-process (i.e. per-worker) cache of parsed resources, such as the
+    dataframes created when reading a table-based resource.
+
+    Without this, every request for a page of a table re-parses the entire
+    file. Entries are keyed by the path of the file along with its modification
+    time and size, so that edits to the underlying file are never served
+    from a stale entry.
+
+    Eviction is least-recently-used, subject to a total budget in bytes. Items
+    which are larger than the entire budget are simply not cached.
+    '''
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._current_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def get_key(resource_path, *extra):
+        '''
+        Creates the cache key for the file at `resource_path`. Any
+        additional args (e.g. options that change how the file was parsed)
+        are appended to the key.
+
+        Returns None if the file cannot be found, in which case nothing
+        should be cached.
+        '''
+        try:
+            file_stat = os.stat(resource_path)
+        except OSError:
+            return None
+        return (os.path.abspath(resource_path),
+            file_stat.st_mtime_ns,
+            file_stat.st_size) + tuple(extra)
+
+    @staticmethod
+    def get_size(obj):
+        '''
+        Returns the (approximate) number of bytes occupied by the
+        cached object.
+        '''
+        if isinstance(obj, (pd.DataFrame, pd.Series)):
+            size = obj.memory_usage(index=True, deep=True)
+            if isinstance(obj, pd.DataFrame):
+                size = size.sum()
+            return int(size)
+        if isinstance(obj, np.ndarray):
+            return obj.nbytes
+        if isinstance(obj, dict):
+            return sum([ParsedResourceCache.get_size(x) for x in obj.values()])
+        return sys.getsizeof(obj)
+
+    def get(self, key):
+        '''
+        Returns the cached object (or None if it was not found).
+        Note that the caller should NOT modify the returned object
+        in-place, as that would modify the cached item.
+        '''
+        if key is None:
+            return None
+        with self._lock:
+            try:
+                obj, size = self._entries[key]
+            except KeyError:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return obj
+
+    def put(self, key, obj):
+        if key is None:
+            return
+        size = self.get_size(obj)
+        if size > self.max_bytes:
+            logger.info('Object of size {s} bytes exceeds the cache'
+                ' budget of {b} bytes. Not caching.'.format(
+                    s = size,
+                    b = self.max_bytes
+                )
+            )
+            return
+        with self._lock:
+            if key in self._entries:
+                self._current_bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (obj, size)
+            self._current_bytes += size
+            while self._current_bytes > self.max_bytes:
+                evicted_key, (evicted_obj, evicted_size) = self._entries.popitem(last=False)
+                self._current_bytes -= evicted_size
+                logger.info('Evicted {k} from the parsed resource cache.'.format(
+                    k = evicted_key
+                ))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._current_bytes = 0
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        '''
+        Returns a dict reporting the hit/miss counts and usage,
+        e.g. for logging
+        '''
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'entries': len(self._entries),
+                'bytes': self._current_bytes,
+                'max_bytes': self.max_bytes
+            }
+
+
+# The cache is module-level so that it is shared by all requests handled
+# within the same worker process.
+parsed_resource_cache = ParsedResourceCache(settings.PARSED_RESOURCE_CACHE_MAX_BYTES)
@@ -1,7 +1,15 @@
+import os
 import json
 import logging
+import itertools
 from collections import OrderedDict
 import numpy as np
+import pandas as pd
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
 
 from django.core.paginator import Paginator, Page
 from django.conf import settings
@@ -10,10 +18,14 @@ from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
 
 from .base import DataResource, ParseException
+from .cache import parsed_resource_cache
 from api.exceptions import NonIterableContentsException
 
 JSON = 'json'
 
+# the whitespace characters permitted by the JSON spec
+JSON_WHITESPACE = ' \t\n\r'
+
 logger = logging.getLogger(__name__)
 
 
@@ -31,6 +43,130 @@ class JsonArrayPage(Page):
             )
         return self.object_list[index]        
 
+class JsonArrayContents(object):
+    '''
+    A list-like wrapper for a JSON file whose top level is an array.
+
+    Rather than parsing the entire file, the records are decoded incrementally
+    and only those which are requested (e.g. a single page) are kept in 
+    memory. Note that finding the number of records still requires a 
+    (constant-memory) pass through the file.
+    '''
+    # the ijson "prefix" of the items in a top-level array
+    ITEM_PREFIX = 'item'
+
+    # the ijson events which start a new item
+    ITEM_START_EVENTS = ['start_map', 'start_array', 'string', 'number', 'boolean', 'null']
+
+    def __init__(self, resource_path, offset_index=None, positions=None):
+        self.resource_path = resource_path
+        self._length = None
+
+        # If given, this has the byte offsets of the start and end of each
+        # record (see `JsonResource.build_offset_index`). We can then seek 
+        # directly to the requested records and know the number of records.
+        self.offset_index = offset_index
+        if offset_index is not None:
+            self._length = offset_index['starts'].size
+
+        # If given (e.g. after filtering/sorting), only the records at these 
+        # positions (and in this order) are exposed. Requires the offset index.
+        self.positions = positions
+        if positions is not None:
+            self._length = positions.size
+
+    def read_records(self, start, stop):
+        '''
+        Uses the offset index to read and decode the records from 
+        position `start` up to (but not including) `stop`.
+        '''
+        if self.positions is not None:
+            positions = self.positions[start:stop]
+            starts = self.offset_index['starts'][positions]
+            ends = self.offset_index['ends'][positions]
+            with open(self.resource_path, 'rb') as fin:
+                records = []
+                for i,j in zip(starts, ends):
+                    fin.seek(i)
+                    records.append(json.loads(fin.read(j - i)))
+            return records
+        starts = self.offset_index['starts'][start:stop]
+        ends = self.offset_index['ends'][start:stop]
+        if starts.size == 0:
+            return []
+        base = starts[0]
+        with open(self.resource_path, 'rb') as fin:
+            fin.seek(base)
+            b = fin.read(ends[-1] - base)
+        return [json.loads(b[i-base:j-base]) for i,j in zip(starts, ends)]
+
+    def iter_records(self, start=0, stop=None):
+        '''
+        Yields the decoded records from position `start` up to (but 
+        not including) `stop`.
+        '''
+        if self.offset_index is not None:
+            for record in self.read_records(start, stop):
+                yield record
+            return
+        num_yielded = 0
+        try:
+            with open(self.resource_path, 'rb') as fin:
+                records = ijson.items(fin, self.ITEM_PREFIX, use_float=True)
+                for record in itertools.islice(records, start, stop):
+                    yield record
+                    num_yielded += 1
+        except ijson.JSONError as ex:
+            # the standard library parser accepts some non-standard values 
+            # (e.g. NaN) which the incremental parser does not, so fall back
+            # to a full parse of the file
+            logger.info('Failed to incrementally parse the JSON file at {p}.'
+                ' Falling back to a full parse. Exception was: {ex}'.format(
+                    p = self.resource_path,
+                    ex = ex
+                )
+            )
+            j = json.load(open(self.resource_path))
+            for record in j[start + num_yielded:stop]:
+                yield record
+
+    def __len__(self):
+        if self._length is None:
+            try:
+                with open(self.resource_path, 'rb') as fin:
+                    self._length = sum([1 for prefix, event, value in ijson.parse(fin)
+                        if (prefix == self.ITEM_PREFIX) and (event in self.ITEM_START_EVENTS)])
+            except ijson.JSONError:
+                self._length = len(json.load(open(self.resource_path)))
+        return self._length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.start, index.stop, index.step
+            # negative indexes are relative to the end, so we need the length
+            if any([(x is not None) and (x < 0) for x in [start, stop]]):
+                start, stop, step = index.indices(len(self))
+            records = list(self.iter_records(start or 0, stop))
+            return records[::step] if step else records
+        elif isinstance(index, (int, np.integer)):
+            if index < 0:
+                index += len(self)
+            records = list(self.iter_records(index, index + 1))
+            if (index < 0) or (len(records) == 0):
+                raise IndexError('Index out of range.')
+            return records[0]
+        raise TypeError(
+            'Indices must be integers or slices, not %s.'
+            % type(index).__name__
+        )
+
+    def __iter__(self):
+        return self.iter_records()
+
+    def tolist(self):
+        return self[:]
+
+
 class JsonObjectPage(Page):
     def __getitem__(self, index):
         keys = list(self.object_list.keys())
@@ -62,7 +198,7 @@ class JsonResourcePaginator(Paginator):
         top = bottom + self.per_page
         if top + self.orphans >= self.count:
             top = self.count
-        if type(self.object_list) == list:
+        if isinstance(self.object_list, (list, JsonArrayContents)):
             return JsonArrayPage(self.object_list[bottom:top], number, self)
         else:
             raise NonIterableContentsException()
@@ -90,6 +226,25 @@ class JsonResource(DataResource):
     ACCEPTABLE_EXTENSIONS = [JSON]
     DESCRIPTION = 'A JSON-format file.'
 
+    # For files with an array at the top level, we store the byte offsets
+    # of the start and end of each record next to the resource. Paginated
+    # requests can then seek directly to the records they return. 
+    OFFSET_INDEX_SIDECAR = 'offsets.npz'
+    SIDECAR_SUFFIXES = [OFFSET_INDEX_SIDECAR]
+
+    # When building the offset index, the file is read in chunks of
+    # this many bytes.
+    OFFSET_INDEX_CHUNK_SIZE = 2**20
+
+    # Arrays of records are filtered and sorted using a columnar copy
+    # of the records, which is stored in the parsed resource cache with
+    # this additional key
+    COLUMNAR_CACHE_KEY = 'columnar'
+
+    def __init__(self):
+        # the parsed contents of the file, if they were read
+        self.records = None
+
     @staticmethod
     def get_paginator():
         return JsonResourcePageNumberPagination()
@@ -104,6 +259,13 @@ class JsonResource(DataResource):
 
     def validate_type(self, resource_path):
 
+        # If possible, check the syntax incrementally so that we do not
+        # create the entire (potentially very large) structure in memory.
+        # If that fails, we use the full parse to give a definitive answer 
+        # (and the error message).
+        if self.validate_incrementally(resource_path):
+            return (True, None)
+
         try:
             logger.info('Using python-native JSON loader to read resource: {p}'.format(
                 p = resource_path
@@ -126,6 +288,186 @@ class JsonResource(DataResource):
                 ' to parse the file was JSON. The reported error was: {ex}'.format(ex=ex)
             )
 
+    def validate_incrementally(self, resource_path):
+        '''
+        Checks the JSON syntax of the file using an incremental parser,
+        which uses constant memory. Returns True if the file was valid.
+
+        Returns False if the file was invalid OR the incremental parser 
+        was not available.
+        '''
+        if ijson is None:
+            return False
+        logger.info('Using incremental JSON parser to validate resource: {p}'.format(
+            p = resource_path
+        ))
+        try:
+            with open(resource_path, 'rb') as fin:
+                for event in ijson.parse(fin):
+                    pass
+            logger.info('Successfully parsed {p} as JSON.'.format(
+                p = resource_path
+            ))
+            return True
+        except Exception as ex:
+            logger.info('Incremental parse of {p} failed. Exception'
+                ' was: {ex}'.format(
+                    p = resource_path,
+                    ex = ex
+                )
+            )
+            return False
+
+    def save_in_standardized_format(self, resource_path, resource_name):
+        '''
+        We don't change JSON files, but write the offset index 
+        for those with an array at the top level.
+        '''
+        if self.is_top_level_array(resource_path):
+            self.write_offset_index(resource_path)
+        return (resource_path, resource_name)
+
+    @staticmethod
+    def build_offset_index(resource_path, chunk_size=OFFSET_INDEX_CHUNK_SIZE):
+        '''
+        Returns a dict of arrays giving the byte offsets of the start 
+        and end of each record in the top-level array of the JSON file
+        at `resource_path`.
+
+        The file is read in chunks, so only the current chunk (or record, if
+        larger) is held in memory. The bytes are decoded as latin-1 so that
+        the string positions are the same as the byte positions. Since all 
+        the JSON syntax is ASCII, that does not change the structure.
+        '''
+        decoder = json.JSONDecoder()
+        starts = []
+        ends = []
+        with open(resource_path, 'rb') as fin:
+            buf = ''
+            buf_offset = 0 # the position of buf[0] in the file
+            pos = 0 # the current position in buf
+            is_eof = False
+            expected = '[' # the syntax we expect next
+
+            def read_more(n):
+                b = fin.read(n)
+                return (b.decode('latin-1'), len(b) == 0)
+
+            while True:
+                # skip any whitespace
+                while (pos < len(buf)) and (buf[pos] in JSON_WHITESPACE):
+                    pos += 1
+                if pos == len(buf):
+                    if is_eof:
+                        raise ParseException('Unexpected end of the JSON file.')
+                    buf_offset += pos
+                    buf, is_eof = read_more(chunk_size)
+                    pos = 0
+                    continue
+
+                c = buf[pos]
+                if expected == '[':
+                    if c != '[':
+                        raise ParseException('The JSON file did not contain an array.')
+                    pos += 1
+                    expected = 'first record'
+                elif (expected == 'first record') and (c == ']'):
+                    break
+                elif expected == ',':
+                    if c == ']':
+                        break
+                    if c != ',':
+                        raise ParseException('Expected a comma at position'
+                            ' {p} of the JSON file.'.format(p=buf_offset + pos))
+                    pos += 1
+                    expected = 'record'
+                else:
+                    try:
+                        record, end = decoder.raw_decode(buf, pos)
+                        # a number at the end of the buffer may have
+                        # been cut off, so we need to read further
+                        is_complete = (end < len(buf)) or is_eof
+                    except json.decoder.JSONDecodeError as ex:
+                        if is_eof:
+                            raise ParseException('Could not parse the record at'
+                                ' position {p} of the JSON file.'.format(p=buf_offset + pos))
+                        is_complete = False
+                    if not is_complete:
+                        # discard what was already indexed and read more. 
+                        # To handle large records, at least double the buffer
+                        buf = buf[pos:]
+                        buf_offset += pos
+                        pos = 0
+                        more, is_eof = read_more(max(chunk_size, len(buf)))
+                        buf += more
+                        continue
+                    starts.append(buf_offset + pos)
+                    ends.append(buf_offset + end)
+                    pos = end
+                    expected = ','
+        return {
+            'starts': np.array(starts, dtype=np.int64),
+            'ends': np.array(ends, dtype=np.int64)
+        }
+
+    def write_offset_index(self, resource_path):
+        '''
+        Writes the offset index next to the file at `resource_path`.
+        Since this is only an optimization, failures are logged
+        and otherwise ignored.
+        '''
+        sidecar_path = self.get_sidecar_path(resource_path, self.OFFSET_INDEX_SIDECAR)
+        logger.info('Writing the offset index to {p}'.format(p=sidecar_path))
+        try:
+            np.savez(sidecar_path, **self.build_offset_index(resource_path))
+        except Exception as ex:
+            logger.info('Failed to write the offset index for the resource'
+                ' at {p}. Exception was: {ex}'.format(
+                    p = resource_path,
+                    ex = ex
+                )
+            )
+            if os.path.exists(sidecar_path):
+                os.remove(sidecar_path)
+
+    def read_offset_index(self, resource_path):
+        '''
+        Returns the offset index (a dict of arrays) for the file at
+        `resource_path`, or None if it is not available.
+        '''
+        sidecar_path = self.get_sidecar_path(resource_path, self.OFFSET_INDEX_SIDECAR)
+        if not self.sidecar_is_current(resource_path, sidecar_path):
+            return None
+        cache_key = parsed_resource_cache.get_key(sidecar_path)
+        offset_index = parsed_resource_cache.get(cache_key)
+        if offset_index is not None:
+            return offset_index
+        try:
+            with np.load(sidecar_path) as npz:
+                offset_index = {k: npz[k] for k in ['starts', 'ends']}
+        except Exception as ex:
+            logger.info('Failed to read the offset index at {p}.'
+                ' Exception was: {ex}'.format(
+                    p = sidecar_path,
+                    ex = ex
+                )
+            )
+            return None
+        parsed_resource_cache.put(cache_key, offset_index)
+        return offset_index
+
+    @staticmethod
+    def is_top_level_array(resource_path):
+        '''
+        Returns True if the file at `resource_path` (assumed to be valid
+        JSON) has an array at the top level. Only reads the start of the file.
+        '''
+        with open(resource_path, 'rb') as fin:
+            while True:
+                c = fin.read(1)
+                if (not c) or (not c.isspace()):
+                    return c == b'['
+
     def extract_metadata(self, resource_path, parent_op_pk=None):
         # call the super method to initialize the self.metadata
         # dictionary
@@ -142,18 +484,47 @@ class JsonResource(DataResource):
         # since the pagination query params are among the general query parameters, we DON'T
         # want to pass them to the filtering.
         filtering_query_params = {}
-        ignored_params = [settings.PAGE_SIZE_PARAM, settings.PAGE_PARAM, settings.SORT_PARAM]
+        ignored_params = [settings.PAGE_SIZE_PARAM, settings.PAGE_PARAM, 
+            settings.CURSOR_PARAM, settings.SORT_PARAM]
         for k,v in query_params.items():
             if (not k in ignored_params):
                 filtering_query_params[k] = v
 
         logger.info('Get contents of JSON resource and filter'
             ' against query params: {q}'.format(q=filtering_query_params))
+
+        is_top_level_array = self.is_top_level_array(resource_path)
+
+        # If no filtering or sorting was requested on a top-level array, 
+        # we can avoid parsing the entire file. Only the requested 
+        # records (e.g. a page) are decoded.
+        if (not filtering_query_params) and \
+            (not settings.SORT_PARAM in query_params) and \
+            is_top_level_array:
+            offset_index = self.read_offset_index(resource_path)
+            if (offset_index is not None) or (ijson is not None):
+                logger.info('Reading records of JSON resource {p} as'
+                    ' requested. Offset index available: {b}'.format(
+                    p = resource_path,
+                    b = offset_index is not None
+                ))
+                return JsonArrayContents(resource_path, offset_index)
         try:
-            logger.info('Using python-native JSON loader to read resource: {p}'.format(
-                p = resource_path
-            ))
-            j = json.load(open(resource_path))
+            # arrays of records are filtered/sorted using a (cached) 
+            # columnar copy of the records
+            if is_top_level_array:
+                contents = self.get_contents_from_columns(resource_path,
+                    filtering_query_params, query_params.get(settings.SORT_PARAM))
+                if contents is not None:
+                    return contents
+
+            if self.records is not None:
+                j = self.records
+            else:
+                logger.info('Using python-native JSON loader to read resource: {p}'.format(
+                    p = resource_path
+                ))
+                j = json.load(open(resource_path))
             if filtering_query_params:
                 j = self.filter_based_on_query_params(j, filtering_query_params)
             if settings.SORT_PARAM in query_params:
@@ -165,11 +536,117 @@ class JsonResource(DataResource):
             logger.info('Failed to load JSON resource. Error was {ex}'.format(ex=ex))
             raise ex
 
-    def sort_json(self, j, sort_string):
+    def get_columnar_records(self, resource_path):
         '''
-        Return the results sorted by a particular field.
-        Only permit simple sorts. No nested sorts on multiple
-        fields
+        For files which are an array of objects ("records"), returns a dict
+        with a dataframe of the values (`frame`, with a column for each key)
+        and a boolean dataframe (`present`) which indicates whether each record
+        had that key. The latter distinguishes missing keys from null values.
+
+        These are cached, so that successive requests (e.g. for other pages)
+        are filtered and sorted without parsing the file. Returns None if
+        the file is not an array of objects.
+        '''
+        cache_key = parsed_resource_cache.get_key(resource_path, self.COLUMNAR_CACHE_KEY)
+        columns = parsed_resource_cache.get(cache_key)
+        if columns is not None:
+            return columns
+
+        logger.info('Creating columnar copy of the JSON resource at {p}'.format(
+            p = resource_path
+        ))
+        self.records = json.load(open(resource_path))
+        if not ((type(self.records) is list) and 
+            all([type(x) is dict for x in self.records])):
+            return None
+        frame = pd.DataFrame(self.records)
+        present = pd.DataFrame([dict.fromkeys(x, True) for x in self.records], 
+            columns=frame.columns).notna()
+        columns = {'frame': frame, 'present': present}
+        parsed_resource_cache.put(cache_key, columns)
+        return columns
+
+    def get_contents_from_columns(self, resource_path, filtering_query_params, sort_string=None):
+        '''
+        Filters and sorts an array of records using vectorized operations on
+        the columnar copy of the records. Only the selected records are
+        decoded if we have an offset index.
+
+        Returns None if the file is not an array of records.
+        '''
+        columns = self.get_columnar_records(resource_path)
+        if columns is None:
+            return None
+        positions = np.arange(columns['frame'].shape[0])
+        if filtering_query_params:
+            positions = self.filter_columns(columns, 
+                self.parse_filters(filtering_query_params))
+        if sort_string is not None:
+            try:
+                positions = self.sort_columns(columns, positions, sort_string)
+            except TypeError as ex:
+                # e.g. a field with a mix of strings and numbers, which
+                # can't be compared. Use the element-wise sort instead.
+                logger.info('Could not sort the columnar JSON records.'
+                    ' Exception was: {ex}'.format(ex=ex))
+                return None
+
+        offset_index = self.read_offset_index(resource_path)
+        if (offset_index is not None) and \
+            (offset_index['starts'].size == columns['frame'].shape[0]):
+            return JsonArrayContents(resource_path, offset_index, positions)
+        if self.records is None:
+            self.records = json.load(open(resource_path))
+        return [self.records[i] for i in positions]
+
+    def filter_columns(self, columns, filter_ops):
+        '''
+        Returns the positions of the records which pass all the filters.
+        As with `filter_based_on_query_params`, records which do 
+        not have the filtered key are excluded.
+        '''
+        frame = columns['frame']
+        present = columns['present']
+        passing = np.ones(frame.shape[0], dtype=bool)
+        for k, (op_id, val) in filter_ops.items():
+            if not k in frame.columns:
+                passing[:] = False
+                continue
+            op = settings.VECTORIZED_OPERATOR_MAPPING[op_id]
+            try:
+                result = op(frame[k], val)
+            except Exception as ex:
+                logger.info('Error with comparison for'
+                    ' filtering a JSON resource contents.'
+                )
+                raise ex
+            passing &= result.fillna(False).values.astype(bool) & present[k].values
+        return np.flatnonzero(passing)
+
+    def sort_columns(self, columns, positions, sort_string):
+        '''
+        Returns the `positions` of the records ordered by the 
+        requested field. Records which are missing that field (or have
+        a NaN value) are placed at the end, regardless of the sort order.
+        '''
+        sort_order, field = self.parse_sort_string(sort_string)
+        if not field in columns['frame'].columns:
+            return positions
+        values = columns['frame'][field].iloc[positions].where(
+            columns['present'][field].values[positions])
+        values.index = np.arange(values.size)
+        ordering = values.sort_values(
+            ascending = sort_order == settings.ASCENDING,
+            na_position = 'last',
+            kind = 'mergesort'
+        ).index.values
+        return positions[ordering]
+
+    def parse_sort_string(self, sort_string):
+        '''
+        Returns a tuple of the sort order (e.g. ascending) and field
+        given by the sort query param. Only permit simple sorts. No
+        nested sorts on multiple fields.
         '''
         if len(sort_string.split(',')) > 1:
             raise ParseException('Based on the query string ({v})'
@@ -189,6 +666,15 @@ class JsonResource(DataResource):
                 s = sort_order,
                 opts = ','.join(settings.SORTING_OPTIONS)
             ))
+        return (sort_order, field)
+
+    def sort_json(self, j, sort_string):
+        '''
+        Return the results sorted by a particular field.
+        Only permit simple sorts. No nested sorts on multiple
+        fields
+        '''
+        sort_order, field = self.parse_sort_string(sort_string)
 
         # extract the values for the field of interest. If that field doesn't exist
         # on the item, then assign it to np.nan
@@ -203,8 +689,10 @@ class JsonResource(DataResource):
 
         # now use argsort to get the ordering. There is no way to 
         # specify asc/descending as it always makes it ascending.
-        # Note that the np.nan get sent to the end.
-        ordering = np.argsort(current_vals)
+        # Note that the np.nan get sent to the end. A stable sort keeps
+        # records which are missing the field in their original order, as
+        # is done when sorting the columnar copy (see `sort_columns`).
+        ordering = np.argsort(current_vals, kind='mergesort')
         
         if sort_order ==  settings.DESCENDING:
             if num_nans > 0:
@@ -212,19 +700,17 @@ class JsonResource(DataResource):
                 # We strip off the indexes corresponding to the NaNs
                 # so that we can reverse the list and not put those NaNs at the front            
                 ordering = ordering[:-num_nans][::-1]
-                ordering.extend(nan_idx) # then add them back onto the tail
+                # then add them back onto the tail
+                ordering = np.concatenate([ordering, nan_idx])
             else:
                 ordering = ordering[::-1]
         return [j[k] for k in ordering]
 
-
-
-
-    def filter_based_on_query_params(self, j, query_params):
-        # we can only really filter if the json data structure is list-like:
-        if not type(j) is list:
-            return j
-
+    def parse_filters(self, query_params):
+        '''
+        Returns a dict mapping each filtered key to a tuple of the
+        operator string (e.g. "[lte]") and the value to compare against.
+        '''
         filter_ops = {}
         for k,v in query_params.items():
             # v is either a value (in the case of strict equality)
@@ -240,7 +726,7 @@ class JsonResource(DataResource):
                 except ValueError as ex:
                     val = v
                 
-                filter_ops[k] = create_closure(settings.OPERATOR_MAPPING['=='], val)
+                filter_ops[k] = ('==', val)
 
             elif len(split_v) == 2:
                 # something like "[lte]:0.01" or "[startswith]:aaa"
@@ -258,16 +744,14 @@ class JsonResource(DataResource):
                             ' parameter value {v} as a number.'.format(v=val))
 
                 # the supplied value was ok. Check the operator supplied
-                try:
-                    op = settings.OPERATOR_MAPPING[op_id]
-                except KeyError as ex:
+                if not op_id in settings.OPERATOR_MAPPING:
                     raise ParseException('The operator string ("{s}") was not understood. Choose'
                         ' from among: {vals}'.format(
                             s = op_id,
                             vals = ','.join(settings.OPERATOR_MAPPING.keys())
                         )
                     )
-                filter_ops[k] = create_closure(op, val)
+                filter_ops[k] = (op_id, val)
 
             else:
                 raise ParseException('The query param string ({v}) for filtering on'
@@ -276,6 +760,16 @@ class JsonResource(DataResource):
                         p = k
                     )
                 )
+        return filter_ops
+
+    def filter_based_on_query_params(self, j, query_params):
+        # we can only really filter if the json data structure is list-like:
+        if not type(j) is list:
+            return j
+
+        filter_ops = {k: create_closure(settings.OPERATOR_MAPPING[op_id], val) 
+            for k, (op_id, val) in self.parse_filters(query_params).items()}
+
         # now go through the list and keep those that pass the filter
         filtered_list = []
         for item in j:
@@ -0,0 +1,151 @@
+import json
+import base64
+import hashlib
+import logging
+from collections import OrderedDict
+
+from django.conf import settings
+
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from .base import ParseException
+from api.exceptions import NonIterableContentsException
+
+logger = logging.getLogger(__name__)
+
+# keys of the dict that is encoded in the cursor
+CURSOR_OFFSET_KEY = 'o'
+CURSOR_PARAMS_KEY = 'h'
+
+
+def get_query_params_hash(query_params):
+    '''
+    Returns a short hash of the query params which determine
+    the rows (and their order) of the contents, i.e. everything except
+    the pagination params. This is encoded in the cursor so that a
+    cursor created for one filter/sort is not used with another.
+    '''
+    params = sorted([
+        (k, v) for k,v in query_params.items()
+        if not k in [settings.CURSOR_PARAM, settings.PAGE_PARAM, settings.PAGE_SIZE_PARAM]
+    ])
+    return hashlib.md5(repr(params).encode('utf-8')).hexdigest()[:16]
+
+
+def encode_cursor(offset, params_hash):
+    '''
+    Creates the opaque cursor string. Clients should not attempt
+    to interpret or construct these.
+    '''
+    s = json.dumps({
+        CURSOR_OFFSET_KEY: offset,
+        CURSOR_PARAMS_KEY: params_hash
+    }, separators=(',',':'))
+    return base64.urlsafe_b64encode(s.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor):
+    '''
+    Returns a tuple of the (offset, params hash) encoded in the cursor
+    string. An empty cursor denotes the first "page" of the contents.
+
+    Raises a ParseException if the cursor is not valid.
+    '''
+    if not cursor:
+        return (0, None)
+    try:
+        d = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8'))
+        offset = int(d[CURSOR_OFFSET_KEY])
+        params_hash = d[CURSOR_PARAMS_KEY]
+    except Exception as ex:
+        logger.info('Failed to decode the cursor: {c}. Exception'
+            ' was: {ex}'.format(c=cursor, ex=ex))
+        raise ParseException('The cursor ({c}) was not valid.'.format(c=cursor))
+    if offset < 0:
+        raise ParseException('The cursor ({c}) was not valid.'.format(c=cursor))
+    return (offset, params_hash)
+
+
+def get_cursor_offset(query_params):
+    '''
+    Returns the position (in the filtered/sorted contents) of the first
+    record requested by the cursor, or None if there was no (valid) cursor.
+    '''
+    try:
+        return decode_cursor(query_params[settings.CURSOR_PARAM])[0]
+    except (KeyError, ParseException):
+        return None
+
+
+def get_page_size(query_params):
+    try:
+        page_size = int(query_params.get(settings.PAGE_SIZE_PARAM,
+            settings.REST_FRAMEWORK['PAGE_SIZE']))
+    except ValueError:
+        raise ParseException('The page size must be an integer.')
+    if page_size < 1:
+        raise ParseException('The page size must be a positive integer.')
+    return page_size
+
+
+class ResourceCursorPagination(BasePagination):
+    '''
+    A cursor-based pagination for resource contents (e.g. tables or
+    JSON arrays).
+
+    Unlike the page number-based paginators, this never asks for the total
+    number of records and only slices the records it returns (plus one, to
+    check whether there is a next page). Hence the cost of a "page"
+    does not depend on the size of the contents, which is the common
+    case for "infinite scroll"-type interfaces.
+
+    The cursor encodes the position within the filtered/sorted contents
+    along with a hash of the filter/sort params. Since the positions of
+    filtered/sorted tables are cached, this position is sufficient to
+    resume where the previous page stopped.
+    '''
+    cursor_query_param = settings.CURSOR_PARAM
+
+    def paginate_queryset(self, contents, request, view=None):
+
+        if isinstance(contents, (dict, str)):
+            raise NonIterableContentsException()
+
+        self.request = request
+        self.page_size = get_page_size(request.query_params)
+        self.params_hash = get_query_params_hash(request.query_params)
+        self.offset, params_hash = decode_cursor(
+            request.query_params.get(self.cursor_query_param))
+        if (params_hash is not None) and (params_hash != self.params_hash):
+            raise ParseException('The cursor was created for a different query.'
+                ' Cursors can only be used with the same filtering and sorting'
+                ' parameters as the request that returned them.')
+
+        # grab an extra record so we know whether there is a following page
+        records = contents[self.offset:self.offset + self.page_size + 1]
+        self.has_next = len(records) > self.page_size
+        return records[:self.page_size]
+
+    def get_link(self, offset):
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param,
+            encode_cursor(offset, self.params_hash))
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return self.get_link(self.offset + self.page_size)
+
+    def get_previous_link(self):
+        if self.offset == 0:
+            return None
+        return self.get_link(max(self.offset - self.page_size, 0))
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data)
+        ]))
@@ -3,16 +3,31 @@
 import logging
 import re
 import os
+import json
+import hashlib
+import struct
+import gzip
 from functools import reduce
 
 import pandas as pd
 import numpy as np
 
+try:
+    import pyarrow.csv as pyarrow_csv
+except ImportError:
+    pyarrow_csv = None
+
 from django.conf import settings
+from django.core.cache import cache
 from django.core.paginator import Paginator, Page
 from rest_framework.pagination import PageNumberPagination
 
-from .base import DataResource, ParseException, UnexpectedTypeValidationException
+from .base import DataResource, \
+    ParseException, \
+    UnexpectedTypeValidationException, \
+    GZIP_EXTENSION
+from .cache import parsed_resource_cache
+from .pagination import get_cursor_offset, get_page_size
 from api.data_structures import Feature, \
     FeatureSet, \
     Observation, \
@@ -39,6 +54,25 @@ TAB_DELIMITED_EXTENSIONS = [TSV, TAB, BED, VCF]
 COMMA_DELIMITED_EXTENSIONS = [CSV]
 EXCEL_EXTENSIONS = [XLS, XLSX]
 
+def with_compressed_extensions(extensions):
+    '''
+    Delimited files can also be gzip-compressed (e.g. "counts.tsv.gz"). 
+    Returns the list of `extensions` with the compressed versions of 
+    the delimited extensions appended.
+    '''
+    delimited_extensions = TAB_DELIMITED_EXTENSIONS + COMMA_DELIMITED_EXTENSIONS
+    return extensions + ['{e}.{gz}'.format(e=e, gz=GZIP_EXTENSION) 
+        for e in extensions if e in delimited_extensions]
+
+# The engines available for parsing delimited files. See the 
+# TABLE_READ_ENGINE setting.
+PANDAS_ENGINE = 'pandas'
+PYARROW_ENGINE = 'pyarrow'
+
+# The dtype (little-endian float32) of the values when sending a matrix
+# as a dense binary array. See `Matrix.serialize_dense`
+DENSE_MATRIX_DTYPE = '<f4'
+
 class ParserNotFoundException(Exception):
     '''
     For raising exceptions when a proper 
@@ -97,6 +131,56 @@ def col_str_formatter(x):
     return '%s (column %d)' % (x[0],x[1])
 
 
+class TableResourceContents(object):
+    '''
+    A lazy, list-like view of the (filtered and sorted) contents of a 
+    table-based resource.
+
+    Converting every row of a table into a serializable dict is costly for
+    large tables, but typically only a single page of rows is returned. This
+    class supports `len()` and bracketed indexing/slicing (as expected by the
+    django.core.paginator.Paginator class) and only converts the rows which
+    are actually requested.
+
+    The `tolist` method returns all the rows and is used, for instance, 
+    by the JSON encoder when the contents are not paginated.
+    '''
+
+    # when iterating, rows are converted in chunks of this size
+    ITERATION_CHUNK_SIZE = 1000
+
+    def __init__(self, table_resource):
+        # the TableResource instance, which holds the table (`table_resource.table`)
+        # and knows how to convert its rows.
+        self.table_resource = table_resource
+
+    @property
+    def table(self):
+        return self.table_resource.table
+
+    def __len__(self):
+        return self.table.shape[0]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.table_resource.serialize_rows(self.table.iloc[index])
+        elif isinstance(index, (int, np.integer)):
+            # use a list to select so that we keep a dataframe
+            return self.table_resource.serialize_rows(self.table.iloc[[index]])[0]
+        raise TypeError(
+            'Indices must be integers or slices, not %s.'
+            % type(index).__name__
+        )
+
+    def __iter__(self):
+        for i in range(0, len(self), self.ITERATION_CHUNK_SIZE):
+            for row in self[i:i + self.ITERATION_CHUNK_SIZE]:
+                yield row
+
+    def tolist(self):
+        return self[:]
+
+
 class TableResourcePage(Page):
     '''
     Overrides some methods of the django.core.paginator.Page
@@ -160,7 +244,7 @@ class TableResource(DataResource):
     for a BED file), then we assume you have features as rows and observables
     as columns.
     '''
-    ACCEPTABLE_EXTENSIONS = [
+    ACCEPTABLE_EXTENSIONS = with_compressed_extensions([
         CSV,
         TSV,
         TAB,
@@ -168,18 +252,51 @@ class TableResource(DataResource):
         VCF,
         XLS,
         XLSX
-    ]
+    ])
 
     # the "standardized" format we will save all table-based files as:
     STANDARD_FORMAT = TSV
 
+    # In addition to the standardized TSV, we save a columnar binary copy of 
+    # the table which is considerably faster to read than re-parsing the TSV.
+    COLUMNAR_SIDECAR = 'parquet'
+
+    # We also save an index of the row names (sorted after lowercasing)
+    # so that row-name filters (e.g. gene symbol lookups) can be 
+    # answered by binary search rather than a scan of all the rows.
+    ROWNAME_INDEX_SIDECAR = 'rownames.npz'
+    SIDECAR_SUFFIXES = [COLUMNAR_SIDECAR, ROWNAME_INDEX_SIDECAR]
+
+    # When the tables are loaded in "compact" mode, should string columns with
+    # few distinct values be converted to categoricals? Only sensible
+    # for tables which contain strings (e.g. annotations).
+    COMPACT_CATEGORICALS = False
+
     # Create a list of query params that are "reserved" and we ignore when
     # attempting to filter on the actual table content (e.g. the column/rows)
-    IGNORED_QUERY_PARAMS = [settings.PAGE_SIZE_PARAM, settings.PAGE_PARAM, settings.SORT_PARAM]
+    IGNORED_QUERY_PARAMS = [settings.PAGE_SIZE_PARAM, 
+        settings.PAGE_PARAM, 
+        settings.CURSOR_PARAM, 
+        settings.SORT_PARAM, 
+        settings.COLUMN_PROJECTION_PARAM
+    ]
 
     def __init__(self):
         self.table = None
 
+        # For very large files, we validate the table in chunks rather
+        # than loading the entire table into `self.table`. This flag
+        # indicates whether that happened.
+        self.validated_in_chunks = False
+
+        # an index of the row names, which is only loaded if
+        # the rows are being filtered by name
+        self.rowname_index = None
+
+        # If only a subset of the columns are requested, this is
+        # the list of those columns.
+        self.projected_columns = None
+
     @staticmethod
     def get_paginator():
         return TableResourcePageNumberPagination()
@@ -212,14 +329,55 @@ class TableResource(DataResource):
         Works for both row and column indexes.  Returns
         True if all the index labels are numbers.  
         '''
-        if all([re.match('\d+', str(x)) for x in names]):
-            return True
-        else:
-            return False
+        # vectorized equivalent of calling re.match('\d+', ...) on each label
+        labels = pd.Series(np.asarray(names, dtype=object), dtype=object).astype(str)
+        return bool(labels.str.match('\d+').all())
 
-    def read_resource(self, resource_path):
+    def read_resource(self, resource_path, use_cache=False, columns=None, compact=False):
         '''
         One common spot to define how the file is read
+
+        If `use_cache` is True, we first look for a previously parsed
+        copy of the table in the (per-process) cache of parsed resources
+        and add the table to that cache after parsing. Since
+        the callers modify `self.table`, we always work with a copy
+        of the cached table.
+
+        If `columns` is given, only those columns (which are assumed
+        to exist) are read, in addition to the row names.
+
+        If `compact` is True, the columns are stored using less memory
+        where that can be done without changing the values. See `compact_table`.
+        '''
+        if use_cache:
+            cache_key = parsed_resource_cache.get_key(resource_path, 
+                None if columns is None else tuple(columns), compact)
+            table = parsed_resource_cache.get(cache_key)
+            if table is not None:
+                logger.info('Using cached table for resource at {p}'.format(
+                    p = resource_path
+                ))
+                self.table = table.copy()
+                return
+            self.read_resource(resource_path, columns=columns, compact=compact)
+            parsed_resource_cache.put(cache_key, self.table.copy())
+            logger.info('Parsed resource cache stats: {s}'.format(
+                s = parsed_resource_cache.stats()
+            ))
+            return
+
+        # if a columnar copy of this table was written when the resource
+        # was standardized, read that instead
+        if not self.read_columnar_sidecar(resource_path, columns=columns):
+            self.parse_table(resource_path, columns=columns)
+
+        if compact:
+            self.compact_table()
+
+    def parse_table(self, resource_path, columns=None):
+        '''
+        Parses the file at `resource_path` into `self.table`. If `columns` 
+        is given, only those columns are parsed.
         '''
         reader = TableResource.get_reader(resource_path)
         if reader is None:
@@ -227,7 +385,31 @@ class TableResource(DataResource):
         else:
             try:
                 # read the table using the appropriate parser:
-                self.table = reader(resource_path, index_col=0, comment='#')
+                if columns is None:
+                    table = None
+                    if (settings.TABLE_READ_ENGINE == PYARROW_ENGINE) and \
+                        (reader in [pd.read_csv, pd.read_table]):
+                        table = TableResource.read_with_pyarrow(resource_path)
+                    if table is None:
+                        table = reader(resource_path, index_col=0, comment='#')
+                    self.table = table
+                else:
+                    # only parse the requested columns (and the first column, 
+                    # which has the row names)
+                    header = reader(resource_path, comment='#', nrows=0).columns
+                    requested = set(columns)
+
+                    # If the header does not have a label for the row names (e.g. as
+                    # written by R), it has one fewer field than the rows and the 
+                    # positions in the header do not correspond to those in the
+                    # rows. In that case, parse all the columns and select by name.
+                    first_row = reader(resource_path, index_col=0, comment='#', nrows=1)
+                    if first_row.shape[1] == len(header):
+                        table = reader(resource_path, index_col=0, comment='#')
+                        self.table = table[[c for c in table.columns if c in requested]]
+                    else:
+                        usecols = [0] + [i for i, c in enumerate(header) if (i > 0) and (c in requested)]
+                        self.table = reader(resource_path, index_col=0, comment='#', usecols=usecols)
 
                 # call a method to 
             except Exception as ex:
@@ -238,6 +420,258 @@ class TableResource(DataResource):
                 ))     
                 raise ParseException('Failed when parsing the table-based resource.')
 
+    @staticmethod
+    def read_with_pyarrow(resource_path):
+        '''
+        Parses the delimited file at `resource_path` using the (multithreaded)
+        pyarrow CSV reader. Since the pyarrow parser does not behave exactly like
+        the pandas parser, we only use it if the file has no comment characters
+        (which pandas strips, wherever they appear in a line) and compare the 
+        first rows to those parsed by pandas (e.g. in case of different types).
+
+        Returns a dataframe, or None if pyarrow could not parse the file or its
+        result differed from pandas. In that case the caller should use pandas.
+        '''
+        if pyarrow_csv is None:
+            return None
+        if TableResource.contains_comment_character(resource_path):
+            logger.info('The file at {p} has a comment character. Not'
+                ' using pyarrow to parse it.'.format(p = resource_path))
+            return None
+        reader = TableResource.get_reader(resource_path)
+        delimiter = ',' if reader == pd.read_csv else '\t'
+        try:
+            arrow_table = pyarrow_csv.read_csv(resource_path, 
+                parse_options=pyarrow_csv.ParseOptions(delimiter=delimiter),
+                convert_options=pyarrow_csv.ConvertOptions(strings_can_be_null=True)
+            )
+            table = arrow_table.to_pandas()
+            table = table.set_index(table.columns[0])
+
+            # pandas does not name the index if that header cell was blank
+            if table.index.name == '':
+                table.index.name = None
+
+            sample = reader(resource_path, index_col=0, comment='#', 
+                nrows=settings.TABLE_READ_ENGINE_CHECK_ROWS)
+            pd.testing.assert_frame_equal(table.iloc[:sample.shape[0]], sample,
+                check_exact=False, rtol=1e-12)
+            return table
+        except Exception as ex:
+            logger.info('Could not use pyarrow to parse the file at {p}, or'
+                ' the result differed from pandas. Exception was: {ex}'.format(
+                    p = resource_path,
+                    ex = ex
+                )
+            )
+            return None
+
+    @staticmethod
+    def contains_comment_character(resource_path, chunk_size=2**20):
+        '''
+        Returns True if the file at `resource_path` has a comment 
+        character ("#") anywhere. 
+        '''
+        if DataResource.is_compressed(resource_path):
+            fin = gzip.open(resource_path, 'rb')
+        else:
+            fin = open(resource_path, 'rb')
+        with fin:
+            for chunk in iter(lambda: fin.read(chunk_size), b''):
+                if b'#' in chunk:
+                    return True
+        return False
+
+    def compact_table(self):
+        '''
+        Reduces the memory used by `self.table` without changing any values:
+          - 64-bit integer columns are stored as 32-bit integers if the values fit.
+          - 64-bit float columns are stored as 32-bit floats if all the values
+            are exactly representable (e.g. 1.5, but not 0.1)
+          - if COMPACT_CATEGORICALS is True, string columns with few distinct
+            values (e.g. "CTRL"/"TREAT") are stored as categoricals.
+        '''
+        mem_before = self.table.memory_usage(index=True, deep=True).sum()
+        int32_info = np.iinfo(np.int32)
+        new_dtypes = {}
+        for c, dtype in self.table.dtypes.items():
+            col = self.table[c]
+            if pd.api.types.is_integer_dtype(dtype) and (dtype.itemsize > 4):
+                if (col.size == 0) or ((col.min() >= int32_info.min) and (col.max() <= int32_info.max)):
+                    new_dtypes[c] = np.int32
+            elif pd.api.types.is_float_dtype(dtype) and (dtype.itemsize > 4):
+                values = col.to_numpy()
+                if np.array_equal(values.astype(np.float32).astype(values.dtype), values, equal_nan=True):
+                    new_dtypes[c] = np.float32
+            elif self.COMPACT_CATEGORICALS and (dtype == object):
+                if col.nunique() <= settings.CATEGORICAL_MAX_UNIQUE_FRACTION * col.size:
+                    new_dtypes[c] = 'category'
+        if len(new_dtypes) > 0:
+            self.table = self.table.astype(new_dtypes)
+        mem_after = self.table.memory_usage(index=True, deep=True).sum()
+        self.compact_memory_savings = int(mem_before - mem_after)
+        logger.info('Compacting the table reduced its memory from {b} to {a} bytes'
+            ' (saved {s} bytes).'.format(
+                b = mem_before,
+                a = mem_after,
+                s = self.compact_memory_savings
+            )
+        )
+
+    def read_columnar_sidecar(self, resource_path, columns=None):
+        '''
+        Attempts to fill `self.table` from the columnar sidecar 
+        accompanying the file at `resource_path`. Since the sidecar
+        is columnar, reading a subset of `columns` only reads those.
+
+        Returns a bool indicating whether this was successful. If not, 
+        callers should parse the file itself.
+        '''
+        sidecar_path = self.get_sidecar_path(resource_path, self.COLUMNAR_SIDECAR)
+        if not self.sidecar_is_current(resource_path, sidecar_path):
+            return False
+        try:
+            self.table = pd.read_parquet(sidecar_path, columns=columns)
+            return True
+        except Exception as ex:
+            logger.info('Failed to read the columnar sidecar at {p}.'
+                ' Will parse the original file. Exception was: {ex}'.format(
+                    p = sidecar_path,
+                    ex = ex
+                )
+            )
+            return False
+
+    def write_columnar_sidecar(self, resource_path):
+        '''
+        Writes `self.table` in a columnar binary format next to the 
+        file at `resource_path`. 
+
+        Since this is only an optimization (the standardized file is always
+        available), failures are logged and otherwise ignored.
+        '''
+        sidecar_path = self.get_sidecar_path(resource_path, self.COLUMNAR_SIDECAR)
+        logger.info('Writing columnar sidecar to {p}'.format(p=sidecar_path))
+        try:
+            self.table.to_parquet(sidecar_path)
+        except Exception as ex:
+            logger.info('Failed to write the columnar sidecar for the resource'
+                ' at {p}. Exception was: {ex}'.format(
+                    p = resource_path,
+                    ex = ex
+                )
+            )
+            if os.path.exists(sidecar_path):
+                os.remove(sidecar_path)
+
+    def write_sidecars(self, resource_path):
+        '''
+        Writes all the sidecar files derived from `self.table` next to 
+        the (standardized) file at `resource_path`. Child classes can 
+        extend this to write additional sidecars.
+        '''
+        self.write_columnar_sidecar(resource_path)
+        self.write_rowname_index(resource_path)
+
+    def write_rowname_index(self, resource_path):
+        '''
+        Writes the index of row names next to the file at `resource_path`.
+        This holds the lowercased row names in sorted order, the
+        original row names in the same order, and their (integer) 
+        positions in the table.
+        '''
+        if self.table.index.inferred_type != 'string':
+            logger.info('Will not write a row name index for the resource'
+                ' at {p} since the row names are not all strings.'.format(
+                    p = resource_path
+                )
+            )
+            return
+        sidecar_path = self.get_sidecar_path(resource_path, self.ROWNAME_INDEX_SIDECAR)
+        logger.info('Writing row name index to {p}'.format(p=sidecar_path))
+        try:
+            names = self.table.index.values.astype(str)
+            keys = self.table.index.str.lower().values.astype(str)
+            order = np.argsort(keys, kind='stable')
+            np.savez(sidecar_path, 
+                keys=keys[order], 
+                names=names[order], 
+                positions=order
+            )
+        except Exception as ex:
+            logger.info('Failed to write the row name index for the resource'
+                ' at {p}. Exception was: {ex}'.format(
+                    p = resource_path,
+                    ex = ex
+                )
+            )
+            if os.path.exists(sidecar_path):
+                os.remove(sidecar_path)
+
+    def read_rowname_index(self, resource_path):
+        '''
+        Returns the row name index (a dict of arrays) for the file at
+        `resource_path`, or None if it is not available.
+        '''
+        sidecar_path = self.get_sidecar_path(resource_path, self.ROWNAME_INDEX_SIDECAR)
+        if not self.sidecar_is_current(resource_path, sidecar_path):
+            return None
+        cache_key = parsed_resource_cache.get_key(sidecar_path)
+        rowname_index = parsed_resource_cache.get(cache_key)
+        if rowname_index is not None:
+            return rowname_index
+        try:
+            with np.load(sidecar_path) as npz:
+                rowname_index = {k: npz[k] for k in ['keys', 'names', 'positions']}
+        except Exception as ex:
+            logger.info('Failed to read the row name index at {p}.'
+                ' Exception was: {ex}'.format(
+                    p = sidecar_path,
+                    ex = ex
+                )
+            )
+            return None
+        parsed_resource_cache.put(cache_key, rowname_index)
+        return rowname_index
+
+    def lookup_rownames(self, op_string, val):
+        '''
+        Uses the row name index to find the (integer) positions of the rows
+        matching the row-name filter given by the operator string and value.
+
+        Returns None if the index is not available or cannot be used for
+        that operator, in which case the caller should scan the row names.
+        '''
+        if (self.rowname_index is None) or \
+            (self.rowname_index['positions'].size != self.table.shape[0]):
+            return None
+        keys = self.rowname_index['keys']
+        names = self.rowname_index['names']
+        positions = self.rowname_index['positions']
+
+        def exact_matches(target):
+            lo = np.searchsorted(keys, target.lower(), side='left')
+            hi = np.searchsorted(keys, target.lower(), side='right')
+            return positions[lo:hi][names[lo:hi] == target]
+
+        if op_string in [settings.EQUAL_TO, '=', '==']:
+            return exact_matches(val)
+        elif op_string == settings.IS_IN:
+            targets = [a.strip() for a in val.split(',')]
+            return np.concatenate([exact_matches(x) for x in targets])
+        elif op_string == settings.CASE_INSENSITIVE_EQUALS:
+            lo = np.searchsorted(keys, val.lower(), side='left')
+            hi = np.searchsorted(keys, val.lower(), side='right')
+            return positions[lo:hi]
+        elif op_string == settings.STARTSWITH:
+            # all the keys starting with the prefix sort between
+            # the prefix itself and the prefix followed by the largest character
+            prefix = val.lower()
+            lo = np.searchsorted(keys, prefix, side='left')
+            hi = np.searchsorted(keys, prefix + chr(0x10FFFF), side='right')
+            return positions[lo:hi]
+        return None
+
     def performs_validation(self):
         '''
         Since we have methods to validate table-based DataResource types, we 
@@ -256,6 +690,10 @@ class TableResource(DataResource):
         classes.  This method, however, fills in the `self.table` member
         which is then accessible to children.
         '''
+        self.validated_in_chunks = False
+        if self.should_validate_in_chunks(resource_path):
+            return self.validate_type_in_chunks(resource_path)
+
         try:
             self.read_resource(resource_path)
             if self.table.shape == (0,0):
@@ -289,6 +727,114 @@ class TableResource(DataResource):
         except ParseException as ex:
             return (False, PARSE_ERROR)
      
+    def should_validate_in_chunks(self, resource_path):
+        '''
+        Returns True if the file is large enough that we should
+        not load it all at once for validation. Only delimited files 
+        (not Excel) can be read in chunks.
+        '''
+        if not TableResource.get_reader(resource_path) in [pd.read_csv, pd.read_table]:
+            return False
+        try:
+            return os.path.getsize(resource_path) > settings.CHUNKED_VALIDATION_THRESHOLD_BYTES
+        except OSError:
+            return False
+
+    def get_validation_chunksize(self, resource_path):
+        '''
+        Returns the number of rows to read in each chunk, based on the
+        size of the first few rows and the memory ceiling set for validation.
+        '''
+        reader = TableResource.get_reader(resource_path)
+        sample = reader(resource_path, index_col=0, comment='#', 
+            nrows=settings.CHUNKED_VALIDATION_SAMPLE_ROWS)
+        num_sample_rows = max(sample.shape[0], 1)
+        bytes_per_row = max(sample.memory_usage(index=True, deep=True).sum() / num_sample_rows, 1)
+
+        # parsing requires additional memory beyond the final size of the 
+        # chunk, so we only use a fraction of the ceiling for the chunk itself.
+        return max(int(settings.TABLE_VALIDATION_MEMORY_CEILING_BYTES / (4 * bytes_per_row)), 1)
+
+    def validate_type_in_chunks(self, resource_path):
+        '''
+        Performs the same checks as `validate_type`, but reads the table
+        in chunks so that the memory used is bounded. The checks
+        specific to the child classes are performed on each chunk by the
+        `validate_chunk` method.
+
+        Note that `self.table` is NOT filled by this method. Methods
+        which require the table will read it as needed. 
+        '''
+        logger.info('Validating the resource at {p} in chunks.'.format(
+            p = resource_path
+        ))
+        self.validated_in_chunks = True
+        reader = TableResource.get_reader(resource_path)
+        warning_message = None
+        rows_all_numbers = True
+        has_duplicate_rows = False
+        chunk_error = None
+        num_rows = 0
+        row_names = set()
+        try:
+            chunksize = self.get_validation_chunksize(resource_path)
+            chunks = reader(resource_path, index_col=0, comment='#', chunksize=chunksize)
+            for i, chunk in enumerate(chunks):
+                if i == 0:
+                    if chunk.shape[1] == 0:
+                        return (False, TRIVIAL_TABLE_ERROR)
+                    if TableResource.index_all_numbers(chunk.columns):
+                        return (False, NUMBERED_COLUMN_NAMES_ERROR)
+
+                num_rows += chunk.shape[0]
+                rows_all_numbers = rows_all_numbers and TableResource.index_all_numbers(chunk.index)
+
+                # check for duplicate row names, both within and across the chunks.
+                # As with the other checks below, this is reported after the
+                # entire file is read so the errors are reported in the same 
+                # order as `validate_type`
+                if not has_duplicate_rows:
+                    if chunk.index.has_duplicates or (not row_names.isdisjoint(chunk.index)):
+                        has_duplicate_rows = True
+                        row_names = set()
+                    else:
+                        row_names.update(chunk.index)
+
+                if chunk_error is None:
+                    is_valid, message = self.validate_chunk(chunk)
+                    if not is_valid:
+                        chunk_error = message
+                    elif message:
+                        warning_message = message
+        except Exception as ex:
+            logger.info('Failed when parsing the table at {p} in chunks.'
+                ' Exception was: {ex}'.format(
+                    p = resource_path,
+                    ex = ex
+                )
+            )
+            return (False, PARSE_ERROR)
+
+        if num_rows == 0:
+            return (False, EMPTY_TABLE_ERROR)
+        if rows_all_numbers:
+            return (False, NUMBERED_ROW_NAMES_ERROR)
+        if has_duplicate_rows:
+            return (False, NONUNIQUE_ROW_NAMES_ERROR)
+        if chunk_error is not None:
+            return (False, chunk_error)
+        return (True, warning_message)
+
+    def validate_chunk(self, chunk):
+        '''
+        A hook for child classes to perform their type-specific checks
+        on a chunk of the table (a dataframe) when validating in chunks.
+
+        Returns a tuple of (bool, str) like `validate_type`. The str can
+        be used to report warnings on valid chunks.
+        '''
+        return (True, None)
+
     def do_type_cast(self, v, typename):
         '''
         Used for casting the type when query params are provided.
@@ -339,8 +885,84 @@ class TableResource(DataResource):
             # at this point, all the sort orders and cols were OK. Now perform the sorting:
             # Need to convert our strings (e.g. "[asc]") to bools for the pandas sort_values method.
             order_bool = [True if x==settings.ASCENDING else False for x in sort_order_list]                
+
+            # If only the first page(s) of the sorted table will be returned, we
+            # don't need to sort the entire table.
+            needed_rows = self.get_needed_row_count(query_params)
+            if (needed_rows is not None) and (needed_rows <= settings.PARTIAL_SORT_MAX_ROWS):
+                if self.perform_partial_sorting(column_list, order_bool, needed_rows):
+                    return
             self.table.sort_values(by=column_list, ascending=order_bool, inplace=True)
 
+    @staticmethod
+    def get_needed_row_count(query_params):
+        '''
+        Returns the number of rows (counting from the start of the table) 
+        that are needed to serve the requested page. If the request was
+        not paginated (so the full table is returned), returns None.
+        '''
+        if settings.CURSOR_PARAM in query_params:
+            # for cursor-based pagination, we need the rows up to the 
+            # end of the page and one more (to check for a following page)
+            offset = get_cursor_offset(query_params)
+            if offset is None:
+                return None
+            try:
+                return offset + get_page_size(query_params) + 1
+            except ParseException:
+                return None
+        if not settings.PAGE_PARAM in query_params:
+            return None
+        try:
+            page = int(query_params[settings.PAGE_PARAM])
+            page_size = int(query_params.get(settings.PAGE_SIZE_PARAM, 
+                settings.REST_FRAMEWORK['PAGE_SIZE']))
+        except ValueError:
+            return None
+        if (page < 1) or (page_size < 1):
+            return None
+        return page * page_size
+
+    def perform_partial_sorting(self, column_list, order_bool, needed_rows):
+        '''
+        Sorts such that the first `needed_rows` rows of self.table are
+        identical to those of a full sort. The remaining rows are left 
+        unsorted, following the sorted rows.
+
+        Using a partial selection (`np.partition`) on the first sort column, 
+        we find the candidate rows which could be among the first `needed_rows`. 
+        Only those are sorted (using all of the sort columns). To preserve the 
+        ordering on subsequent columns, all rows tied with the final candidate
+        (on the first column) are included.
+
+        Returns a bool indicating whether the partial sort was performed. If
+        not (e.g. if the first sort column is not numeric), the caller
+        should perform a full sort.
+        '''
+        N = self.table.shape[0]
+        if needed_rows >= N:
+            return False
+        first_col = self.table[column_list[0]]
+        if not pd.api.types.is_numeric_dtype(first_col):
+            return False
+
+        vals = first_col.to_numpy(dtype=float)
+        if not order_bool[0]:
+            vals = -vals
+        # NaNs are sorted to the end. Hence, if we need rows beyond
+        # the non-NaN values, do a full sort.
+        non_nan_vals = vals[~np.isnan(vals)]
+        if needed_rows > non_nan_vals.size:
+            return False
+        kth_val = np.partition(non_nan_vals, needed_rows - 1)[needed_rows - 1]
+
+        # note that NaNs are not among the candidates since the comparison is False
+        candidates = vals <= kth_val
+        head = self.table.loc[candidates].sort_values(by=column_list, ascending=order_bool)
+        self.table = pd.concat([head, self.table.loc[~candidates]])
+        self.sorted_row_count = head.shape[0]
+        return True
+
     def filter_against_query_params(self, query_params):
         '''
         Looks through the query params to subset the table
@@ -382,17 +1004,15 @@ class TableResource(DataResource):
                 elif len(split_v) == 2:
                     val = self.do_type_cast(split_v[1], column_type)
                     try:
-                        op = settings.OPERATOR_MAPPING[split_v[0]]
+                        op = settings.VECTORIZED_OPERATOR_MAPPING[split_v[0]]
                     except KeyError as ex:
                         raise ParseException('The operator string ("{s}") was not understood. Choose'
                             ' from among: {vals}'.format(
                                 s = split_v[0],
-                                vals = ','.join(settings.OPERATOR_MAPPING.keys())
+                                vals = ','.join(settings.VECTORIZED_OPERATOR_MAPPING.keys())
                             )
                         )
-                    filters.append(
-                        self.table[k].apply(lambda x: op(x, val))
-                    )
+                    filters.append(op(self.table[k], val))
                 else:
                     raise ParseException('The query param string ({v}) for filtering on'
                         ' the {col} column was not formatted properly.'.format(
@@ -410,16 +1030,22 @@ class TableResource(DataResource):
                 # the filter value from a string
                 val = split_v[1]
                 try:
-                    op = settings.OPERATOR_MAPPING[split_v[0]]
+                    op = settings.VECTORIZED_OPERATOR_MAPPING[split_v[0]]
                 except KeyError as ex:
                     raise ParseException('The operator string ("{s}") was not understood. Choose'
                         ' from among: {vals}'.format(
                             s = split_v[0],
-                            vals = ','.join(settings.OPERATOR_MAPPING.keys())
+                            vals = ','.join(settings.VECTORIZED_OPERATOR_MAPPING.keys())
                         )
                     )
                 try:
-                    rowname_filter = self.table.index.to_series().apply(lambda x: op(x, val))
+                    matched_positions = self.lookup_rownames(split_v[0], val)
+                    if matched_positions is not None:
+                        rowname_filter = np.zeros(self.table.shape[0], dtype=bool)
+                        rowname_filter[matched_positions] = True
+                        rowname_filter = pd.Series(rowname_filter, index=self.table.index)
+                    else:
+                        rowname_filter = op(self.table.index.to_series(), val)
                     filters.append(rowname_filter)
                 except Exception as ex:
                     raise ParseException('Error encountered with filter on rows.'
@@ -456,11 +1082,19 @@ class TableResource(DataResource):
         ensure you don't call this method first, as it will replace infinity values with
         strings and the filter won't work properly.
         '''
-        self.table = self.table.replace({
+        self.table = TableResource.scrub_special_values(self.table)
+
+    @staticmethod
+    def scrub_special_values(table):
+        '''
+        Returns a copy of `table` where the NaN and Inf values have been
+        replaced by JSON-compatible values. See `replace_special_values`.
+        '''
+        table = table.replace({
             -np.infty: settings.NEGATIVE_INF_MARKER, 
             np.infty: settings.POSITIVE_INF_MARKER
         })
-        self.table = self.table.mask(pd.isnull, None)
+        return table.mask(pd.isnull, None)
 
     def _resource_specific_modifications(self):
         '''
@@ -496,34 +1130,174 @@ class TableResource(DataResource):
         d['rowname'] = row.name
         return d
 
+    def get_result_cache_key(self, resource_path, query_params):
+        '''
+        Returns a key which identifies the result of filtering and
+        sorting the table at `resource_path` as dictated by `query_params`.
+
+        Since the pagination params don't change which rows are returned
+        (or their order), those are not included. If there are
+        no params that change the rows, we return None as there is 
+        nothing to cache.
+        '''
+        params = sorted([
+            (k, v) for k,v in query_params.items()
+            if not k in [settings.PAGE_PARAM, settings.PAGE_SIZE_PARAM, settings.CURSOR_PARAM]
+        ])
+        if len(params) == 0:
+            return None
+        file_key = parsed_resource_cache.get_key(resource_path)
+        if file_key is None:
+            return None
+        h = hashlib.md5(repr((file_key, params)).encode('utf-8')).hexdigest()
+        return 'table-result-positions-{h}'.format(h=h)
+
+    def get_cached_positions(self, key, needed_rows=None):
+        '''
+        Returns an array of the row positions (relative to the 
+        full table) resulting from a previous filter/sort, or None
+
+        Since the table may have only been partially sorted, `needed_rows`
+        gives the number of rows which need to be in their final order.
+        If None, all the rows are needed.
+        '''
+        if key is None:
+            return None
+        try:
+            result = cache.get(key)
+        except Exception as ex:
+            # the cache is only used to speed things up, so failures
+            # here should not cause the request to fail.
+            logger.info('Failed to query the cache for table results.'
+                ' Exception was: {ex}'.format(ex=ex))
+            return None
+        if result is None:
+            return None
+        positions, sorted_row_count = result
+        if needed_rows is None:
+            needed_rows = positions.size
+        if sorted_row_count < min(needed_rows, positions.size):
+            return None
+        return positions
+
+    def cache_positions(self, key, positions, sorted_row_count):
+        '''
+        Caches the array of row positions resulting from a filter/sort. 
+        The number of rows (at the start) which are in their final
+        sorted order is given by `sorted_row_count`.
+        '''
+        try:
+            cache.set(key, 
+                (positions.astype(np.int32 if positions.size < 2**31 else np.int64), 
+                    sorted_row_count),
+                settings.TABLE_RESULT_CACHE_TIMEOUT_SECONDS
+            )
+        except Exception as ex:
+            logger.info('Failed to cache the table results.'
+                ' Exception was: {ex}'.format(ex=ex))
+
+    def serialize_rows(self, table):
+        '''
+        Converts the rows of `table` (a subset of the rows of `self.table`)
+        into a list of dicts which can be serialized. 
+        '''
+        if table.shape[0] == 0:
+            return []
+        if self.projected_columns is not None:
+            # columns which were only needed for filtering/sorting are dropped
+            table = table[self.projected_columns + self.additional_exported_cols]
+        # categoricals (see `compact_table`) are converted back to plain
+        # strings for serialization
+        categorical_cols = [c for c, dtype in table.dtypes.items() 
+            if pd.api.types.is_categorical_dtype(dtype)]
+        if len(categorical_cols) > 0:
+            table = table.astype({c: object for c in categorical_cols})
+        table = TableResource.scrub_special_values(table)
+        standard_cols = [x for x in table.columns if not x in self.additional_exported_cols]
+        content = table[standard_cols].apply(self.main_contents_converter, axis=1).tolist()
+        if self.additional_exported_cols:
+            additional_content = table[self.additional_exported_cols].apply(self.extra_contents_converter, axis=1).tolist()
+            for x,y in zip(content, additional_content):
+                x.update(y)
+        return content
+
+    def get_columns_to_read(self, resource_path, query_params):
+        '''
+        If a subset of the columns was requested, returns the list of columns
+        which need to be read. In addition to the requested columns, 
+        this includes any columns used for filtering or sorting. Also sets
+        `self.projected_columns`, which are the columns that are returned.
+
+        Returns None if all columns should be read.
+        '''
+        self.projected_columns = None
+        if not settings.COLUMN_PROJECTION_PARAM in query_params:
+            return None
+        projected_columns = [x.strip() for x in 
+            query_params[settings.COLUMN_PROJECTION_PARAM].split(',') if x.strip()]
+        available_columns = self.read_column_names(resource_path)
+        missing_columns = [x for x in projected_columns if not x in available_columns]
+        if len(missing_columns) > 0:
+            raise ParseException('The requested column(s) {c} do not exist in'
+                ' this resource.'.format(c = ','.join(missing_columns)))
+        self.projected_columns = list(dict.fromkeys(projected_columns))
+
+        additional_columns = [k for k in query_params if not k in self.IGNORED_QUERY_PARAMS]
+        if settings.SORT_PARAM in query_params:
+            additional_columns.extend([x.split(settings.QUERY_PARAM_DELIMITER)[-1] 
+                for x in query_params[settings.SORT_PARAM].split(',')])
+        additional_columns = [x for x in additional_columns if x in available_columns]
+        return list(dict.fromkeys(self.projected_columns + additional_columns))
+
     def get_contents(self, resource_path, query_params={}):
         '''
-        Returns a dataframe of the table contents
+        Returns a list-like `TableResourceContents` instance
+        wrapping the (filtered, sorted) table.
 
-        The dataframe allows the caller to subset as needed to 'paginate'
-        the rows of the table
+        This allows the caller to subset as needed to 'paginate'
+        the rows of the table. Only those rows which are requested are 
+        converted into serializable dicts.
         '''
 
         try:
             logger.info('Read resource at {p}'.format(p=resource_path))
-            self.read_resource(resource_path)
+            self.read_resource(resource_path, use_cache=True, 
+                columns=self.get_columns_to_read(resource_path, query_params),
+                compact=settings.COMPACT_TABLE_LOADING)
             self.additional_exported_cols = []
+            if settings.ROWNAME_FILTER in query_params:
+                self.rowname_index = self.read_rowname_index(resource_path)
+
+            # If we have previously filtered/sorted this table in the same
+            # manner (e.g. when requesting successive pages), we have the 
+            # resulting row positions cached and can skip those steps.
+            result_cache_key = self.get_result_cache_key(resource_path, query_params)
+            positions = self.get_cached_positions(result_cache_key, 
+                self.get_needed_row_count(query_params))
+            if positions is not None:
+                self.table = self.table.iloc[positions]
+                # this hook can also add columns (e.g. row means) which
+                # are returned with the contents, so we still call it.
+                self._resource_specific_modifications()
+                return TableResourceContents(self)
+
+            original_index = self.table.index
 
             # if there were any filtering params requested, apply those
             self.filter_against_query_params(query_params)
             self._resource_specific_modifications()
+
+            # The number of rows at the start of the table which are in their
+            # final order. The sorting can change this if it only performs
+            # a partial sort.
+            self.sorted_row_count = self.table.shape[0]
             self.perform_sorting(query_params)
-            self.replace_special_values()
-            if self.table.shape[0] > 0:
-                standard_cols = [x for x in self.table.columns if not x in self.additional_exported_cols]
-                content = self.table[standard_cols].apply(self.main_contents_converter, axis=1).tolist()
-                if self.additional_exported_cols:
-                    additional_content = self.table[self.additional_exported_cols].apply(self.extra_contents_converter, axis=1).tolist()
-                    for x,y in zip(content, additional_content):
-                        x.update(y)
-                return content
-            else:
-                return []
+
+            if (result_cache_key is not None) and original_index.is_unique:
+                self.cache_positions(result_cache_key, 
+                    original_index.get_indexer(self.table.index),
+                    self.sorted_row_count)
+            return TableResourceContents(self)
         # for these first two exceptions, we already have logged
         # any problems when we called the `read_resource` method
         except ParserNotFoundException as ex:
@@ -556,8 +1330,15 @@ class TableResource(DataResource):
         ))
 
         # If the self.table field was not already filled, we need to 
-        # read the data
-        if self.table is None:
+        # read the data. If the table was validated in chunks (and is 
+        # hence not filled) we don't repeat the validation.
+        if self.validated_in_chunks:
+            logger.info('Resource with path ({path}) was previously'
+                ' validated in chunks.'.format(
+                    path=resource_path
+                )
+            )
+        elif self.table is None:
             logger.info('Resource with path ({path}) was not '
                 'previously parsed.  Do that now.'.format(
                     path=resource_path
@@ -592,6 +1373,11 @@ class TableResource(DataResource):
             path = resource_path
         ))
 
+        # If the table was validated in chunks, we also standardize in
+        # chunks, which keeps the memory usage bounded.
+        if (self.table is None) and self.validated_in_chunks:
+            return self.save_in_standardized_format_in_chunks(resource_path, resource_name)
+
         # If the self.table field was not already filled, we need to 
         # read the data
         if self.table is None:
@@ -611,17 +1397,7 @@ class TableResource(DataResource):
                     )
                 )
         # ok, self.table is set-- save it.
-        current_file_extension = DataResource.get_extension(resource_path)
-        file_dir =  os.path.dirname(resource_path)
-        basename = os.path.basename(resource_path)
-        basename_contents = basename.split('.')
-        basename_contents[-1] = self.STANDARD_FORMAT
-        new_basename = '.'.join(basename_contents)
-        new_path = os.path.join(file_dir, new_basename)
-
-        name_contents = resource_name.split('.')
-        name_contents[-1] = self.STANDARD_FORMAT
-        new_name = '.'.join(name_contents)
+        new_path, new_name = self.get_standardized_path_and_name(resource_path, resource_name)
 
         logger.info('Writing the reformatted table-based resource to: {p}.'
             ' The new name is {n}.'.format(
@@ -629,20 +1405,81 @@ class TableResource(DataResource):
             n = new_name
         ))
         self.table.to_csv(new_path, sep='\t')
+        self.write_sidecars(new_path)
         return new_path, new_name   
 
+    def get_standardized_path_and_name(self, resource_path, resource_name):
+        '''
+        Returns the path and name of the resource once it is saved in
+        the standardized format. If the COMPRESS_STANDARDIZED_TABLES setting
+        is True, the standardized file is gzip-compressed (e.g. "counts.tsv.gz")
+        '''
+        def standardize(name):
+            name_contents = name.split('.')
+            # remove the compression extension (if any), so that 
+            # the "real" extension is replaced
+            if DataResource.is_compressed(name) and (len(name_contents) > 2):
+                name_contents = name_contents[:-1]
+            name_contents[-1] = self.STANDARD_FORMAT
+            if settings.COMPRESS_STANDARDIZED_TABLES:
+                name_contents.append(GZIP_EXTENSION)
+            return '.'.join(name_contents)
+
+        file_dir =  os.path.dirname(resource_path)
+        new_path = os.path.join(file_dir, standardize(os.path.basename(resource_path)))
+        new_name = standardize(resource_name)
+        return new_path, new_name
+
+    def save_in_standardized_format_in_chunks(self, resource_path, resource_name):
+        '''
+        Saves the table in the standardized format without loading 
+        the entire table into memory. Since the file may be re-written
+        to the same path, we write to a temporary file first.
+
+        Note that we do not write the columnar sidecar in this case.
+        '''
+        new_path, new_name = self.get_standardized_path_and_name(resource_path, resource_name)
+        logger.info('Writing the reformatted table-based resource to: {p}'
+            ' in chunks. The new name is {n}.'.format(
+            p = new_path,
+            n = new_name
+        ))
+        tmp_path = '{p}.tmp'.format(p=new_path)
+        reader = TableResource.get_reader(resource_path)
+        chunks = reader(resource_path, index_col=0, comment='#', 
+            chunksize=self.get_validation_chunksize(resource_path))
+
+        # the compression can't be inferred from the temporary path. Note that
+        # appending to a gzip file adds a new gzip "member", which is valid.
+        compression = 'gzip' if DataResource.is_compressed(new_path) else None
+        for i, chunk in enumerate(chunks):
+            chunk.to_csv(tmp_path, sep='\t', mode='w' if i == 0 else 'a', 
+                header=(i == 0), compression=compression)
+        os.replace(tmp_path, new_path)
+        return new_path, new_name
+
+    def read_column_names(self, resource_path):
+        '''
+        Returns the column names of the table without reading the 
+        entire table (if it was not already read).
+        '''
+        if self.table is not None:
+            return self.table.columns
+        reader = TableResource.get_reader(resource_path)
+        return reader(resource_path, index_col=0, comment='#', nrows=0).columns
+
 class Matrix(TableResource):
     '''
     A `Matrix` is a delimited table-based file that has only numeric types.
     These types can be mixed, like floats and integers
     '''
-    ACCEPTABLE_EXTENSIONS = [
+    ACCEPTABLE_EXTENSIONS = with_compressed_extensions([
         CSV,
         TSV,
         TAB,
         XLS,
         XLSX
-    ]
+    ])
 
     DESCRIPTION = 'A table of where all the entries are numbers'\
         ' except the first column (which names the rows) and the' \
@@ -682,28 +1519,221 @@ class Matrix(TableResource):
 
     # Define some additional filtering/sorting params that
     # are specific to this type and its children.
-    # A special filter for allowing filtering of numeric tables based on
-    # the row means
+    # Special filters for allowing filtering of numeric tables based on
+    # statistics of each row (e.g. the row means). Once requested (either 
+    # by filtering or the "include" params), these can also be used for sorting.
     ROWMEAN_KEYWORD = '__rowmean__'
+    ROWVAR_KEYWORD = '__rowvar__'
+    ROWMIN_KEYWORD = '__rowmin__'
+    ROWMAX_KEYWORD = '__rowmax__'
+    ROW_NONZERO_KEYWORD = '__rownonzero__'
+    ROW_STATISTICS = {
+        ROWMEAN_KEYWORD: lambda t: t.mean(axis=1),
+        ROWVAR_KEYWORD: lambda t: t.var(axis=1),
+        ROWMIN_KEYWORD: lambda t: t.min(axis=1),
+        ROWMAX_KEYWORD: lambda t: t.max(axis=1),
+        ROW_NONZERO_KEYWORD: lambda t: (t.fillna(0) != 0).sum(axis=1)
+    }
     INCLUDE_ROWMEANS = '__incl_rowmeans__'
-    EXTRA_MATRIX_QUERY_PARAMS = [
-        ROWMEAN_KEYWORD,
-        INCLUDE_ROWMEANS
+
+    # Includes the row statistics without filtering. The value can be a 
+    # comma-delimited list of the statistics (e.g. "__rowvar__,__rowmax__").
+    # If no value is given, all the statistics are included.
+    INCLUDE_ROWSTATS = '__incl_rowstats__'
+    EXTRA_MATRIX_QUERY_PARAMS = list(ROW_STATISTICS.keys()) + [
+        INCLUDE_ROWMEANS,
+        INCLUDE_ROWSTATS
     ]
 
+    # The row statistics are computed when the matrix is saved
+    # and stored next to the resource.
+    ROW_STATISTICS_SIDECAR = 'rowstats.parquet'
+
     # Copy the ignored params from the parent (don't want to modify that)
     IGNORED_QUERY_PARAMS = [x for x in TableResource.IGNORED_QUERY_PARAMS]
     IGNORED_QUERY_PARAMS.extend(EXTRA_MATRIX_QUERY_PARAMS)
 
-    def check_column_types(self, target_pattern):
+    # Numeric matrices with a single dtype are also stored as a dense
+    # array (in numpy's .npy format) which can be memory-mapped, with the
+    # row/column labels stored separately. Reading the matrix from the 
+    # memory map means that multiple worker processes share the OS page 
+    # cache rather than each holding a parsed copy of the matrix.
+    MEMMAP_SIDECAR = 'npy'
+    MEMMAP_LABELS_SIDECAR = 'labels.json'
+    SIDECAR_SUFFIXES = TableResource.SIDECAR_SUFFIXES + [
+        MEMMAP_SIDECAR,
+        MEMMAP_LABELS_SIDECAR,
+        ROW_STATISTICS_SIDECAR
+    ]
+
+    def read_resource(self, resource_path, use_cache=False, columns=None, compact=False):
+        '''
+        If a memory-mapped copy of the matrix is available, use that.
+        Note that we do NOT put memory-mapped tables in the per-process 
+        cache of parsed resources since that would create an in-memory copy.
+        For the same reason, we don't compact the memory-mapped tables.
+        '''
+        if self.read_memmap_sidecar(resource_path, columns=columns):
+            return
+        super().read_resource(resource_path, use_cache=use_cache, 
+            columns=columns, compact=compact)
+
+    def read_memmap_sidecar(self, resource_path, columns=None):
+        '''
+        Attempts to fill `self.table` with a dataframe backed by
+        the memory-mapped array accompanying the file at `resource_path`.
+        If `columns` is given, only those columns are copied out of the 
+        memory-mapped array.
+
+        Returns a bool indicating whether this was successful.
+        '''
+        values_path = self.get_sidecar_path(resource_path, self.MEMMAP_SIDECAR)
+        labels_path = self.get_sidecar_path(resource_path, self.MEMMAP_LABELS_SIDECAR)
+        if not (self.sidecar_is_current(resource_path, values_path) and 
+            self.sidecar_is_current(resource_path, labels_path)):
+            return False
+        try:
+            with open(labels_path) as fin:
+                labels = json.load(fin)
+            values = np.load(values_path, mmap_mode='r')
+
+            # the array is read-only, so operations on the dataframe will
+            # create copies (of the subset) rather than modify the array.
+            self.table = pd.DataFrame(values,
+                index=pd.Index(labels['index'], name=labels['index_name']),
+                columns=labels['columns'],
+                copy=False
+            )
+            if columns is not None:
+                self.table = self.table[columns]
+            return True
+        except Exception as ex:
+            logger.info('Failed to read the memory-mapped sidecar at {p}.'
+                ' Exception was: {ex}'.format(
+                    p = values_path,
+                    ex = ex
+                )
+            )
+            return False
+
+    def write_memmap_sidecar(self, resource_path):
+        '''
+        Writes `self.table` as a dense array next to the file at
+        `resource_path`, along with the row/column labels. 
+        
+        We only do this if all the columns share the same dtype
+        so that the contents are unchanged (e.g. an integer matrix
+        with missing values has both float and int columns).
+        '''
+        if (self.table.shape[1] == 0) or (self.table.dtypes.nunique() != 1):
+            logger.info('Will not write a memory-mapped sidecar for the'
+                ' resource at {p} since the columns do not share'
+                ' a single dtype.'.format(p=resource_path))
+            return
+        values_path = self.get_sidecar_path(resource_path, self.MEMMAP_SIDECAR)
+        labels_path = self.get_sidecar_path(resource_path, self.MEMMAP_LABELS_SIDECAR)
+        logger.info('Writing memory-mapped sidecar to {p}'.format(p=values_path))
+        try:
+            # write the labels first since the array is the larger of the two
+            # and readers require both to be current.
+            with open(labels_path, 'w') as fout:
+                json.dump({
+                    'index': self.table.index.tolist(),
+                    'index_name': self.table.index.name,
+                    'columns': self.table.columns.tolist()
+                }, fout)
+            np.save(values_path, np.ascontiguousarray(self.table.values))
+        except Exception as ex:
+            logger.info('Failed to write the memory-mapped sidecar for the resource'
+                ' at {p}. Exception was: {ex}'.format(
+                    p = resource_path,
+                    ex = ex
+                )
+            )
+            for p in [values_path, labels_path]:
+                if os.path.exists(p):
+                    os.remove(p)
+
+    def write_sidecars(self, resource_path):
+        super().write_sidecars(resource_path)
+        self.write_memmap_sidecar(resource_path)
+        self.write_row_statistics(resource_path)
+
+    def compute_row_statistics(self, stat_list):
+        '''
+        Computes the requested row statistics (a list of keywords 
+        from ROW_STATISTICS) on the current table. Returns a dataframe
+        with one column per statistic.
+        '''
+        # if the table was compacted, the float32 columns are cast back so that the
+        # statistics are computed at the same precision as the precomputed values
+        table = self.table
+        float32_cols = [c for c, dtype in table.dtypes.items() if dtype == np.float32]
+        if len(float32_cols) > 0:
+            table = table.astype({c: np.float64 for c in float32_cols})
+        return pd.DataFrame(
+            {k: self.ROW_STATISTICS[k](table) for k in stat_list},
+            index=table.index
+        )
+
+    def write_row_statistics(self, resource_path):
+        '''
+        Computes all the row statistics and saves them next to the file 
+        at `resource_path`.
+        '''
+        sidecar_path = self.get_sidecar_path(resource_path, self.ROW_STATISTICS_SIDECAR)
+        logger.info('Writing row statistics to {p}'.format(p=sidecar_path))
+        try:
+            self.compute_row_statistics(list(self.ROW_STATISTICS.keys())).to_parquet(sidecar_path)
+        except Exception as ex:
+            logger.info('Failed to write the row statistics for the resource'
+                ' at {p}. Exception was: {ex}'.format(
+                    p = resource_path,
+                    ex = ex
+                )
+            )
+            if os.path.exists(sidecar_path):
+                os.remove(sidecar_path)
+
+    def read_row_statistics(self, resource_path):
+        '''
+        Returns a dataframe of the precomputed row statistics for the file
+        at `resource_path`, or None if they are not available.
+        '''
+        sidecar_path = self.get_sidecar_path(resource_path, self.ROW_STATISTICS_SIDECAR)
+        if not self.sidecar_is_current(resource_path, sidecar_path):
+            return None
+        cache_key = parsed_resource_cache.get_key(sidecar_path)
+        row_statistics = parsed_resource_cache.get(cache_key)
+        if row_statistics is not None:
+            return row_statistics
+        try:
+            row_statistics = pd.read_parquet(sidecar_path)
+        except Exception as ex:
+            logger.info('Failed to read the row statistics at {p}.'
+                ' Exception was: {ex}'.format(
+                    p = sidecar_path,
+                    ex = ex
+                )
+            )
+            return None
+        parsed_resource_cache.put(cache_key, row_statistics)
+        return row_statistics
+
+    def check_column_types(self, target_pattern, table=None):
         '''
         Checks each column against a specific numpy/pandas dtype.
         The specific dtype comes from the class member.
+
+        By default, checks `self.table`, but another table (e.g. a chunk
+        of the full table) can be passed.
         '''
+        if table is None:
+            table = self.table
         problem_columns = []
-        for i,col in enumerate(self.table.dtypes):
+        for i,col in enumerate(table.dtypes):
             if not re.match(target_pattern, str(col)):
-                colname = self.table.columns[i]
+                colname = table.columns[i]
                 problem_columns.append(
                     (colname, i+1)
                 )
@@ -715,6 +1745,11 @@ class Matrix(TableResource):
         if not is_valid:
             return (False, error_msg)
 
+        # if validated in chunks, the checks below were 
+        # already performed on each chunk
+        if self.validated_in_chunks:
+            return (True, error_msg)
+
         # was able to at least open/parse the file.
         # now check for numeric types
         problem_columns = self.check_column_types(Matrix.TARGET_PATTERN)
@@ -725,6 +1760,14 @@ class Matrix(TableResource):
 
         return (True, None)
 
+    def validate_chunk(self, chunk):
+        is_valid, message = super().validate_chunk(chunk)
+        if not is_valid:
+            return (False, message)
+        if len(self.check_column_types(Matrix.TARGET_PATTERN, chunk)) > 0:
+            return (False, NON_NUMERIC_ERROR)
+        return (True, message)
+
     def extract_metadata(self, resource_path, parent_op_pk=None):
 
         super().extract_metadata(resource_path, parent_op_pk)
@@ -736,67 +1779,163 @@ class Matrix(TableResource):
         # self.metadata[DataResource.FEATURE_SET] = FeatureSetSerializer(f_set).data
 
         # the ObservationSet comes from the cols:
-        o_set = ObservationSet([Observation(x) for x in self.table.columns])
+        o_set = ObservationSet([Observation(x) for x in self.read_column_names(resource_path)])
         self.metadata[DataResource.OBSERVATION_SET] = ObservationSetSerializer(o_set).data
         return self.metadata
 
-    def _resource_specific_modifications(self):
-        if not self.extra_query_params:
-            return
+    def get_submatrix(self, resource_path, rows=None, columns=None):
+        '''
+        Returns a dataframe with the requested rows and columns (in the
+        order they were requested). If `rows` or `columns` is None, all the 
+        rows or columns are returned, respectively.
 
-        filters = []
-        if self.ROWMEAN_KEYWORD in self.extra_query_params:
-            self.additional_exported_cols.append(self.ROWMEAN_KEYWORD)
-            self.table[self.ROWMEAN_KEYWORD] = self.table.mean(axis=1)
-            filter_string = self.extra_query_params[self.ROWMEAN_KEYWORD]
-            split_str = filter_string.split(settings.QUERY_PARAM_DELIMITER)
-            if len(split_str) == 1:
-                # strict equality
-                try:
-                    val = float(split_str[0])
-                except ValueError as ex:
-                    raise ParseException('Could not parse the request'
-                        ' for filtering on the row means. The value'
-                        ' could not be interpreted as a number.'
-                    )
+        Raises a ParseException if any of the rows or columns do not exist.
+        '''
+        if columns is not None:
+            columns = list(dict.fromkeys(columns))
+            available_columns = self.read_column_names(resource_path)
+            missing_columns = [x for x in columns if not x in available_columns]
+            if len(missing_columns) > 0:
+                raise ParseException('The requested column(s) {c} do not exist in'
+                    ' this resource.'.format(c = ','.join(missing_columns)))
+        self.read_resource(resource_path, use_cache=True, columns=columns)
+        if columns is not None:
+            self.table = self.table[columns]
+        if rows is not None:
+            rows = list(dict.fromkeys(rows))
+            positions = self.table.index.get_indexer(rows)
+            missing_rows = [x for x,i in zip(rows, positions) if i < 0]
+            if len(missing_rows) > 0:
+                raise ParseException('The requested row(s) {r} do not exist in'
+                    ' this resource.'.format(r = ','.join(missing_rows)))
+            self.table = self.table.iloc[positions]
+        return self.table
 
-                filters.append(self.table[self.ROWMEAN_KEYWORD] == val)
+    @staticmethod
+    def serialize_dense(table):
+        '''
+        Returns bytes representing the table as a dense array, which is 
+        considerably smaller than the JSON-format records. The format is:
+        - the length (in bytes) of the header, as a little-endian uint32
+        - the header, which is UTF-8 encoded JSON giving the row and column
+          names and the shape of the array. This is padded with spaces so
+          that the array starts at an offset which is a multiple of 4. 
+        - the values, as little-endian float32 in row-major order. Missing
+          values are NaN.
+        '''
+        values = np.ascontiguousarray(table.to_numpy(dtype=DENSE_MATRIX_DTYPE))
+        header = json.dumps({
+            'rows': [str(x) for x in table.index],
+            'columns': [str(x) for x in table.columns],
+            'shape': list(values.shape),
+            'dtype': DENSE_MATRIX_DTYPE
+        }).encode('utf-8')
+        header += b' ' * (-(len(header) + 4) % 4)
+        return struct.pack('<I', len(header)) + header + values.tobytes()
+
+    def get_columns_to_read(self, resource_path, query_params):
+        '''
+        The row statistics use all the columns. If those are requested
+        but were not precomputed, we need to read all the columns, even if 
+        only some are returned.
+        '''
+        columns = super().get_columns_to_read(resource_path, query_params)
+        if (self.row_statistics is None) and (len(self.get_requested_statistics()) > 0):
+            return None
+        return columns
 
-            elif len(split_str) == 2:
-                try:
-                    val = float(split_str[1])
-                except ValueError as ex:
-                    raise ParseException('Could not parse the request'
-                        ' for filtering on the row means. The value'
-                        ' could not be interpreted as a number.'
-                    )
-                try:
-                    op = settings.OPERATOR_MAPPING[split_str[0]]
-                except KeyError as ex:
-                    raise ParseException('The operator string ("{s}") was not understood. Choose'
-                        ' from among: {vals}'.format(
-                            s = split_str[0],
-                            vals = ','.join(settings.OPERATOR_MAPPING.keys())
+    def get_requested_statistics(self):
+        '''
+        Returns the list of row statistics which were requested, either
+        for filtering or to be included in the returned contents.
+        '''
+        requested_stats = [k for k in self.ROW_STATISTICS if k in self.extra_query_params]
+        if self.INCLUDE_ROWMEANS in self.extra_query_params:
+            requested_stats.append(self.ROWMEAN_KEYWORD)
+        if self.INCLUDE_ROWSTATS in self.extra_query_params:
+            stat_string = self.extra_query_params[self.INCLUDE_ROWSTATS]
+            if stat_string:
+                for k in [x.strip() for x in stat_string.split(',')]:
+                    if not k in self.ROW_STATISTICS:
+                        raise ParseException('The row statistic "{k}" is not available.'
+                            ' Choose from among: {vals}'.format(
+                                k = k,
+                                vals = ','.join(self.ROW_STATISTICS.keys())
+                            )
                         )
-                    )
-                filters.append(self.table[self.ROWMEAN_KEYWORD].apply(lambda x: op(x, val)))
+                    requested_stats.append(k)
             else:
-                raise ParseException('The query param string ({v}) for filtering on'
-                    ' the mean values was not formatted properly.'.format(
-                        v = filter_string
+                requested_stats.extend(self.ROW_STATISTICS.keys())
+        # remove duplicates, but keep the order
+        return list(dict.fromkeys(requested_stats))
+
+    def get_statistic_filter(self, keyword, filter_string):
+        '''
+        Returns a boolean Series for filtering on the row statistic
+        (already added as a column) named by `keyword`. 
+        '''
+        split_str = filter_string.split(settings.QUERY_PARAM_DELIMITER)
+        if len(split_str) == 1:
+            # strict equality
+            try:
+                val = float(split_str[0])
+            except ValueError as ex:
+                raise ParseException('Could not parse the request'
+                    ' for filtering on {k}. The value'
+                    ' could not be interpreted as a number.'.format(k=keyword)
+                )
+            return self.table[keyword] == val
+
+        elif len(split_str) == 2:
+            try:
+                val = float(split_str[1])
+            except ValueError as ex:
+                raise ParseException('Could not parse the request'
+                    ' for filtering on {k}. The value'
+                    ' could not be interpreted as a number.'.format(k=keyword)
+                )
+            try:
+                op = settings.VECTORIZED_OPERATOR_MAPPING[split_str[0]]
+            except KeyError as ex:
+                raise ParseException('The operator string ("{s}") was not understood. Choose'
+                    ' from among: {vals}'.format(
+                        s = split_str[0],
+                        vals = ','.join(settings.VECTORIZED_OPERATOR_MAPPING.keys())
                     )
                 )
+            return op(self.table[keyword], val)
+        else:
+            raise ParseException('The query param string ({v}) for filtering on'
+                ' {k} was not formatted properly.'.format(
+                    v = filter_string,
+                    k = keyword
+                )
+            )
 
-        if self.INCLUDE_ROWMEANS in self.extra_query_params:
-            # if the rowmean filter was also applied, we can skip-- 
-            # This query param is requesting the row means, which is inferred by the rowmean filter
-            if not self.ROWMEAN_KEYWORD in self.extra_query_params:
-                # if here, no filtering was requested on the row means. Simply calculate.
-                # Note that we use the rowmean_keyword as the column name and in the 
-                # export columns list so that the final converter knows to send this column
-                # in the response.
-                self.additional_exported_cols.append(self.ROWMEAN_KEYWORD)
-                self.table[self.ROWMEAN_KEYWORD] = self.table.mean(axis=1)
+    def _resource_specific_modifications(self):
+        if not self.extra_query_params:
+            return
+
+        requested_stats = self.get_requested_statistics()
+        if len(requested_stats) == 0:
+            return
+
+        # Use the precomputed statistics if available. Since those were computed
+        # for all the rows, we align them to the rows of the (possibly filtered) table.
+        # Note that we use the statistic keywords as the column names and in the 
+        # export columns list so that the final converter knows to send these columns
+        # in the response.
+        if self.row_statistics is not None:
+            stats = self.row_statistics[requested_stats].reindex(self.table.index)
+        else:
+            stats = self.compute_row_statistics(requested_stats)
+
+        filters = []
+        for k in requested_stats:
+            self.additional_exported_cols.append(k)
+            self.table[k] = stats[k]
+            if k in self.extra_query_params:
+                filters.append(self.get_statistic_filter(k, self.extra_query_params[k]))
 
         # apply filters (if any)
         if len(filters) > 1:
@@ -821,6 +1960,10 @@ class Matrix(TableResource):
             if p in query_params:
                 self.extra_query_params[p] = query_params[p]
 
+        self.row_statistics = None
+        if self.extra_query_params:
+            self.row_statistics = self.read_row_statistics(resource_path)
+
         # additional filtering/behavior specific to a Matrix (if requested)
         # is handled in the _resource_specific_modifications method
         return super().get_contents(resource_path, query_params)
@@ -867,6 +2010,32 @@ class IntegerMatrix(Matrix):
         }
     ]
 
+    def get_non_integer_columns(self, table):
+        '''
+        Returns a list of tuples (column name, column number) for the
+        columns of `table` which do not contain only integers.
+        '''
+        problem_columns = self.check_column_types(IntegerMatrix.TARGET_PATTERN, table)
+        if len(problem_columns) == 0:
+            return problem_columns
+
+        # one problem with pandas is that NaN values cause a column
+        # to be parsed as a float, even if all other values in the 
+        # column are integers.  We can do a secondary check, however, 
+        # to see if the remaining values (non-NaN) are basically
+        # integers (e.g. "2.0"), which are finite with no fractional part. 
+        # If that is the case, we remove that column from the 
+        # "problem columns".  
+        # recall c is a tuple of (colname, col number)
+        problem_names = [c[0] for c in problem_columns]
+        subtable = table[problem_names]
+        numeric_cols = np.array([pd.api.types.is_float_dtype(x) for x in subtable.dtypes])
+        values = subtable.loc[:, numeric_cols].to_numpy(dtype=float)
+        is_integer = np.isnan(values) | (np.isfinite(values) & (np.mod(values, 1) == 0))
+        integer_cols = np.zeros(len(problem_names), dtype=bool)
+        integer_cols[numeric_cols] = is_integer.all(axis=0)
+        return [c for c, is_int in zip(problem_columns, integer_cols) if not is_int]
+
     def validate_type(self, resource_path):
 
         # first check that it has all numeric types.  If that fails
@@ -875,32 +2044,27 @@ class IntegerMatrix(Matrix):
         if not is_valid:
             return (False, error_message)
 
-        # was valid for numeric types.  Now check for integer
-        problem_columns = self.check_column_types(IntegerMatrix.TARGET_PATTERN)
-        if len(problem_columns) > 0:
+        # if validated in chunks, the checks below were 
+        # already performed on each chunk
+        if self.validated_in_chunks:
+            return (True, error_message)
 
-            # one problem with pandas is that NaN values cause a column
-            # to be parsed as a float, even if all other values in the 
-            # column are integers.  We can do a secondary check, however, 
-            # to see if the remaining values (non-NaN) are basically
-            # integers.  We check if the numbers look like "2.0".
-            # If that is the case, we remove that column from the 
-            # "problem columns".  
-            for i,c in enumerate(problem_columns):
-                # recall c is a tuple of (colname, col number)
-                if all([
-                        re.match('\d+\.0', str(x)) 
-                        for x in self.table[c[0]].dropna()]):
-                    problem_columns.pop(i)
-
-            # if there are still any remaining problematic cols,
-            # we now issue an error
-            if len(problem_columns) > 0:
-                error_message = NON_INTEGER_ERROR
-                return (False, error_message)
+        # was valid for numeric types.  Now check for integer.
+        # if there are any problematic cols, we issue an error
+        if len(self.get_non_integer_columns(self.table)) > 0:
+            error_message = NON_INTEGER_ERROR
+            return (False, error_message)
             
         return (True, None)
 
+    def validate_chunk(self, chunk):
+        is_valid, message = super().validate_chunk(chunk)
+        if not is_valid:
+            return (False, message)
+        if len(self.get_non_integer_columns(chunk)) > 0:
+            return (False, NON_INTEGER_ERROR)
+        return (True, message)
+
 
 class RnaSeqCountMatrix(IntegerMatrix):
     '''
@@ -925,13 +2089,17 @@ class ElementTable(TableResource):
     the specific behavior for `Observation`s or `Feature`s.
     '''
 
-    ACCEPTABLE_EXTENSIONS = [
+    ACCEPTABLE_EXTENSIONS = with_compressed_extensions([
         CSV,
         TSV,
         TAB,
         XLS,
         XLSX
-    ]
+    ])
+
+    # annotations typically have columns with repeated 
+    # strings (e.g. experimental groups)
+    COMPACT_CATEGORICALS = True
 
     def validate_type(self, resource_path):
 
@@ -939,6 +2107,11 @@ class ElementTable(TableResource):
         is_valid, error_message = super().validate_type(resource_path)
         if not is_valid:
             return (False, error_message)
+
+        # if validated in chunks, the checks below were 
+        # already performed on each chunk
+        if self.validated_in_chunks:
+            return (True, error_message)
         
         # check that the file is "useful" in that it has
         # more than one column.  It's not REALLY an error, but it does not 
@@ -1038,6 +2211,11 @@ class AnnotationTable(ElementTable):
         if not is_valid:
             return (False, error_message)
 
+        # if validated in chunks, the checks below were 
+        # already performed on each chunk
+        if self.validated_in_chunks:
+            return (True, error_message)
+
         # it is hard to check for proper headers for annotation
         # files since they have relatively free format.  However,
         # if the column name matches any values in its column, the
@@ -1053,14 +2231,25 @@ class AnnotationTable(ElementTable):
         # Here, "CTRL" becomes the header, but it's clearly 
         # just due to a missing header.  We don't issue an 
         # error, but we do warn the user by adding a comment.
-        flagged_columns = []
-        for c in self.table.columns:
-            if np.sum(c == self.table[c]) > 0:
-                flagged_columns.append(c)
-        if len(flagged_columns) > 0:
-            return (True, MISSING_HEADER_WARNING)
+        return (True, self.check_for_missing_header(self.table))
 
-        return (True, None)
+    def check_for_missing_header(self, table):
+        '''
+        Returns a warning message if any of the column names 
+        appear in the corresponding column of `table`. Otherwise None.
+        '''
+        # compare every column against its name at once
+        column_names = pd.Series(np.asarray(table.columns, dtype=object), 
+            index=table.columns, dtype=object)
+        if table.eq(column_names, axis='columns').values.any():
+            return MISSING_HEADER_WARNING
+        return None
+
+    def validate_chunk(self, chunk):
+        is_valid, message = super().validate_chunk(chunk)
+        if not is_valid:
+            return (False, message)
+        return (True, self.check_for_missing_header(chunk) or message)
 
     def extract_metadata(self, resource_path, parent_op_pk=None):
         '''
@@ -1072,6 +2261,10 @@ class AnnotationTable(ElementTable):
         '''
         super().extract_metadata(resource_path, parent_op_pk)
 
+        # the observations are the rows, so we need the full table here.
+        if self.table is None:
+            self.read_resource(resource_path)
+
         observation_list = super().prep_metadata(Observation)
         o_set = ObservationSet(observation_list)
         self.metadata[DataResource.OBSERVATION_SET] = ObservationSetSerializer(o_set).data
@@ -1160,12 +2353,29 @@ class BEDFile(TableResource):
     By default, BED files do NOT contain headers and we enforce that here.
     '''
 
-    ACCEPTABLE_EXTENSIONS = [BED,]
+    ACCEPTABLE_EXTENSIONS = with_compressed_extensions([BED,])
 
     DESCRIPTION = 'A three-column BED-format file. https://ensembl.org/info/website/upload/bed.html'\
         ' BED files do NOT have column headers.' \
         ' Acceptable file extensions include: {s}'.format(s=', '.join(ACCEPTABLE_EXTENSIONS))
 
+    # For requesting the intervals which overlap one or more (comma-delimited)
+    # regions, e.g. "chr7:5500000-5600000" or "chr7" for an entire 
+    # chromosome. As in the BED format, the coordinates are 0-based and 
+    # the end is excluded.
+    REGION_FILTER = '__region__'
+    IGNORED_QUERY_PARAMS = TableResource.IGNORED_QUERY_PARAMS + [REGION_FILTER]
+
+    # An index of the intervals (sorted by chromosome and then start position)
+    # is stored next to the resource so that the intervals overlapping a region
+    # are found by binary search rather than a scan of the entire file.
+    INTERVAL_INDEX_SIDECAR = 'intervals.npz'
+    SIDECAR_SUFFIXES = TableResource.SIDECAR_SUFFIXES + [INTERVAL_INDEX_SIDECAR]
+    INTERVAL_INDEX_KEYS = ['chroms', 'offsets', 'starts', 'stops', 'max_stops', 'positions']
+
+    def __init__(self):
+        super().__init__()
+        self.interval_index = None
 
     def validate_type(self, resource_path):
         reader = TableResource.get_reader(resource_path)
@@ -1194,3 +2404,169 @@ class BEDFile(TableResource):
     def extract_metadata(self, resource_path, parent_op_pk=None):
         super().extract_metadata(resource_path, parent_op_pk)
         return self.metadata
+
+    def get_columns_to_read(self, resource_path, query_params):
+        '''
+        The interval index uses the start/stop columns, so if a region
+        is requested we read all the (typically few) columns. The requested
+        columns are still projected in the contents.
+        '''
+        columns = super().get_columns_to_read(resource_path, query_params)
+        if self.REGION_FILTER in query_params:
+            return None
+        return columns
+
+    def write_sidecars(self, resource_path):
+        super().write_sidecars(resource_path)
+        self.write_interval_index(resource_path)
+
+    def build_interval_index(self):
+        '''
+        Creates the interval index (a dict of arrays) for `self.table`.
+
+        The intervals are sorted by chromosome and start position, with
+        `offsets` giving the bounds of each chromosome in the sorted arrays.
+        For each chromosome, `max_stops` is the running maximum of the stop
+        positions, which is non-decreasing and allows a binary search for
+        the first interval which could overlap a region.
+
+        As for other tables, the first column (the chromosome) is parsed as 
+        the index, so the start and stop are the first two columns.
+        '''
+        chroms = self.table.index.values.astype(str)
+        starts = self.table.iloc[:, 0].values.astype(np.int64)
+        stops = self.table.iloc[:, 1].values.astype(np.int64)
+        order = np.lexsort((starts, chroms))
+        chroms, starts, stops = chroms[order], starts[order], stops[order]
+        unique_chroms, offsets = np.unique(chroms, return_index=True)
+        offsets = np.append(offsets, chroms.size)
+        max_stops = np.empty_like(stops)
+        for i in range(unique_chroms.size):
+            lo, hi = offsets[i], offsets[i+1]
+            max_stops[lo:hi] = np.maximum.accumulate(stops[lo:hi])
+        return {
+            'chroms': unique_chroms,
+            'offsets': offsets,
+            'starts': starts,
+            'stops': stops,
+            'max_stops': max_stops,
+            'positions': order
+        }
+
+    def write_interval_index(self, resource_path):
+        '''
+        Writes the interval index next to the file at `resource_path`.
+        '''
+        sidecar_path = self.get_sidecar_path(resource_path, self.INTERVAL_INDEX_SIDECAR)
+        logger.info('Writing interval index to {p}'.format(p=sidecar_path))
+        try:
+            np.savez(sidecar_path, **self.build_interval_index())
+        except Exception as ex:
+            logger.info('Failed to write the interval index for the resource'
+                ' at {p}. Exception was: {ex}'.format(
+                    p = resource_path,
+                    ex = ex
+                )
+            )
+            if os.path.exists(sidecar_path):
+                os.remove(sidecar_path)
+
+    def read_interval_index(self, resource_path):
+        '''
+        Returns the interval index (a dict of arrays) for the file at
+        `resource_path`, or None if it is not available.
+        '''
+        sidecar_path = self.get_sidecar_path(resource_path, self.INTERVAL_INDEX_SIDECAR)
+        if not self.sidecar_is_current(resource_path, sidecar_path):
+            return None
+        cache_key = parsed_resource_cache.get_key(sidecar_path)
+        interval_index = parsed_resource_cache.get(cache_key)
+        if interval_index is not None:
+            return interval_index
+        try:
+            with np.load(sidecar_path) as npz:
+                interval_index = {k: npz[k] for k in self.INTERVAL_INDEX_KEYS}
+        except Exception as ex:
+            logger.info('Failed to read the interval index at {p}.'
+                ' Exception was: {ex}'.format(
+                    p = sidecar_path,
+                    ex = ex
+                )
+            )
+            return None
+        parsed_resource_cache.put(cache_key, interval_index)
+        return interval_index
+
+    def parse_region(self, region):
+        '''
+        Parses a region string such as "chr7:5500000-5600000" or "chr7"
+        into a tuple of (chromosome, start, stop). If only the chromosome
+        is given, start and stop are None.
+        '''
+        region = region.strip()
+        if not settings.QUERY_PARAM_DELIMITER in region:
+            return (region, None, None)
+        chrom, coordinates = region.rsplit(settings.QUERY_PARAM_DELIMITER, 1)
+        try:
+            start, stop = [int(x) for x in coordinates.split('-')]
+        except ValueError:
+            raise ParseException('The region "{r}" was not properly formatted.'
+                ' It should be <chromosome>:<start>-<end>, e.g.'
+                ' chr7:5500000-5600000'.format(r=region))
+        if start >= stop:
+            raise ParseException('The start of the region "{r}" must be less'
+                ' than its end.'.format(r=region))
+        return (chrom, start, stop)
+
+    def find_overlapping_intervals(self, chrom, start=None, stop=None):
+        '''
+        Returns the positions (in the table) of the intervals on `chrom` 
+        which overlap [start, stop). If start and stop are None, 
+        returns all the intervals on that chromosome.
+        '''
+        idx = self.interval_index
+        i = np.searchsorted(idx['chroms'], chrom)
+        if (i == idx['chroms'].size) or (idx['chroms'][i] != chrom):
+            return np.array([], dtype=idx['positions'].dtype)
+        lo, hi = idx['offsets'][i], idx['offsets'][i+1]
+        if start is None:
+            return idx['positions'][lo:hi]
+
+        # the intervals starting before the end of the region...
+        hi = lo + np.searchsorted(idx['starts'][lo:hi], stop, side='left')
+        # ...excluding those before the first interval which could extend 
+        # past the start of the region
+        lo = lo + np.searchsorted(idx['max_stops'][lo:hi], start, side='right')
+        candidates = np.arange(lo, hi)
+        return idx['positions'][candidates[idx['stops'][lo:hi] > start]]
+
+    def get_region_positions(self, region_string):
+        '''
+        Returns the (sorted) positions of the rows which overlap any 
+        of the comma-delimited regions.
+        '''
+        if (self.interval_index is None) or \
+            (self.interval_index['positions'].size != self.table.shape[0]):
+            self.interval_index = self.build_interval_index()
+        regions = [x for x in region_string.split(',') if x.strip()]
+        if len(regions) == 0:
+            raise ParseException('No regions were given for the "{p}"'
+                ' query param.'.format(p=self.REGION_FILTER))
+        positions = [self.find_overlapping_intervals(*self.parse_region(x)) 
+            for x in regions]
+        return np.unique(np.concatenate(positions))
+
+    def filter_against_query_params(self, query_params):
+        '''
+        The region filter is applied first, since the interval
+        index refers to the positions of the rows in the full table.
+        '''
+        if self.REGION_FILTER in query_params:
+            self.table = self.table.iloc[
+                self.get_region_positions(query_params[self.REGION_FILTER])]
+        super().filter_against_query_params(query_params)
+
+    def get_contents(self, resource_path, query_params={}):
+        if self.REGION_FILTER in query_params:
+            self.interval_index = self.read_interval_index(resource_path)
+        return super().get_contents(resource_path, query_params)
@@ -1,9 +1,18 @@
 import unittest
+import os
+import json
 import numpy as np
 import pandas as pd
 import uuid
+import unittest.mock as mock
 
-from resource_types import RESOURCE_MAPPING
+from django.conf import settings
+from django.core.cache import cache
+
+from resource_types import RESOURCE_MAPPING, extension_is_consistent_with_type
+from resource_types.base import DataResource, ParseException
+from resource_types.cache import ParsedResourceCache, parsed_resource_cache
+from api.tests.base import remove_with_sidecars
 
 class TestResourceTypes(unittest.TestCase):    
     
@@ -15,8 +24,49 @@ class TestResourceTypes(unittest.TestCase):
         for k,v in RESOURCE_MAPPING.items():
             v.ACCEPTABLE_EXTENSIONS
 
+    def test_compressed_extensions(self):
+        '''
+        Gzip-compressed delimited files are accepted for the table types
+        and the "real" extension is used to infer the format.
+        '''
+        self.assertEqual(DataResource.get_extension('/a/b/counts.TSV.gz'), 'tsv')
+        self.assertEqual(DataResource.get_extension('/a/b.c/counts.tsv'), 'tsv')
+        self.assertEqual(DataResource.get_extension('counts.gz'), 'gz')
+        self.assertTrue(extension_is_consistent_with_type('counts.tsv.gz', 'I_MTX'))
+        self.assertTrue(extension_is_consistent_with_type('regions.bed.gz', 'BED'))
+        self.assertFalse(extension_is_consistent_with_type('counts.xlsx.gz', 'I_MTX'))
+
 class TestTableResource(unittest.TestCase):
 
+    def test_save_compressed_in_standardized_format(self):
+        '''
+        Compressed uploads are read and standardized. The standardized
+        file is compressed only if requested.
+        '''
+        df = pd.DataFrame(np.arange(9).reshape((3,3)), 
+            index=['geneA', 'geneB', 'geneC'], 
+            columns=['colA', 'colB', 'colC'])
+        path = '/tmp/{u}.csv.gz'.format(u=uuid.uuid4())
+        df.to_csv(path)
+        self.addCleanup(remove_with_sidecars, path)
+
+        mtx_type = RESOURCE_MAPPING['I_MTX']()
+        is_valid, err = mtx_type.validate_type(path)
+        self.assertTrue(is_valid)
+        new_path, new_name = mtx_type.save_in_standardized_format(path, 'counts.csv.gz')
+        self.assertEqual(new_name, 'counts.tsv')
+        self.assertEqual(new_path, path[:-len('.csv.gz')] + '.tsv')
+        self.assertTrue(pd.read_table(new_path, index_col=0).equals(df))
+        remove_with_sidecars(new_path)
+
+        with mock.patch('resource_types.table_types.settings.COMPRESS_STANDARDIZED_TABLES', True):
+            mtx_type = RESOURCE_MAPPING['I_MTX']()
+            new_path, new_name = mtx_type.save_in_standardized_format(path, 'counts.csv.gz')
+        self.assertEqual(new_name, 'counts.tsv.gz')
+        self.assertTrue(new_path.endswith('.tsv.gz'))
+        self.assertTrue(pd.read_table(new_path, index_col=0, compression='gzip').equals(df))
+        remove_with_sidecars(new_path)
+
     def test_save_in_standardized_format(self):
 
         # create some temp file written in CSV format (which is not the internal
@@ -32,14 +82,465 @@ class TestTableResource(unittest.TestCase):
         df = pd.DataFrame(values, index=rows, columns=columns)
         path = '/tmp/test_matrix.csv'
         df.to_csv(path, sep=',')
+        self.addCleanup(remove_with_sidecars, path)
 
         mtx_class = RESOURCE_MAPPING['MTX']
         mtx_type = mtx_class()
         new_path, new_name = mtx_type.save_in_standardized_format(path, 'test_matrix.csv')
+        self.addCleanup(remove_with_sidecars, new_path)
         
         self.assertEqual('/tmp/test_matrix.tsv', new_path)
         self.assertEqual('test_matrix.tsv', new_name)
 
         # check that they have the same content:
         reloaded_df = pd.read_table(new_path, index_col=0)
-        self.assertTrue(reloaded_df.equals(df))
\ No newline at end of file
+        self.assertTrue(reloaded_df.equals(df))
+
+    def test_columnar_sidecar_written_and_preferred(self):
+        columns = ['colA', 'colB', 'colC']
+        rows = ['geneA', 'geneB', 'geneC']
+        df = pd.DataFrame(np.arange(9).reshape((3,3)), index=rows, columns=columns)
+        path = '/tmp/{u}.csv'.format(u=uuid.uuid4())
+        df.to_csv(path, sep=',')
+        self.addCleanup(remove_with_sidecars, path)
+
+        mtx_type = RESOURCE_MAPPING['MTX']()
+        new_path, new_name = mtx_type.save_in_standardized_format(path, 'test_matrix.csv')
+        self.addCleanup(remove_with_sidecars, new_path)
+        sidecar_path = mtx_type.get_sidecar_path(new_path, mtx_type.COLUMNAR_SIDECAR)
+        self.assertTrue(os.path.exists(sidecar_path))
+
+        # the sidecar is used when reading the standardized file:
+        new_mtx_type = RESOURCE_MAPPING['MTX']()
+        with mock.patch('resource_types.table_types.TableResource.get_reader') as mock_get_reader:
+            new_mtx_type.read_resource(new_path)
+            mock_get_reader.assert_not_called()
+        self.assertTrue(new_mtx_type.table.equals(df))
+
+        # if the file is newer than the sidecar, the sidecar is ignored:
+        os.utime(sidecar_path, (0,0))
+        self.assertFalse(new_mtx_type.read_columnar_sidecar(new_path))
+
+    def test_matrix_memmap_sidecar(self):
+        '''
+        Numeric matrices with a single dtype are read from a memory-mapped
+        array. Matrices with mixed dtypes do not get that sidecar.
+        '''
+        columns = ['colA', 'colB', 'colC']
+        rows = ['geneA', 'geneB', 'geneC']
+        df = pd.DataFrame(np.arange(9).reshape((3,3)), index=rows, columns=columns)
+        path = '/tmp/{u}.tsv'.format(u=uuid.uuid4())
+        df.to_csv(path, sep='\t')
+        self.addCleanup(remove_with_sidecars, path)
+
+        mtx_type = RESOURCE_MAPPING['I_MTX']()
+        new_path, new_name = mtx_type.save_in_standardized_format(path, 'test_matrix.tsv')
+        values_path = mtx_type.get_sidecar_path(new_path, mtx_type.MEMMAP_SIDECAR)
+        self.assertTrue(os.path.exists(values_path))
+
+        new_mtx_type = RESOURCE_MAPPING['I_MTX']()
+        with mock.patch('resource_types.table_types.pd.read_parquet') as mock_read_parquet, \
+            mock.patch('resource_types.table_types.np.load', wraps=np.load) as mock_load:
+            new_mtx_type.read_resource(new_path, use_cache=True)
+            mock_read_parquet.assert_not_called()
+            mock_load.assert_called_once_with(values_path, mmap_mode='r')
+        self.assertTrue(new_mtx_type.table.equals(df))
+
+        # the contents (including the row means) can be computed from the memmap:
+        contents = new_mtx_type.get_contents(new_path, {'__incl_rowmeans__': ''})
+        self.assertEqual(contents[1], 
+            {'rowname': 'geneB', 'values': {'colA': 3, 'colB': 4, 'colC': 5}, '__rowmean__': 4.0})
+        [os.remove(mtx_type.get_sidecar_path(new_path, x)) for x in mtx_type.SIDECAR_SUFFIXES]
+
+        # mixed int/float columns-- no memmap sidecar
+        df['colA'] = df['colA'].astype(float)
+        df.to_csv(path, sep='\t')
+        mtx_type = RESOURCE_MAPPING['MTX']()
+        new_path, new_name = mtx_type.save_in_standardized_format(path, 'test_matrix.tsv')
+        self.assertFalse(os.path.exists(values_path))
+
+    def test_rowname_index_filters(self):
+        '''
+        Filters on the row names give the same results whether or
+        not the row name index is used.
+        '''
+        rows = ['HOXA1', 'hoxb2', 'TP53', 'BRCA1', 'Tp53', 'BRCA2', 'HOX']
+        df = pd.DataFrame(np.arange(14).reshape((7,2)), index=rows, columns=['colA', 'colB'])
+        path = '/tmp/{u}.tsv'.format(u=uuid.uuid4())
+        df.to_csv(path, sep='\t')
+        self.addCleanup(remove_with_sidecars, path)
+        mtx_type = RESOURCE_MAPPING['MTX']()
+        new_path, new_name = mtx_type.save_in_standardized_format(path, 'test_matrix.tsv')
+        sidecar_path = mtx_type.get_sidecar_path(new_path, mtx_type.ROWNAME_INDEX_SIDECAR)
+        self.assertTrue(os.path.exists(sidecar_path))
+
+        filter_strings = [
+            '[startswith]:hox',
+            '[startswith]:HOXA',
+            '[startswith]:z',
+            '[in]:TP53,BRCA1, BRCA2,foo',
+            '[eq]:TP53',
+            '[eq]:tp53',
+            '[case-ins-eq]:tp53',
+        ]
+        for f in filter_strings:
+            query_params = {'__rowname__': f}
+            mtx_type = RESOURCE_MAPPING['MTX']()
+            with mock.patch.object(mtx_type, 'read_rowname_index', return_value=None):
+                expected = [x['rowname'] for x in mtx_type.get_contents(new_path, query_params)]
+            # the filtered positions were cached by the previous request
+            cache.clear()
+            mtx_type = RESOURCE_MAPPING['MTX']()
+            result = [x['rowname'] for x in mtx_type.get_contents(new_path, query_params)]
+            self.assertIsNotNone(mtx_type.rowname_index)
+            self.assertCountEqual(result, expected)
+
+            # check that the index (and not a scan) can handle this filter
+            mtx_type.read_resource(new_path)
+            self.assertIsNotNone(mtx_type.lookup_rownames(*f.split(':')))
+            cache.clear()
+
+    def test_bed_region_queries(self):
+        '''
+        The intervals overlapping the requested regions are the same
+        as those found by a scan, with or without the interval index.
+        '''
+        np.random.seed(1)
+        n = 500
+        starts = np.random.randint(0, 10000, size=n)
+        df = pd.DataFrame({
+            'chrom': np.random.choice(['chr1', 'chr2', 'chrX'], size=n),
+            'start': starts,
+            'stop': starts + np.random.choice([1, 10, 100, 5000], size=n),
+            'name': ['r%d' % i for i in range(n)]
+        })
+        path = '/tmp/{u}.bed'.format(u=uuid.uuid4())
+        df.to_csv(path, sep='\t', header=False, index=False)
+        self.addCleanup(remove_with_sidecars, path)
+        bed_type = RESOURCE_MAPPING['BED']()
+        new_path, new_name = bed_type.save_in_standardized_format(path, 'regions.bed')
+        self.addCleanup(remove_with_sidecars, new_path)
+        self.assertEqual(new_name, 'regions.tsv')
+        sidecar_path = bed_type.get_sidecar_path(new_path, bed_type.INTERVAL_INDEX_SIDECAR)
+        self.assertTrue(os.path.exists(sidecar_path))
+
+        # as for other tables, the first line is parsed as the header
+        # and the first column (the chromosome) as the row names.
+        stop_column, name_column = str(df.loc[0, 'stop']), df.loc[0, 'name']
+        df = df.iloc[1:]
+
+        regions = [
+            ('chr1', 5000, 5100),
+            ('chr2', 0, 1),
+            ('chrX', 9990, 20000),
+            ('chr1', None, None),
+            ('chrY', 0, 100),
+        ]
+        for chrom, start, stop in regions:
+            if start is None:
+                region_string = chrom
+                expected = df.loc[df.chrom == chrom, 'name']
+            else:
+                region_string = '{c}:{s}-{e}'.format(c=chrom, s=start, e=stop)
+                expected = df.loc[(df.chrom == chrom) & (df.start < stop) & (df.stop > start), 'name']
+            query_params = {'__region__': region_string}
+            cache.clear()
+            bed_type = RESOURCE_MAPPING['BED']()
+            result = [x['values'][name_column] for x in bed_type.get_contents(new_path, query_params)]
+            self.assertIsNotNone(bed_type.interval_index)
+            self.assertEqual(result, list(expected))
+
+            cache.clear()
+            bed_type = RESOURCE_MAPPING['BED']()
+            with mock.patch.object(bed_type, 'read_interval_index', return_value=None):
+                result = [x['values'][name_column] for x in bed_type.get_contents(new_path, query_params)]
+            self.assertEqual(result, list(expected))
+
+        # multiple regions, combined with another filter
+        query_params = {'__region__': 'chr1:0-1000,chr2:0-1000', stop_column: '[lt]:500'}
+        result = [x['values'][name_column] for x in 
+            RESOURCE_MAPPING['BED']().get_contents(new_path, query_params)]
+        expected = df.loc[df.chrom.isin(['chr1', 'chr2']) & (df.start < 1000) & (df.stop < 500), 'name']
+        self.assertEqual(result, list(expected))
+
+        with self.assertRaises(ParseException):
+            RESOURCE_MAPPING['BED']().get_contents(new_path, {'__region__': 'chr1:100-abc'})
+
+    def test_precomputed_row_statistics(self):
+        '''
+        The row statistics are computed when the matrix is saved and are
+        available for filtering and sorting.
+        '''
+        rows = ['g%d' % i for i in range(6)]
+        df = pd.DataFrame(np.array([
+            [0, 0, 0],
+            [1, 5, 9],
+            [2, 2, 2],
+            [0, 10, 0],
+            [4, 5, 6],
+            [3, 0, 3]
+        ]), index=rows, columns=['colA', 'colB', 'colC'])
+        path = '/tmp/{u}.tsv'.format(u=uuid.uuid4())
+        df.to_csv(path, sep='\t')
+        self.addCleanup(remove_with_sidecars, path)
+        mtx_type = RESOURCE_MAPPING['MTX']()
+        new_path, new_name = mtx_type.save_in_standardized_format(path, 'test_matrix.tsv')
+        self.assertTrue(os.path.exists(
+            mtx_type.get_sidecar_path(new_path, mtx_type.ROW_STATISTICS_SIDECAR)))
+
+        query_params = {
+            '__rownonzero__': '[gte]:2',
+            '__incl_rowstats__': '__rowvar__,__rowmax__',
+            'sort_vals': '[desc]:__rowvar__'
+        }
+        mtx_type = RESOURCE_MAPPING['MTX']()
+        with mock.patch.object(mtx_type, 'compute_row_statistics') as mock_compute:
+            contents = mtx_type.get_contents(new_path, query_params).tolist()
+            mock_compute.assert_not_called()
+        self.assertEqual([x['rowname'] for x in contents], ['g1', 'g5', 'g4', 'g2'])
+        self.assertEqual(contents[0]['__rowvar__'], 16.0)
+        self.assertEqual(contents[0]['__rowmax__'], 9)
+        self.assertEqual(contents[0]['__rownonzero__'], 3)
+        self.assertFalse('__rowmean__' in contents[0])
+
+        # the same results are given when the statistics are computed as needed
+        cache.clear()
+        mtx_type = RESOURCE_MAPPING['MTX']()
+        with mock.patch.object(mtx_type, 'read_row_statistics', return_value=None):
+            self.assertEqual(mtx_type.get_contents(new_path, query_params).tolist(), contents)
+
+        # asking for an unknown statistic is an error
+        with self.assertRaises(ParseException):
+            mtx_type.get_contents(new_path, {'__incl_rowstats__': '__rowfoo__'})
+        cache.clear()
+
+    def test_compact_loading(self):
+        '''
+        Numeric columns are downcast only if no values change, and
+        annotation tables store repeated strings as categoricals.
+        '''
+        df = pd.DataFrame({
+            'small_ints': [1, 2, 3, 4],
+            'large_ints': [1, 2, 3, 2**40],
+            'halves': [0.5, 1.5, np.nan, 2.0],
+            'tenths': [0.1, 0.2, 0.3, 0.4],
+            'group': ['CTRL', 'TREAT', 'CTRL', 'TREAT'],
+        }, index=['sA', 'sB', 'sC', 'sD'])
+        path = '/tmp/{u}.tsv'.format(u=uuid.uuid4())
+        df.to_csv(path, sep='\t')
+        self.addCleanup(remove_with_sidecars, path)
+
+        t = RESOURCE_MAPPING['ANN']()
+        t.read_resource(path, compact=True)
+        self.assertEqual(t.table['small_ints'].dtype, np.int32)
+        self.assertEqual(t.table['large_ints'].dtype, np.int64)
+        self.assertEqual(t.table['halves'].dtype, np.float32)
+        self.assertEqual(t.table['tenths'].dtype, np.float64)
+        self.assertTrue(pd.api.types.is_categorical_dtype(t.table['group'].dtype))
+        self.assertTrue(t.compact_memory_savings > 0)
+        self.assertTrue(t.table.astype(df.dtypes.to_dict()).equals(df))
+
+        # matrices do not convert strings to categoricals
+        t = RESOURCE_MAPPING['MTX']()
+        t.read_resource(path, compact=True)
+        self.assertEqual(t.table['group'].dtype, object)
+
+        # the contents are the same as without compacting
+        query_params = {'group': '[case-ins-eq]:ctrl', 'halves': '[lt]:3'}
+        with mock.patch('resource_types.table_types.settings.COMPACT_TABLE_LOADING', False):
+            expected = RESOURCE_MAPPING['ANN']().get_contents(path, query_params).tolist()
+        cache.clear()
+        contents = RESOURCE_MAPPING['ANN']().get_contents(path, query_params).tolist()
+        self.assertEqual(contents, expected)
+        self.assertEqual(contents[0]['values']['group'], 'CTRL')
+        cache.clear()
+
+class TestJsonResource(unittest.TestCase):
+
+    def setUp(self):
+        self.records = [{'idx': i, 'name': 'item%d' % i, 'pval': i/100} for i in range(25)]
+        self.path = '/tmp/{u}.json'.format(u=uuid.uuid4())
+        with open(self.path, 'w') as fout:
+            json.dump(self.records, fout)
+
+    def tearDown(self):
+        remove_with_sidecars(self.path)
+
+    def test_incremental_validation(self):
+        json_type = RESOURCE_MAPPING['JSON']()
+        self.assertTrue(json_type.validate_incrementally(self.path))
+        self.assertTrue(json_type.validate_type(self.path)[0])
+
+        with open(self.path, 'w') as fout:
+            fout.write('[{"a": 1}, {"a": ')
+        self.assertFalse(json_type.validate_incrementally(self.path))
+        is_valid, message = json_type.validate_type(self.path)
+        self.assertFalse(is_valid)
+        self.assertTrue(message.startswith('There was an issue with the JSON formatting.'))
+
+    def test_array_contents_decoded_lazily(self):
+        '''
+        Unfiltered top-level arrays are not parsed in full, but the
+        records are the same as a full parse.
+        '''
+        json_type = RESOURCE_MAPPING['JSON']()
+        contents = json_type.get_contents(self.path)
+        self.assertFalse(type(contents) is list)
+        self.assertEqual(len(contents), 25)
+        self.assertEqual(contents[5:10], self.records[5:10])
+        self.assertEqual(contents[20:100], self.records[20:])
+        self.assertEqual(contents[-2:], self.records[-2:])
+        self.assertEqual(contents[3], self.records[3])
+        self.assertEqual(contents.tolist(), self.records)
+        with self.assertRaises(IndexError):
+            contents[25]
+
+        # if the file has values that the incremental parser does not 
+        # accept (e.g. NaN), we still return the same records
+        self.records[10]['pval'] = np.nan
+        with open(self.path, 'w') as fout:
+            json.dump(self.records, fout)
+        contents = json_type.get_contents(self.path)
+        self.assertEqual(len(contents), 25)
+        self.assertEqual(contents[8:10], self.records[8:10])
+        result = contents[8:12]
+        self.assertEqual(result[:2], self.records[8:10])
+        self.assertTrue(np.isnan(result[2]['pval']))
+
+        # filtering still works as before
+        result = json_type.get_contents(self.path, {'idx': '[lt]:3'})
+        self.assertEqual(result, self.records[:3])
+
+    def test_offset_index(self):
+        '''
+        The offset index is written for top-level arrays and is used
+        to read the requested records (without the incremental parser).
+        '''
+        json_type = RESOURCE_MAPPING['JSON']()
+        # use a small chunk size so that records span multiple chunks
+        offset_index = json_type.build_offset_index(self.path, chunk_size=16)
+        with open(self.path, 'rb') as fin:
+            b = fin.read()
+        self.assertEqual([json.loads(b[i:j]) for i,j in 
+            zip(offset_index['starts'], offset_index['ends'])], self.records)
+
+        new_path, new_name = json_type.save_in_standardized_format(self.path, 'x.json')
+        self.assertEqual(new_path, self.path)
+        sidecar_path = json_type.get_sidecar_path(self.path, json_type.OFFSET_INDEX_SIDECAR)
+        self.assertTrue(os.path.exists(sidecar_path))
+
+        with mock.patch('resource_types.json_types.ijson') as mock_ijson:
+            contents = json_type.get_contents(self.path)
+            self.assertIsNotNone(contents.offset_index)
+            self.assertEqual(len(contents), 25)
+            self.assertEqual(contents[5:10], self.records[5:10])
+            self.assertEqual(contents[-1], self.records[-1])
+            self.assertEqual(contents.tolist(), self.records)
+            mock_ijson.items.assert_not_called()
+            mock_ijson.parse.assert_not_called()
+        os.remove(sidecar_path)
+
+        # no index for JSON objects
+        with open(self.path, 'w') as fout:
+            json.dump({'a': self.records}, fout)
+        json_type.save_in_standardized_format(self.path, 'x.json')
+        self.assertFalse(os.path.exists(sidecar_path))
+
+    def test_columnar_filter_and_sort(self):
+        '''
+        Filtering and sorting arrays of records using the columnar copy
+        gives the same result as the element-wise methods, including
+        for records which are missing the filtered/sorted key.
+        '''
+        self.records[3].pop('pval')
+        self.records[7].pop('pval')
+        with open(self.path, 'w') as fout:
+            json.dump(self.records, fout)
+
+        json_type = RESOURCE_MAPPING['JSON']()
+        query_params_list = [
+            {'pval': '[lt]:0.1'},
+            {'pval': '[gte]:0.05', 'idx': '[lte]:20'},
+            {'name': '[startswith]:ITEM1'},
+            {'name': 'item4'},
+            {'xyz': '[lt]:0.1'},
+            {settings.SORT_PARAM: '[asc]:pval'},
+            {settings.SORT_PARAM: '[desc]:pval'},
+            {settings.SORT_PARAM: '[desc]:xyz'},
+            {'pval': '[lt]:0.1', settings.SORT_PARAM: '[desc]:pval'},
+        ]
+        for query_params in query_params_list:
+            filters = {k:v for k,v in query_params.items() if k != settings.SORT_PARAM}
+            expected = json_type.filter_based_on_query_params(self.records, filters)
+            if settings.SORT_PARAM in query_params:
+                expected = json_type.sort_json(expected, query_params[settings.SORT_PARAM])
+            result = json_type.get_contents(self.path, query_params)
+            self.assertEqual([x['idx'] for x in result], [x['idx'] for x in expected])
+
+        # with the offset index, only the selected records are decoded
+        json_type.save_in_standardized_format(self.path, 'x.json')
+        result = json_type.get_contents(self.path, {settings.SORT_PARAM: '[desc]:idx'})
+        self.assertIsNotNone(result.offset_index)
+        self.assertEqual(len(result), 25)
+        self.assertEqual(result[:3], self.records[::-1][:3])
+        os.remove(json_type.get_sidecar_path(self.path, json_type.OFFSET_INDEX_SIDECAR))
+
+        with self.assertRaises(ParseException):
+            json_type.get_contents(self.path, {'pval': '[lt]:a'})
+
+
+class TestParsedResourceCache(unittest.TestCase):
+
+    def setUp(self):
+        self.df = pd.DataFrame(np.arange(9).reshape((3,3)), 
+            index=['geneA', 'geneB', 'geneC'], 
+            columns=['colA', 'colB', 'colC']
+        )
+        self.path = '/tmp/{u}.tsv'.format(u=uuid.uuid4())
+        self.df.to_csv(self.path, sep='\t')
+
+    def tearDown(self):
+        remove_with_sidecars(self.path)
+
+    def test_hits_and_misses_counted(self):
+        c = ParsedResourceCache(10**6)
+        key = c.get_key(self.path)
+        self.assertIsNone(c.get(key))
+        c.put(key, self.df)
+        self.assertTrue(c.get(key).equals(self.df))
+        stats = c.stats()
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 1)
+
+    def test_lru_eviction(self):
+        size = ParsedResourceCache.get_size(self.df)
+        # a budget that holds two copies, but not three
+        c = ParsedResourceCache(2*size + 1)
+        c.put('a', self.df)
+        c.put('b', self.df)
+        # touch 'a' so that 'b' is the least-recently used
+        c.get('a')
+        c.put('c', self.df)
+        self.assertIsNotNone(c.get('a'))
+        self.assertIsNone(c.get('b'))
+        self.assertIsNotNone(c.get('c'))
+
+    def test_oversized_item_not_cached(self):
+        c = ParsedResourceCache(1)
+        c.put('a', self.df)
+        self.assertIsNone(c.get('a'))
+
+    def test_key_changes_when_file_changes(self):
+        key1 = ParsedResourceCache.get_key(self.path)
+        self.df.iloc[:2].to_csv(self.path, sep='\t')
+        key2 = ParsedResourceCache.get_key(self.path)
+        self.assertNotEqual(key1, key2)
+
+    def test_contents_request_uses_cache(self):
+        mtx_type = RESOURCE_MAPPING['MTX']()
+        parsed_resource_cache.clear()
+        mtx_type.get_contents(self.path)
+        mtx_type.get_contents(self.path, {'colA': '[gt]:0'})
+        stats = parsed_resource_cache.stats()
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['hits'], 1)